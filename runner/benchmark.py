@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import itertools
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from server.engine import GameState
+from server.models import Action, MatchConfig
+from server.profiling import TickProfiler
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Fleets launched per player per tick under each load; fractional rates fire every 1/rate ticks.
+FLEET_LOADS = {"light": 0.2, "heavy": 4.0}
+GRIDS = {
+    "quick": {"planets": [1000, 10000], "players": [2, 8], "loads": ["light", "heavy"]},
+    "full": {"planets": [1000, 10000, 100000], "players": [2, 8, 32], "loads": ["light", "heavy"]},
+}
+# Phases compared against the baseline; anything below the noise floor is ignored.
+TRACKED_PHASES = ("growth", "actions", "movement", "arrivals", "pings", "scores", "snapshot", "observations")
+NOISE_FLOOR_MS = 0.1
+
+
+def calibrate() -> float:
+    """Time in ms for a small fixed pure-Python workload.
+
+    `run_case` samples it between profiled ticks and keeps the median, so a
+    baseline recorded on a faster (or less loaded) machine is scaled before
+    comparing instead of reading as a regression.
+    """
+    started = time.perf_counter()
+    values: dict[int, float] = {}
+    for i in range(20_000):
+        values[i & 1023] = values.get(i & 1023, 0.0) + i * 0.5
+    return (time.perf_counter() - started) * 1000.0
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchCase:
+    planets: int
+    players: int
+    load: str
+    ticks: int
+    warmup: int = 5
+    seed: int = 1
+
+    @property
+    def key(self) -> str:
+        return f"planets={self.planets},players={self.players},load={self.load}"
+
+
+def bench_config(case: BenchCase) -> MatchConfig:
+    return MatchConfig(
+        seed=case.seed,
+        tick_ms=500,
+        match_ticks=case.warmup + case.ticks,
+        planet_count=case.planets,
+        artifact_count=5,
+        max_actions_per_tick=max(5, int(FLEET_LOADS[case.load]) + 1),
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        # Small enough that 32 homes still fit on the map.
+        player_home_min_distance=0.2,
+    )
+
+
+def scripted_actions(state: GameState, rng: random.Random, load: str) -> dict[int, list[Action]]:
+    """Deterministic action stream: fleets from owned planets to nearby targets, plus a scan and an upgrade.
+
+    Reads ownership and the spatial grid straight from the engine so the
+    script costs no observation building of its own.
+    """
+    rate = FLEET_LOADS[load]
+    fleets = int(rate) + (1 if rng.random() < rate - int(rate) else 0)
+    actions: dict[int, list[Action]] = {}
+    for player in state.players:
+        owned = state._owned_planets(player.id)
+        if not owned:
+            continue
+        player_actions: list[Action] = []
+        for _ in range(fleets):
+            source = rng.choice(owned)
+            nearby = state._grid.query_radius(source.x, source.y, 0.2)
+            target = rng.choice(nearby) if nearby else rng.randrange(len(state.planets))
+            if target != source.id and source.energy > 4.0:
+                player_actions.append(
+                    {"type": "send_fleet", "from_id": source.id, "to_id": target, "energy": source.energy * 0.25}
+                )
+        source = rng.choice(owned)
+        player_actions.append({"type": "scan", "x": source.x, "y": source.y, "radius": 0.15})
+        player_actions.append({"type": "upgrade", "planet_id": source.id, "upgrade": rng.choice(["energy", "sensor"])})
+        actions[player.id] = player_actions
+    return actions
+
+
+def run_case(case: BenchCase) -> dict[str, Any]:
+    """Drive one `GameState` through the scripted stream and return its timings.
+
+    Warmup ticks run unprofiled so that first-tick cache builds do not skew
+    the means. Peak RSS is the whole process's, so run each case in a fresh
+    process (as `run_suite` does) to get per-case numbers.
+    """
+    config = bench_config(case)
+    gc.collect()
+    started = time.perf_counter()
+    state = GameState(config, [f"P{i}" for i in range(case.players)])
+    init_s = time.perf_counter() - started
+    rng = random.Random(case.seed)
+
+    def play_tick(profiler: TickProfiler | None) -> None:
+        actions = scripted_actions(state, rng, case.load)
+        # Like a headless match without a replay, nothing reads the snapshot's planets.
+        snapshot = state.advance_tick(actions, include_planets=False)
+        for player in state.players:
+            state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
+        if profiler is not None:
+            profiler.lap("observations")
+
+    for _ in range(case.warmup):
+        play_tick(None)
+    profiler = TickProfiler(window=case.ticks)
+    state.profiler = profiler
+    elapsed = 0.0
+    calibrations = []
+    for _ in range(case.ticks):
+        started = time.perf_counter()
+        play_tick(profiler)
+        elapsed += time.perf_counter() - started
+        calibrations.append(calibrate())
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # reported in bytes there, kilobytes on Linux
+        peak_kb //= 1024
+    return {
+        "case": case.key,
+        "planets": case.planets,
+        "players": case.players,
+        "load": case.load,
+        "ticks": case.ticks,
+        "init_s": init_s,
+        "tick_mean_ms": elapsed * 1000.0 / case.ticks,
+        "phases": {
+            # The profiler's window spans every measured tick, so these quantiles cover the whole case.
+            phase: {"mean_ms": stats["mean_ms"], "p50_ms": stats["window_p50_ms"], "p95_ms": stats["window_p95_ms"]}
+            for phase, stats in profiler.summary().items()
+        },
+        "fleets_in_flight": profiler.gauge_values().get("fleets_in_flight", 0),
+        "peak_rss_mb": peak_kb / 1024.0,
+        "calibration_ms": statistics.median(calibrations),
+    }
+
+
+def build_cases(planets: list[int], players: list[int], loads: list[str], ticks: int) -> list[BenchCase]:
+    return [BenchCase(p, n, load, ticks) for p, n, load in itertools.product(planets, players, loads)]
+
+
+def run_suite(cases: list[BenchCase]) -> list[dict[str, Any]]:
+    """Run every case in its own worker process, one at a time, so timings and peak memory do not interfere."""
+    results = []
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(run_case, case).result())
+        print(format_row(results[-1]), file=sys.stderr, flush=True)
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[dict[str, Any]]:
+    """Phases whose median grew by more than `tolerance` (a fraction) over the baseline's.
+
+    Medians shrug off the odd GC pause, and the baseline is scaled by the
+    ratio of calibration times so machine speed does not read as a regression.
+    """
+    previous = {entry["case"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["case"])
+        if base is None:
+            continue
+        scale = result.get("calibration_ms", 1.0) / base.get("calibration_ms", 1.0)
+        for phase in TRACKED_PHASES:
+            now = result["phases"].get(phase, {}).get("p50_ms")
+            before = base["phases"].get(phase, {}).get("p50_ms")
+            if now is None or before is None:
+                continue
+            before *= scale
+            if now > before * (1.0 + tolerance) and now - before > NOISE_FLOOR_MS:
+                regressions.append(
+                    {"case": result["case"], "phase": phase, "baseline_ms": before, "current_ms": now}
+                )
+    return regressions
+
+
+def format_row(result: dict[str, Any]) -> str:
+    phases = result["phases"]
+    parts = " ".join(f"{phase}={phases[phase]['mean_ms']:.2f}" for phase in TRACKED_PHASES if phase in phases)
+    return (
+        f"{result['case']:<40} init={result['init_s']:.2f}s tick={result['tick_mean_ms']:.2f}ms "
+        f"rss={result['peak_rss_mb']:.0f}MB {parts}"
+    )
+
+
+def parse_ints(text: str) -> list[int]:
+    return [int(part) for part in text.split(",") if part]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Engine scaling benchmarks for Open Forest")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    parser.add_argument("--planets", type=parse_ints, default=None, help="Override planet counts, e.g. 1000,10000")
+    parser.add_argument("--players", type=parse_ints, default=None, help="Override player counts, e.g. 2,8")
+    parser.add_argument("--load", default=None, help="Override fleet loads, e.g. light,heavy")
+    parser.add_argument("--ticks", type=int, default=30, help="Profiled ticks per case")
+    parser.add_argument("--out", default=None, help="Write results JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per phase (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    grid = GRIDS[args.grid]
+    loads = args.load.split(",") if args.load else grid["loads"]
+    cases = build_cases(args.planets or grid["planets"], args.players or grid["players"], loads, args.ticks)
+    results = run_suite(cases)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        return
+    if not os.path.exists(args.baseline):
+        return
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['case']} {regression['phase']}: "
+            f"{regression['baseline_ms']:.2f}ms -> {regression['current_ms']:.2f}ms",
+            file=sys.stderr,
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
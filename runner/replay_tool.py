@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from server.replay import ACTION_REPLAY_SUFFIX, BinaryReplayReader, ReplayDesyncError, export_jsonl, resimulate
+from server.replay_stream import SERIES_COLUMNS, iter_replay, player_series
+
+
+def resimulated_tick(path: str, tick: int) -> dict:
+    """Re-simulate an actions-only replay up to `tick` and return that tick's full record."""
+    for _, record in resimulate(path):
+        if record["tick"] == tick:
+            return record
+    raise KeyError(f"tick {tick} is not in {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and convert Open Forest replays")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="Print a binary replay's metadata and tick range")
+    info.add_argument("replay")
+    tick = commands.add_parser("tick", help="Print one tick's record as JSON")
+    tick.add_argument("replay")
+    tick.add_argument("tick", type=int)
+    export = commands.add_parser("export", help="Convert a binary replay to JSONL")
+    export.add_argument("replay")
+    export.add_argument("out")
+    verify = commands.add_parser("verify", help="Re-simulate an actions-only replay and check every state hash")
+    verify.add_argument("replay")
+    series = commands.add_parser("csv", help="Write per-player score/planet/energy/fleet time series as CSV")
+    series.add_argument("replay")
+    series.add_argument("--out", default="-", help="CSV path (default: stdout)")
+    fields = commands.add_parser("fields", help="Stream selected fields of every tick as JSON lines")
+    fields.add_argument("replay")
+    fields.add_argument("field", nargs="+", help="dotted path such as state.scores or observations.2")
+    args = parser.parse_args()
+
+    if args.command == "csv":
+        out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+        try:
+            writer = csv.DictWriter(out, fieldnames=SERIES_COLUMNS)
+            writer.writeheader()
+            writer.writerows(player_series(args.replay))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return
+    if args.command == "fields":
+        for record in iter_replay(args.replay, args.field):
+            print(json.dumps(record, separators=(",", ":")))
+        return
+
+    if args.command == "export":
+        count = export_jsonl(args.replay, args.out)
+        print(f"wrote {count} ticks to {args.out}")
+        return
+    if args.command == "verify":
+        ticks = 0
+        try:
+            for _ in resimulate(args.replay, observe=False):
+                ticks += 1
+        except ReplayDesyncError as exc:
+            print(f"DESYNC {exc}")
+            sys.exit(1)
+        print(f"OK {ticks} ticks")
+        return
+    if args.command == "tick" and args.replay.endswith(ACTION_REPLAY_SUFFIX):
+        print(json.dumps(resimulated_tick(args.replay, args.tick), separators=(",", ":")))
+        return
+    with BinaryReplayReader(args.replay) as reader:
+        if args.command == "info":
+            first, last = (reader.ticks[0], reader.ticks[-1]) if reader.ticks else (None, None)
+            print(json.dumps({"metadata": reader.metadata, "ticks": len(reader), "first": first, "last": last}))
+        else:
+            print(json.dumps(reader.read_tick(args.tick), separators=(",", ":")))
+
+
+if __name__ == "__main__":
+    main()
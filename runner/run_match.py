@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
+import itertools
 import json
 import os
 import queue
@@ -8,12 +10,22 @@ import subprocess
 import sys
 import threading
 import time
-from typing import Any
+from typing import Any, Callable
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from server.delta import OBSERVATION_DELTA, ObservationDeltaEncoder, negotiate_features
 from server.engine import GameState
 from server.models import MatchConfig
-from server.replay import ReplayLogger
-from server.utils import json_dumps, sha256_hex
+from server.profiling import TickProfiler
+from server.replay import open_replay_logger
+from server.utils import copy_json, json_dumps, sha256_hex
+
+
+# How long subprocess bots get, together, to answer the observation-delta offer.
+HANDSHAKE_TIMEOUT_S = 1.0
 
 
 class BotProcess:
@@ -35,10 +47,13 @@ class BotProcess:
         for line in self.proc.stdout:
             self.queue.put(line)
 
-    def send(self, payload: dict[str, Any]) -> None:
+    def send(self, payload: dict[str, Any]) -> int:
+        """Write one JSON line to the bot and return its size in bytes."""
         assert self.proc.stdin is not None
-        self.proc.stdin.write(json.dumps(payload) + "\n")
+        line = json.dumps(payload) + "\n"
+        self.proc.stdin.write(line)
         self.proc.stdin.flush()
+        return len(line)
 
     def recv(self, timeout: float) -> dict[str, Any] | None:
         try:
@@ -54,12 +69,169 @@ class BotProcess:
             pass
 
 
+def negotiate_deltas(
+    bots: list[BotProcess], config: MatchConfig, timeout_s: float = HANDSHAKE_TIMEOUT_S
+) -> dict[int, ObservationDeltaEncoder]:
+    """Offer delta observations to every bot; bots that do not answer get full observations.
+
+    All bots share one `timeout_s` deadline, so bots that ignore the offer
+    (any non-SDK script) delay startup by at most `timeout_s` in total.
+    """
+    encoders: dict[int, ObservationDeltaEncoder] = {}
+    if config.observation_keyframe_interval <= 0:
+        return encoders
+    for bot in bots:
+        bot.send({"type": "hello", "features": [OBSERVATION_DELTA]})
+    deadline = time.perf_counter() + timeout_s
+    for player_id, bot in enumerate(bots):
+        reply = bot.recv(max(0.0, deadline - time.perf_counter()))
+        if not reply or reply.get("type") != "hello":
+            continue
+        if OBSERVATION_DELTA in negotiate_features(reply.get("features")):
+            encoders[player_id] = ObservationDeltaEncoder(config.observation_keyframe_interval)
+    return encoders
+
+
 def load_config(path: str) -> MatchConfig:
     with open(path, "r", encoding="utf-8") as file:
         raw = json.load(file)
     return MatchConfig(**raw)
 
 
+BotFn = Callable[[dict[str, Any]], list[dict[str, Any]]]
+
+
+_fresh_loads = itertools.count()
+
+
+def load_bot_function(path: str, fresh: bool = False) -> BotFn:
+    """Import a Python bot script in-process and return its `bot(observation)` function.
+
+    With `fresh`, the script is executed again under a new module name, so its
+    module-level state is not shared with any other load; release it with
+    `unload_bot_function` when the match is over.
+    """
+    path = os.path.abspath(path)
+    module_name = "_openforest_bot_" + "".join(c if c.isalnum() else "_" for c in path)
+    if fresh:
+        module_name += f"__{next(_fresh_loads)}"
+    module = None if fresh else sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None or spec.loader is None:
+            raise ValueError(f"cannot load bot script {path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+    bot_fn = getattr(module, "bot", None)
+    if not callable(bot_fn):
+        raise ValueError(f"{path} does not define a bot(observation) function")
+    return bot_fn
+
+
+def unload_bot_function(bot_fn: BotFn) -> None:
+    sys.modules.pop(getattr(bot_fn, "__module__", ""), None)
+
+
+def run_headless(
+    config: MatchConfig,
+    bot_paths: list[str],
+    replay_path: str | None = None,
+    budget_s: float | None = None,
+    profiler: TickProfiler | None = None,
+) -> dict[str, Any]:
+    """Run a match in-process as fast as the bots answer and return run statistics.
+
+    Bots are called directly with no commit/reveal round trip, subprocess or
+    tick sleep. Each bot gets its own copy of its observation, since the
+    engine's encodings are shared between seats, later ticks and the replay,
+    so a bot may mutate what it is given. The match stops early once
+    `budget_s` seconds of wall time have been used. Pass a `profiler` to keep
+    the per-phase histograms and gauges after the run.
+    """
+    state = GameState(config, [f"Bot {i}" for i in range(len(bot_paths))])
+    profiler = profiler or TickProfiler()
+    state.profiler = profiler
+    # Every seat gets its own copy of its script, so bots never share module-level state.
+    bot_fns: list[BotFn] = []
+    replay = None
+    try:
+        for path in bot_paths:
+            bot_fns.append(load_bot_function(path, fresh=True))
+        replay = (
+            open_replay_logger(os.path.abspath(replay_path), config.replay_keyframe_interval, state)
+            if replay_path
+            else None
+        )
+
+        # Without a full replay nothing reads the snapshot's planets, so they are never encoded in bulk.
+        include_planets = replay is not None and replay.records_state
+        started = time.perf_counter()
+        observations = {player.id: state.observation_for_player(player.id) for player in state.players}
+        truncated = False
+        for _ in range(config.match_ticks):
+            if budget_s is not None and time.perf_counter() - started >= budget_s:
+                truncated = True
+                break
+            profiler.start()
+            actions_by_player: dict[int, list[dict[str, Any]]] = {}
+            for player_id, bot_fn in enumerate(bot_fns):
+                try:
+                    actions = bot_fn(copy_json(observations[player_id]))
+                except (Exception, SystemExit):
+                    # A bot that raises or calls sys.exit() just sends nothing this tick.
+                    continue
+                if isinstance(actions, list):
+                    actions_by_player[player_id] = actions
+            profiler.lap("bots")
+
+            snapshot = state.advance_tick(actions_by_player, include_planets)
+            observations = {
+                player.id: state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
+                for player in state.players
+            }
+            profiler.lap("observations")
+            if replay is not None:
+                replay.log_tick(snapshot["tick"], snapshot, observations, actions_by_player)
+                profiler.lap("replay")
+    finally:
+        try:
+            # Also on errors, so the ticks played so far end up in a readable replay.
+            if replay is not None:
+                replay.close()
+        finally:
+            for bot_fn in bot_fns:
+                unload_bot_function(bot_fn)
+    wall_s = time.perf_counter() - started
+    return {
+        "seed": config.seed,
+        "bots": bot_paths,
+        "ticks": state.tick,
+        "truncated": truncated,
+        "wall_s": wall_s,
+        "ticks_per_sec": state.tick / wall_s if wall_s > 0 else 0.0,
+        "phases": profiler.summary(),
+        "gauges": profiler.gauge_values(),
+        "scores": [
+            {"id": p.id, "name": p.name, "bot": bot_paths[p.id], "score": p.score, "artifacts_held": p.artifacts_held}
+            for p in state.players
+        ],
+    }
+
+
+def resolve_bot_paths(bot_paths: list[str], players: int) -> list[str]:
+    bot_paths = list(bot_paths)
+    if not bot_paths:
+        bot_paths = [os.path.join("bots", "python", "random_bot.py")]
+    while len(bot_paths) < players:
+        bot_paths.append(bot_paths[len(bot_paths) % len(bot_paths)])
+    return bot_paths[:players]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Local match runner for Open Forest")
     parser.add_argument("--config", default="config.json")
@@ -67,39 +239,67 @@ def main() -> None:
     parser.add_argument("--players", type=int, default=4)
     parser.add_argument("--bot", action="append", default=[], help="Path to python bot script")
     parser.add_argument("--replay", default=None)
+    parser.add_argument("--headless", action="store_true", help="Run bots in-process with no timeouts")
+    parser.add_argument("--budget", type=float, default=None, help="Headless wall-clock budget in seconds")
+    parser.add_argument("--stats", default=None, help="Write per-phase timing statistics JSON to this path")
+    parser.add_argument(
+        "--handshake-timeout",
+        type=float,
+        default=HANDSHAKE_TIMEOUT_S,
+        help="Seconds all bots get together to answer the observation-delta offer",
+    )
     args = parser.parse_args()
 
     config = load_config(os.path.abspath(args.config))
     if args.seed is not None:
         config.seed = args.seed
+    bot_paths = resolve_bot_paths(args.bot, args.players)
+
+    if args.headless:
+        stats = run_headless(config, bot_paths, args.replay, args.budget)
+        print(json.dumps(stats, indent=2))
+        if args.stats:
+            with open(args.stats, "w", encoding="utf-8") as file:
+                json.dump(stats, file, indent=2)
+        return
+
     player_names = [f"Bot {i}" for i in range(args.players)]
     state = GameState(config, player_names)
 
     bots: list[BotProcess] = []
-    bot_paths = args.bot
-    if not bot_paths:
-        bot_paths = [os.path.join("bots", "python", "random_bot.py")]
-    while len(bot_paths) < args.players:
-        bot_paths.append(bot_paths[len(bot_paths) % len(bot_paths)])
-
-    for path in bot_paths[: args.players]:
+    for path in bot_paths:
         bots.append(BotProcess(path))
 
     if args.replay is None:
         timestamp = int(time.time())
-        args.replay = os.path.join("replays", f"local_match_{timestamp}.jsonl")
-    replay = ReplayLogger(os.path.abspath(args.replay))
+        args.replay = os.path.join("replays", f"local_match_{timestamp}.ofr")
+    replay = open_replay_logger(os.path.abspath(args.replay), config.replay_keyframe_interval, state)
 
+    profiler = TickProfiler()
+    state.profiler = profiler
+    encoders = negotiate_deltas(bots, config, args.handshake_timeout)
     observations = {player.id: state.observation_for_player(player.id) for player in state.players}
 
     for _ in range(config.match_ticks):
+        profiler.start()
         commits: dict[int, str] = {}
         for player_id, bot in enumerate(bots):
-            bot.send({"type": "commit", "tick": state.tick, "observation": observations[player_id]})
+            message: dict[str, Any] = {"type": "commit", "tick": state.tick}
+            if player_id in encoders:
+                message["observation_delta"] = encoders[player_id].encode(observations[player_id])
+            else:
+                message["observation"] = observations[player_id]
+            sent = bot.send(message)
+            profiler.gauge("observation_payload_bytes", sent, {"player": player_id})
 
         for player_id, bot in enumerate(bots):
             reply = bot.recv(config.commit_timeout_ms / 1000.0)
+            while reply is not None and reply.get("type") == "hello":
+                # A late answer to the delta offer; the bot keeps getting full observations.
+                reply = bot.recv(config.commit_timeout_ms / 1000.0)
             if reply and reply.get("type") == "commit" and reply.get("tick") == state.tick:
+                if player_id in encoders:
+                    encoders[player_id].handle_reply(reply)
                 commit = reply.get("commit")
                 if isinstance(commit, str):
                     commits[player_id] = commit
@@ -123,17 +323,24 @@ def main() -> None:
             if sha256_hex(json_dumps(actions) + nonce) != commits.get(player_id):
                 continue
             actions_by_player[player_id] = actions
+        profiler.lap("bots")
 
-        snapshot = state.advance_tick(actions_by_player)
+        snapshot = state.advance_tick(actions_by_player, include_planets=replay.records_state)
         processed_tick = snapshot["tick"]
         observations = {
             player.id: state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
             for player in state.players
         }
+        profiler.lap("observations")
         replay.log_tick(processed_tick, snapshot, observations, actions_by_player)
+        profiler.lap("replay")
 
+    replay.close()
     for bot in bots:
         bot.close()
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as file:
+            json.dump({"phases": profiler.summary(), "gauges": profiler.gauge_values()}, file, indent=2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from runner.run_match import load_config, resolve_bot_paths, run_headless
+from server.models import MatchConfig
+
+
+def parse_seeds(spec: str) -> list[int]:
+    """Parse a seed list such as `1-100`, `7,9,11` or `1-10,50`."""
+    seeds: list[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        if sep and start:
+            first, last = int(start), int(end)
+            if last < first:
+                raise ValueError(f"empty seed range {part!r}")
+            seeds.extend(range(first, last + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def seat_bots(roster: list[str], players: int, seed: int) -> list[str]:
+    """Fill the seats for one match, rotating the roster by seed so no bot always gets seat 0.
+
+    The whole roster is rotated before seats are taken, so with more bots
+    than seats every bot still gets to play across seeds.
+    """
+    bot_paths = resolve_bot_paths(roster, max(players, len(roster)))
+    shift = seed % len(bot_paths)
+    return (bot_paths[shift:] + bot_paths[:shift])[:players]
+
+
+class MatchTimeout(BaseException):
+    """Raised in a worker when a match overruns `timeout_s`.
+
+    A `BaseException`, so the headless runner's handler around bot calls
+    cannot swallow it.
+    """
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise MatchTimeout()
+
+
+def play_match(
+    config: MatchConfig, bot_paths: list[str], budget_s: float | None = None, timeout_s: float | None = None
+) -> dict[str, Any]:
+    """Run one headless match and return its result row; errors are reported, not raised.
+
+    `budget_s` ends the match cleanly between ticks, while `timeout_s` is a
+    hard limit that also interrupts a bot that never returns, so a stuck bot
+    cannot hold its pool worker forever. The hard limit uses `SIGALRM` and
+    only applies on platforms that have it, in the process's main thread.
+    """
+    timed = (
+        timeout_s is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if timed:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    try:
+        try:
+            stats = run_headless(config, bot_paths, budget_s=budget_s)
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+    except MatchTimeout:
+        return {"seed": config.seed, "bots": bot_paths, "error": f"timed out after {timeout_s}s"}
+    except BaseException:
+        # Including `SystemExit` from a bot or its import, which must not end the worker's tournament.
+        return {"seed": config.seed, "bots": bot_paths, "error": traceback.format_exc()}
+    scores = [entry["score"] for entry in stats["scores"]]
+    best = max(scores)
+    return {
+        "seed": config.seed,
+        "bots": bot_paths,
+        "ticks": stats["ticks"],
+        "truncated": stats["truncated"],
+        "wall_s": stats["wall_s"],
+        "scores": scores,
+        "winners": [seat for seat, score in enumerate(scores) if score == best],
+    }
+
+
+def aggregate(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Summarise match rows into per-bot win rates and averages.
+
+    A bot filling several seats is counted once per seat. Tied winners
+    split the win, so win rates across all bots sum to the number of
+    completed matches.
+    """
+    bots: dict[str, dict[str, float]] = {}
+    completed = [row for row in results if "error" not in row]
+    for row in completed:
+        winners = row["winners"]
+        for seat, bot_path in enumerate(row["bots"]):
+            entry = bots.setdefault(bot_path, {"seats": 0, "wins": 0.0, "score_total": 0.0})
+            entry["seats"] += 1
+            entry["score_total"] += row["scores"][seat]
+            if seat in winners:
+                entry["wins"] += 1.0 / len(winners)
+    return {
+        "matches": len(results),
+        "completed": len(completed),
+        "failed": sorted(row["seed"] for row in results if "error" in row),
+        "bots": {
+            bot_path: {
+                "seats": int(entry["seats"]),
+                "wins": entry["wins"],
+                "win_rate": entry["wins"] / entry["seats"],
+                "avg_score": entry["score_total"] / entry["seats"],
+            }
+            for bot_path, entry in sorted(bots.items())
+        },
+    }
+
+
+def run_tournament(
+    config: MatchConfig,
+    roster: list[str],
+    seeds: list[int],
+    players: int,
+    out_path: str,
+    workers: int | None = None,
+    budget_s: float | None = None,
+    timeout_s: float | None = None,
+) -> dict[str, Any]:
+    """Play one match per seed across a process pool, streaming rows to `out_path`.
+
+    Each finished match is appended to the JSONL file as soon as it completes
+    (in completion order), followed by a final `summary` line. At most
+    `2 * workers` matches are queued at once so huge seed lists do not pile
+    up in the pool's call queue. A match that kills its worker process
+    breaks the whole pool: the pool is replaced, and every match that was
+    in it is played again on its own, so only the culprit gets an error row.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    results: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    pending_seeds = iter(seeds)
+
+    def match_args(seed: int) -> tuple[Any, ...]:
+        return dataclasses.replace(config, seed=seed), seat_bots(roster, players, seed), budget_s, timeout_s
+
+    def play_alone(seed: int) -> dict[str, Any]:
+        with ProcessPoolExecutor(max_workers=1) as solo:
+            try:
+                return solo.submit(play_match, *match_args(seed)).result()
+            except BaseException:
+                # The worker itself died (e.g. a bot crashed or exited the interpreter).
+                return {"seed": seed, "error": traceback.format_exc()}
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with open(out_path, "w", encoding="utf-8") as out:
+            running: dict[Future[dict[str, Any]], int] = {}
+
+            def submit_next() -> None:
+                nonlocal pool
+                seed = next(pending_seeds, None)
+                if seed is None:
+                    return
+                try:
+                    future = pool.submit(play_match, *match_args(seed))
+                except BrokenProcessPool:
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                    future = pool.submit(play_match, *match_args(seed))
+                running[future] = seed
+
+            for _ in range(2 * workers):
+                submit_next()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed = running.pop(future)
+                    try:
+                        row = future.result()
+                    except BrokenProcessPool:
+                        row = play_alone(seed)
+                    except BaseException:
+                        row = {"seed": seed, "error": traceback.format_exc()}
+                    results.append(row)
+                    out.write(json.dumps({"type": "match", **row}) + "\n")
+                    out.flush()
+                    submit_next()
+
+            summary = aggregate(results)
+            summary["wall_s"] = time.perf_counter() - started
+            summary["workers"] = workers
+            out.write(json.dumps({"type": "summary", **summary}) + "\n")
+    finally:
+        pool.shutdown()
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel multi-seed tournament runner for Open Forest")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--seeds", required=True, help="Seeds to play, e.g. 1-1000 or 3,5,8")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--bot", action="append", default=[], help="Path to python bot script")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--budget", type=float, default=None, help="Per-match wall-clock budget in seconds")
+    parser.add_argument(
+        "--timeout", type=float, default=600.0, help="Hard per-match limit in seconds; stuck bots are interrupted"
+    )
+    parser.add_argument("--out", default=os.path.join("replays", "tournament.jsonl"))
+    args = parser.parse_args()
+
+    config = load_config(os.path.abspath(args.config))
+    roster = [os.path.abspath(path) for path in args.bot]
+    summary = run_tournament(
+        config, roster, parse_seeds(args.seeds), args.players, args.out, args.workers, args.budget, args.timeout
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
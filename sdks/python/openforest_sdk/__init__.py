@@ -1,5 +1,6 @@
 from .types import Action, ActionScan, ActionSendFleet, ActionUpgrade, Observation
 from .commit import commit_hash, canonical_actions
+from .delta import ObservationDecoder
 from .stdio import run_stdio
 from .http_bot import create_http_app
 
@@ -11,6 +12,7 @@ __all__ = [
     "Observation",
     "commit_hash",
     "canonical_actions",
+    "ObservationDecoder",
     "run_stdio",
     "create_http_app",
 ]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+OBSERVATION_DELTA = "observation_delta"
+SUPPORTED_FEATURES = [OBSERVATION_DELTA]
+ENTITY_KEYS = ("planets", "fleets", "pings")
+MAX_RETAINED_STATES = 64
+
+
+class ObservationDecoder:
+    """Rebuilds full observations from the server's keyframe/delta messages.
+
+    Decoded states are kept privately as bases for later deltas; `apply`
+    hands out a copy, so a bot may freely mutate its observation.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[int, dict[str, Any]] = {}
+
+    def apply(self, message: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the full observation, or None if the delta's base is unknown."""
+        seq = message.get("seq")
+        if message.get("mode") == "keyframe":
+            observation = message.get("observation", {})
+        else:
+            base = self._states.get(message.get("base_seq"))
+            if base is None:
+                return None
+            observation = _apply_delta(base, message)
+            self._prune(message["base_seq"])
+        if isinstance(seq, int):
+            self._states[seq] = observation
+            while len(self._states) > MAX_RETAINED_STATES:
+                del self._states[min(self._states)]
+        return _copy(observation)
+
+    def _prune(self, oldest: int) -> None:
+        for seq in [s for s in self._states if s < oldest]:
+            del self._states[seq]
+
+
+def read_commit_observation(
+    message: dict[str, Any], decoder: ObservationDecoder
+) -> tuple[dict[str, Any] | None, dict[str, Any]]:
+    """Extract the observation from a commit message plus the ack/resync fields to reply with."""
+    if "observation_delta" not in message:
+        return message.get("observation", {}), {}
+    delta = message["observation_delta"]
+    observation = decoder.apply(delta)
+    if observation is None:
+        return None, {"resync": True}
+    return observation, {"ack": delta.get("seq")}
+
+
+def _apply_delta(base: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    observation = {key: value for key, value in base.items() if key not in delta.get("removed", [])}
+    observation.update(delta.get("changed", {}))
+    for key in ENTITY_KEYS:
+        changes = delta.get(key)
+        if changes is None:
+            continue
+        items = {item["id"]: item for item in observation.get(key, [])}
+        for item_id in changes.get("remove", []):
+            items.pop(item_id, None)
+        for patch in changes.get("upsert", []):
+            previous = items.get(patch["id"])
+            items[patch["id"]] = {**previous, **patch} if previous is not None else patch
+        observation[key] = [items[item_id] for item_id in sorted(items)]
+    return observation
+
+
+def _copy(value: Any) -> Any:
+    """Deep copy of JSON-shaped data, without `copy.deepcopy`'s memo bookkeeping."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
@@ -6,6 +6,7 @@ from typing import Any, Callable
 from fastapi import FastAPI
 
 from .commit import commit_hash
+from .delta import SUPPORTED_FEATURES, ObservationDecoder, read_commit_observation
 
 
 BotFn = Callable[[dict[str, Any]], list[dict[str, Any]]]
@@ -14,18 +15,21 @@ BotFn = Callable[[dict[str, Any]], list[dict[str, Any]]]
 def create_http_app(bot_fn: BotFn) -> FastAPI:
     app = FastAPI()
     pending: dict[int, tuple[list[dict[str, Any]], str]] = {}
+    decoder = ObservationDecoder()
 
     @app.post("/act")
     async def act(payload: dict[str, Any]) -> dict[str, Any]:
         phase = payload.get("phase")
         tick = int(payload.get("tick", 0))
+        if phase == "hello":
+            offered = payload.get("features", [])
+            return {"features": [f for f in SUPPORTED_FEATURES if f in offered]}
         if phase == "commit":
-            observation = payload.get("observation", {})
-            actions = bot_fn(observation)
+            observation, sync = read_commit_observation(payload, decoder)
+            actions = bot_fn(observation) if observation is not None else []
             nonce = secrets.token_hex(8)
             pending[tick] = (actions, nonce)
-            commit = commit_hash(actions, nonce)
-            return {"commit": commit}
+            return {"commit": commit_hash(actions, nonce), **sync}
         if phase == "reveal":
             actions, nonce = pending.pop(tick, ([], ""))
             return {"actions": actions, "nonce": nonce}
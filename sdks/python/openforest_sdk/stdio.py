@@ -6,13 +6,20 @@ import sys
 from typing import Any, Callable
 
 from .commit import commit_hash
+from .delta import SUPPORTED_FEATURES, ObservationDecoder, read_commit_observation
 
 
 BotFn = Callable[[dict[str, Any]], list[dict[str, Any]]]
 
 
+def _write(response: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(response) + "\n")
+    sys.stdout.flush()
+
+
 def run_stdio(bot_fn: BotFn) -> None:
     pending: dict[int, tuple[list[dict[str, Any]], str]] = {}
+    decoder = ObservationDecoder()
     for line in sys.stdin:
         line = line.strip()
         if not line:
@@ -20,17 +27,15 @@ def run_stdio(bot_fn: BotFn) -> None:
         message = json.loads(line)
         msg_type = message.get("type")
         tick = message.get("tick")
-        if msg_type == "commit":
-            observation = message.get("observation", {})
-            actions = bot_fn(observation)
+        if msg_type == "hello":
+            offered = message.get("features", [])
+            _write({"type": "hello", "features": [f for f in SUPPORTED_FEATURES if f in offered]})
+        elif msg_type == "commit":
+            observation, sync = read_commit_observation(message, decoder)
+            actions = bot_fn(observation) if observation is not None else []
             nonce = secrets.token_hex(8)
             pending[int(tick)] = (actions, nonce)
-            commit = commit_hash(actions, nonce)
-            response = {"type": "commit", "tick": tick, "commit": commit}
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
+            _write({"type": "commit", "tick": tick, "commit": commit_hash(actions, nonce), **sync})
         elif msg_type == "reveal":
             actions, nonce = pending.pop(int(tick), ([], ""))
-            response = {"type": "reveal", "tick": tick, "actions": actions, "nonce": nonce}
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
+            _write({"type": "reveal", "tick": tick, "actions": actions, "nonce": nonce})
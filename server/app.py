@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
+import dataclasses
 import json
 import os
 import time
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 import uvicorn
 
-from .bot_manager import BotManager
-from .engine import GameState
+from .matches import Match, MatchRegistry
 from .models import MatchConfig
-from .replay import ReplayLogger
+
+# Id of the match started with the server and served on the unprefixed routes.
+DEFAULT_MATCH = "default"
 
 
 def load_config(path: str) -> MatchConfig:
@@ -22,123 +25,182 @@ def load_config(path: str) -> MatchConfig:
     return MatchConfig(**raw)
 
 
+class MatchOverrides(BaseModel):
+    """The `MatchConfig` fields an HTTP client may override, bounded so one request cannot starve the server."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    seed: int | None = None
+    tick_ms: int | None = Field(None, ge=1, le=60_000)
+    match_ticks: int | None = Field(None, ge=1, le=100_000)
+    planet_count: int | None = Field(None, ge=1, le=20_000)
+    artifact_count: int | None = Field(None, ge=0, le=64)
+    max_actions_per_tick: int | None = Field(None, ge=0, le=64)
+    commit_timeout_ms: int | None = Field(None, ge=1, le=60_000)
+    reveal_timeout_ms: int | None = Field(None, ge=1, le=60_000)
+    player_home_min_distance: float | None = Field(None, ge=0.0, le=2.0)
+    observation_keyframe_interval: int | None = Field(None, ge=0, le=10_000)
+    replay_keyframe_interval: int | None = Field(None, ge=0, le=10_000)
+    rng_version: Literal[1, 2] | None = None
+    planet_store: Literal["objects", "arrays"] | None = None
+
+
+class MatchRequest(BaseModel):
+    players: int = Field(4, ge=1, le=64)
+    http_bots: list[str] = []
+    # MatchConfig fields to override on top of the server's config file; checked against `MatchOverrides`.
+    config: dict[str, Any] = {}
+    match_id: str | None = Field(None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+
+
 def create_app(
     config_path: str | None = None,
     player_count: int = 4,
     http_bots: list[str] | None = None,
     replay_path: str | None = None,
+    replay_policy: str = "block",
+    replay_queue: int = 256,
+    spectator_queue: int = 2,
+    max_matches: int = 64,
+    default_match: bool = True,
 ) -> FastAPI:
+    """Build the server app.
+
+    With `default_match`, a match with id `default` starts with the server
+    and is also served on the unprefixed routes (`/status`, `/ws/player/{id}`,
+    `/ws/spectator`, `/metrics`). More matches can be created over HTTP and
+    live under `/matches/{id}/...`.
+    """
     config_path = config_path or os.path.join(os.path.dirname(__file__), "..", "config.json")
     config_path = os.path.abspath(config_path)
     config = load_config(config_path)
-    player_names = [f"Player {i}" for i in range(player_count)]
-    game_state = GameState(config, player_names)
-    bot_manager = BotManager(config.commit_timeout_ms, config.reveal_timeout_ms)
-
-    if http_bots:
-        for idx, url in enumerate(http_bots):
-            if idx < player_count:
-                bot_manager.register_http(idx, url)
-
-    if replay_path is None:
-        timestamp = int(time.time())
-        replay_path = os.path.join(os.path.dirname(__file__), "..", "replays", f"match_{timestamp}.jsonl")
-    replay_logger = ReplayLogger(os.path.abspath(replay_path))
+    replay_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "replays"))
+    registry = MatchRegistry(replay_dir, max_active=max_matches)
+    match_options = {"replay_policy": replay_policy, "replay_queue": replay_queue, "spectator_queue": spectator_queue}
+    if default_match:
+        if replay_path is None:
+            replay_path = os.path.join(replay_dir, f"match_{int(time.time())}.ofr")
+        registry.create(
+            config, DEFAULT_MATCH, player_count=player_count, http_bots=http_bots, replay_path=replay_path, **match_options
+        )
 
     app = FastAPI()
     app.state.config = config
-    app.state.game_state = game_state
-    app.state.bot_manager = bot_manager
-    app.state.replay_logger = replay_logger
-    app.state.spectators: list[dict[str, Any]] = []
-    app.state.latest_observations: dict[int, dict[str, Any]] = {}
+    app.state.matches = registry
+
+    def find_match(match_id: str) -> Match:
+        try:
+            return registry.get(match_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"no match {match_id!r}") from None
 
     @app.on_event("startup")
-    async def start_match() -> None:
-        asyncio.create_task(run_match(app))
+    async def start_matches() -> None:
+        for match in registry.list():
+            match.start()
+
+    @app.on_event("shutdown")
+    async def stop_matches() -> None:
+        await registry.close()
+
+    @app.get("/matches")
+    async def list_matches() -> list[dict[str, Any]]:
+        return [match.summary() for match in registry.list()]
+
+    @app.post("/matches", status_code=201)
+    async def create_match(request: MatchRequest) -> dict[str, Any]:
+        if request.match_id in registry.matches:
+            raise HTTPException(status_code=409, detail=f"match {request.match_id!r} already exists")
+        try:
+            overrides = MatchOverrides.model_validate(request.config).model_dump(exclude_none=True)
+        except ValidationError as exc:
+            raise HTTPException(status_code=400, detail=exc.errors(include_url=False)) from None
+        try:
+            match_config = dataclasses.replace(config, **overrides)
+            match = registry.start(
+                match_config, request.match_id, player_count=request.players, http_bots=request.http_bots, **match_options
+            )
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from None
+        except RuntimeError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from None
+        return match.summary()
+
+    @app.get("/matches/{match_id}")
+    async def match_status(match_id: str) -> dict[str, Any]:
+        return find_match(match_id).summary()
+
+    @app.delete("/matches/{match_id}")
+    async def cancel_match(match_id: str) -> dict[str, Any]:
+        find_match(match_id)
+        return (await registry.cancel(match_id)).summary()
+
+    @app.get("/matches/{match_id}/metrics", response_class=PlainTextResponse)
+    async def match_metrics(match_id: str) -> PlainTextResponse:
+        text = find_match(match_id).state.profiler.render_prometheus()
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    @app.websocket("/matches/{match_id}/ws/player/{player_id}")
+    async def match_ws_player(websocket: WebSocket, match_id: str, player_id: int) -> None:
+        await serve_player(websocket, registry.matches.get(match_id), player_id)
+
+    @app.websocket("/matches/{match_id}/ws/spectator")
+    async def match_ws_spectator(websocket: WebSocket, match_id: str) -> None:
+        await serve_spectator(websocket, registry.matches.get(match_id))
 
     @app.get("/status")
     async def status() -> dict[str, Any]:
+        match = find_match(DEFAULT_MATCH)
         return {
-            "tick": app.state.game_state.tick,
-            "match_ticks": app.state.config.match_ticks,
-            "players": [p.name for p in app.state.game_state.players],
+            "tick": match.state.tick,
+            "match_ticks": match.config.match_ticks,
+            "players": [p.name for p in match.state.players],
         }
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        return await match_metrics(DEFAULT_MATCH)
+
     @app.websocket("/ws/player/{player_id}")
     async def ws_player(websocket: WebSocket, player_id: int) -> None:
-        await websocket.accept()
-        app.state.bot_manager.register_ws(player_id, websocket)
-        queue = app.state.bot_manager.ws_connections[player_id]["queue"]
-        try:
-            while True:
-                data = await websocket.receive_json()
-                await queue.put(data)
-        except WebSocketDisconnect:
-            return
+        await serve_player(websocket, registry.matches.get(DEFAULT_MATCH), player_id)
 
     @app.websocket("/ws/spectator")
     async def ws_spectator(websocket: WebSocket) -> None:
-        await websocket.accept()
-        spectator = {"ws": websocket, "player_id": None, "omniscient": True}
-        app.state.spectators.append(spectator)
-        try:
-            while True:
-                data = await websocket.receive_json()
-                if data.get("type") == "set_perspective":
-                    spectator["player_id"] = data.get("player_id")
-                    spectator["omniscient"] = bool(data.get("omniscient"))
-        except WebSocketDisconnect:
-            app.state.spectators.remove(spectator)
+        await serve_spectator(websocket, registry.matches.get(DEFAULT_MATCH))
 
     return app
 
 
-async def run_match(app: FastAPI) -> None:
-    state: GameState = app.state.game_state
-    config: MatchConfig = app.state.config
-    bot_manager: BotManager = app.state.bot_manager
-    replay_logger: ReplayLogger = app.state.replay_logger
-
-    observations: dict[int, dict[str, Any]] = {
-        player.id: state.observation_for_player(player.id) for player in state.players
-    }
-    app.state.latest_observations = observations
-
-    for _ in range(config.match_ticks):
-        await bot_manager.commit_phase(state.tick, observations)
-        actions = await bot_manager.reveal_phase(state.tick)
-        snapshot = state.advance_tick(actions)
-        processed_tick = snapshot["tick"]
-        observations = {
-            player.id: state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
-            for player in state.players
-        }
-        app.state.latest_observations = observations
-        replay_logger.log_tick(processed_tick, snapshot, observations, actions)
-        await broadcast_spectators(app, observations)
-        await asyncio.sleep(config.tick_ms / 1000.0)
-
-
-async def broadcast_spectators(app: FastAPI, observations: dict[int, dict[str, Any]]) -> None:
-    state: GameState = app.state.game_state
-    spectators = list(app.state.spectators)
-    for spectator in spectators:
-        ws: WebSocket = spectator["ws"]
-        try:
-            if spectator.get("omniscient"):
-                payload = state.observation_omniscient()
-            else:
-                player_id = spectator.get("player_id")
-                payload = observations.get(player_id, state.observation_omniscient())
-            await ws.send_json({"type": "state", "payload": payload})
-        except Exception:
-            try:
-                await ws.close()
-            except Exception:
-                pass
-            if spectator in app.state.spectators:
-                app.state.spectators.remove(spectator)
+async def serve_player(websocket: WebSocket, match: Match | None, player_id: int) -> None:
+    if match is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    match.bot_manager.register_ws(player_id, websocket)
+    queue = match.bot_manager.ws_connections[player_id]["queue"]
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if data.get("type") == "hello":
+                await match.bot_manager.hello_ws(player_id, data)
+                continue
+            await queue.put(data)
+    except WebSocketDisconnect:
+        return
+
+
+async def serve_spectator(websocket: WebSocket, match: Match | None) -> None:
+    if match is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    spectator = match.spectators.add(websocket)
+    try:
+        while True:
+            match.spectators.handle_message(spectator, await websocket.receive_json())
+    except WebSocketDisconnect:
+        match.spectators.remove(spectator)
 
 
 app = create_app()
@@ -149,12 +211,36 @@ def main() -> None:
     parser.add_argument("--config", default=None, help="Path to config.json")
     parser.add_argument("--players", type=int, default=4, help="Number of players")
     parser.add_argument("--http-bot", action="append", default=[], help="HTTP bot base URL")
-    parser.add_argument("--replay", default=None, help="Replay JSONL output path")
+    parser.add_argument("--replay", default=None, help="Replay output path (.ofr binary, or .jsonl)")
+    parser.add_argument("--replay-queue", type=int, default=256, help="Ticks the replay writer may fall behind")
+    parser.add_argument(
+        "--replay-policy",
+        choices=["block", "drop_newest", "drop_oldest"],
+        default="block",
+        help="What to do when the replay writer falls behind",
+    )
+    parser.add_argument(
+        "--spectator-queue", type=int, default=2, help="Frames buffered per spectator before the oldest is dropped"
+    )
+    parser.add_argument("--max-matches", type=int, default=64, help="Matches that may run at once")
+    parser.add_argument(
+        "--no-default-match", action="store_true", help="Start empty and only host matches created via POST /matches"
+    )
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=8000)
     args = parser.parse_args()
 
-    app_instance = create_app(args.config, args.players, args.http_bot, args.replay)
+    app_instance = create_app(
+        args.config,
+        args.players,
+        args.http_bot,
+        args.replay,
+        args.replay_policy,
+        args.replay_queue,
+        args.spectator_queue,
+        args.max_matches,
+        not args.no_default_match,
+    )
     uvicorn.run(app_instance, host=args.host, port=args.port)
 
 
@@ -1,27 +1,70 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from typing import Any
 
 import httpx
 from fastapi import WebSocket
 
+from .delta import OBSERVATION_DELTA, ObservationDeltaEncoder, negotiate_features
 from .utils import json_dumps, sha256_hex
 
 
 class BotManager:
-    def __init__(self, commit_timeout_ms: int, reveal_timeout_ms: int) -> None:
+    def __init__(self, commit_timeout_ms: int, reveal_timeout_ms: int, keyframe_interval: int = 0) -> None:
         self.commit_timeout = commit_timeout_ms / 1000.0
         self.reveal_timeout = reveal_timeout_ms / 1000.0
+        self.keyframe_interval = keyframe_interval
         self.ws_connections: dict[int, dict[str, Any]] = {}
         self.http_bots: dict[int, str] = {}
         self.pending_commits: dict[int, str] = {}
+        self.delta_encoders: dict[int, ObservationDeltaEncoder] = {}
+        # Size of the last commit message sent to each bot, for metrics.
+        self.observation_bytes: dict[int, int] = {}
+        self._http_negotiated: set[int] = set()
 
     def register_ws(self, player_id: int, websocket: WebSocket) -> None:
         self.ws_connections[player_id] = {"ws": websocket, "queue": asyncio.Queue()}
+        self.delta_encoders.pop(player_id, None)
 
     def register_http(self, player_id: int, url: str) -> None:
         self.http_bots[player_id] = url.rstrip("/")
+        self._http_negotiated.discard(player_id)
+
+    def enable_features(self, player_id: int, requested: Any) -> list[str]:
+        """Accept the protocol features a bot asked for; delta mode needs a keyframe interval."""
+        accepted = negotiate_features(requested) if self.keyframe_interval > 0 else []
+        if OBSERVATION_DELTA in accepted:
+            self.delta_encoders[player_id] = ObservationDeltaEncoder(self.keyframe_interval)
+        else:
+            self.delta_encoders.pop(player_id, None)
+        return accepted
+
+    async def hello_ws(self, player_id: int, message: dict[str, Any]) -> None:
+        accepted = self.enable_features(player_id, message.get("features"))
+        await self.ws_connections[player_id]["ws"].send_json({"type": "hello", "features": accepted})
+
+    def _observation_fields(self, player_id: int, observation: dict[str, Any]) -> dict[str, Any]:
+        encoder = self.delta_encoders.get(player_id)
+        if encoder is None:
+            return {"observation": observation}
+        return {"observation_delta": encoder.encode(observation)}
+
+    def _commit_message(self, key: str, player_id: int, observation: dict[str, Any], tick: int) -> str:
+        """Serialize a commit request once, so its size can be recorded without encoding it twice."""
+        message = {key: "commit", "tick": tick, **self._observation_fields(player_id, observation)}
+        text = json.dumps(message, separators=(",", ":"))
+        self.observation_bytes[player_id] = len(text)
+        return text
+
+    def _handle_commit_reply(self, player_id: int, data: dict[str, Any]) -> None:
+        encoder = self.delta_encoders.get(player_id)
+        if encoder is not None:
+            encoder.handle_reply(data)
+        commit = data.get("commit")
+        if isinstance(commit, str):
+            self.pending_commits[player_id] = commit
 
     async def commit_phase(self, tick: int, observations: dict[int, dict[str, Any]]) -> None:
         self.pending_commits = {}
@@ -54,26 +97,40 @@ class BotManager:
         ws = self.ws_connections[player_id]["ws"]
         queue = self.ws_connections[player_id]["queue"]
         try:
-            await ws.send_json({"type": "commit", "tick": tick, "observation": observation})
+            await ws.send_text(self._commit_message("type", player_id, observation, tick))
             data = await asyncio.wait_for(queue.get(), timeout=self.commit_timeout)
             if data.get("type") != "commit" or data.get("tick") != tick:
                 return
-            commit = data.get("commit")
-            if isinstance(commit, str):
-                self.pending_commits[player_id] = commit
+            self._handle_commit_reply(player_id, data)
         except Exception:
             return
 
     async def _commit_http(self, player_id: int, observation: dict[str, Any], tick: int) -> None:
         url = self.http_bots[player_id]
-        payload = {"phase": "commit", "tick": tick, "observation": observation}
+        if player_id not in self._http_negotiated:
+            await self._hello_http(player_id)
+        payload = self._commit_message("phase", player_id, observation, tick)
+        try:
+            async with httpx.AsyncClient(timeout=self.commit_timeout) as client:
+                resp = await client.post(
+                    f"{url}/act", content=payload, headers={"Content-Type": "application/json"}
+                )
+                data = resp.json()
+            self._handle_commit_reply(player_id, data)
+        except Exception:
+            return
+
+    async def _hello_http(self, player_id: int) -> None:
+        self._http_negotiated.add(player_id)
+        if self.keyframe_interval <= 0:
+            return
+        url = self.http_bots[player_id]
+        payload = {"phase": "hello", "features": [OBSERVATION_DELTA]}
         try:
             async with httpx.AsyncClient(timeout=self.commit_timeout) as client:
                 resp = await client.post(f"{url}/act", json=payload)
                 data = resp.json()
-            commit = data.get("commit")
-            if isinstance(commit, str):
-                self.pending_commits[player_id] = commit
+            self.enable_features(player_id, data.get("features"))
         except Exception:
             return
 
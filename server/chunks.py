@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import random
+from bisect import insort
+from typing import Callable, Iterator
+
+from .models import MatchConfig, Planet
+from .spatial import MAP_MAX, MAP_MIN
+from .utils import clamp, deterministic_rng, distance
+from .worldgen import HOME_LEVEL, roll_level
+
+# Bounded search for spaced-out home chunks before falling back to any free chunk.
+HOME_ATTEMPTS_PER_PLAYER = 1000
+
+
+class ChunkedUniverse:
+    """Planets of a `world_chunks` map, generated one chunk at a time on first access.
+
+    The map is split into `side * side` square chunks of `per_chunk` planets
+    each, and planet `id` lives in chunk `id // per_chunk`. A chunk's planets
+    are a pure function of (seed, chunk), so they can be built whenever the
+    engine first reads one of its ids or calls `touch()` on an area that
+    overlaps it. Unowned planets only ever grow, so a chunk built after
+    `growth_steps` growth phases starts at `min(cap, start + steps * growth)`,
+    the closed form of the per-tick growth it skipped.
+
+    Indexing and `len()` cover every id on the map. Iteration only yields
+    planets that have been materialized, in id order.
+    """
+
+    def __init__(
+        self,
+        config: MatchConfig,
+        player_count: int,
+        level_distribution: list[tuple[int, float]],
+        stats_for_level: Callable[[int], dict[str, float]],
+        on_materialize: Callable[[list[Planet]], None],
+    ) -> None:
+        self.seed = config.seed
+        self.side = config.world_chunks
+        self.chunk_count = self.side * self.side
+        self.per_chunk = max(1, config.planet_count // self.chunk_count)
+        self.count = self.per_chunk * self.chunk_count
+        self.chunk_size = (MAP_MAX - MAP_MIN) / self.side
+        self.growth_steps = 0
+        self.level_distribution = level_distribution
+        self.stats_for_level = stats_for_level
+        self.on_materialize = on_materialize
+        self._chunks: dict[int, list[Planet]] = {}
+        self._order: list[int] = []
+        self.homes: dict[int, int] = {}
+        self.artifact_chunks: set[int] = set()
+
+        rng = deterministic_rng(config.seed, ["chunk_layout"])
+        self.homes = self._pick_homes(rng, player_count, config.player_home_min_distance)
+        home_chunks = {planet_id // self.per_chunk for planet_id in self.homes}
+        self.artifact_chunks = self._pick_chunks(rng, config.artifact_count, home_chunks)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, planet_id: int) -> Planet:
+        if planet_id < 0:
+            planet_id += self.count
+        if not 0 <= planet_id < self.count:
+            raise IndexError(planet_id)
+        chunk, local = divmod(planet_id, self.per_chunk)
+        planets = self._chunks.get(chunk)
+        if planets is None:
+            planets = self.materialize(chunk)
+        return planets[local]
+
+    def __iter__(self) -> Iterator[Planet]:
+        for chunk in self._order:
+            yield from self._chunks[chunk]
+
+    @property
+    def materialized_count(self) -> int:
+        return len(self._chunks) * self.per_chunk
+
+    def is_materialized(self, chunk: int) -> bool:
+        return chunk in self._chunks
+
+    def _axis_chunk(self, value: float) -> int:
+        return max(0, min(self.side - 1, int((value - MAP_MIN) / self.chunk_size)))
+
+    def touch(self, x: float, y: float, radius: float) -> None:
+        """Materialize every chunk overlapping the bounding box of a circle."""
+        if not (math.isfinite(x) and math.isfinite(y) and math.isfinite(radius)) or radius < 0:
+            return
+        col_min, col_max = self._axis_chunk(x - radius), self._axis_chunk(x + radius)
+        for row in range(self._axis_chunk(y - radius), self._axis_chunk(y + radius) + 1):
+            for col in range(col_min, col_max + 1):
+                chunk = row * self.side + col
+                if chunk not in self._chunks:
+                    self.materialize(chunk)
+
+    def materialize(self, chunk: int) -> list[Planet]:
+        planets = self.generate_chunk(chunk)
+        steps = self.growth_steps
+        if steps:
+            for planet in planets:
+                planet.energy = clamp(planet.energy + steps * planet.energy_growth, 0.0, planet.energy_cap)
+                planet.silver = clamp(planet.silver + steps * planet.silver_growth, 0.0, planet.silver_cap)
+        # Registered before the callback, which may touch neighbouring chunks.
+        self._chunks[chunk] = planets
+        insort(self._order, chunk)
+        self.on_materialize(planets)
+        return planets
+
+    def generate_chunk(self, chunk: int) -> list[Planet]:
+        """Build a chunk's planets as of tick 0; has no side effects."""
+        rng = deterministic_rng(self.seed, ["chunk", chunk])
+        row, col = divmod(chunk, self.side)
+        x0 = MAP_MIN + col * self.chunk_size
+        y0 = MAP_MIN + row * self.chunk_size
+        planets: list[Planet] = []
+        for local in range(self.per_chunk):
+            planet_id = chunk * self.per_chunk + local
+            x = x0 + rng.random() * self.chunk_size
+            y = y0 + rng.random() * self.chunk_size
+            level = roll_level(rng, self.level_distribution)
+            owner = self.homes.get(planet_id)
+            if owner is not None:
+                level = HOME_LEVEL
+            stats = self.stats_for_level(level)
+            energy_fraction, silver_fraction = (0.8, 0.5) if owner is not None else (0.5, 0.4)
+            # Filled in directly: Planet's generated __init__ would route every
+            # field through the change-listener hook in __setattr__.
+            planet = Planet.__new__(Planet)
+            planet.__dict__.update(
+                id=planet_id,
+                x=x,
+                y=y,
+                level=level,
+                energy=stats["energy_cap"] * energy_fraction,
+                energy_cap=stats["energy_cap"],
+                energy_growth=stats["energy_growth"],
+                silver=stats["silver_cap"] * silver_fraction,
+                silver_cap=stats["silver_cap"],
+                silver_growth=stats["silver_growth"],
+                defense=stats["defense"],
+                speed=stats["speed"],
+                sensor_range=stats["sensor_range"],
+                owner=owner,
+                is_artifact=False,
+            )
+            planets.append(planet)
+        if chunk in self.artifact_chunks:
+            candidates = [p for p in planets if p.owner is None]
+            if candidates:
+                max(candidates, key=lambda p: (p.level, -p.id)).is_artifact = True
+        return planets
+
+    def _pick_homes(self, rng: random.Random, players: int, min_distance: float) -> dict[int, int]:
+        """Map home planet id -> player, using planet 0 of randomly drawn, spaced-out chunks."""
+        chosen: list[tuple[int, float, float]] = []
+        seen: set[int] = set()
+        for _ in range(HOME_ATTEMPTS_PER_PLAYER * players):
+            if len(chosen) == players or len(seen) == self.chunk_count:
+                break
+            chunk = rng.randrange(self.chunk_count)
+            if chunk in seen:
+                continue
+            seen.add(chunk)
+            first = self.generate_chunk(chunk)[0]
+            if any(distance((first.x, first.y), (x, y)) < min_distance for _, x, y in chosen):
+                continue
+            chosen.append((first.id, first.x, first.y))
+        taken = {planet_id // self.per_chunk for planet_id, _, _ in chosen}
+        for chunk in range(self.chunk_count):
+            if len(chosen) >= players:
+                break
+            if chunk not in taken:
+                chosen.append((chunk * self.per_chunk, 0.0, 0.0))
+                taken.add(chunk)
+        return {planet_id: player_id for player_id, (planet_id, _, _) in enumerate(chosen)}
+
+    def _pick_chunks(self, rng: random.Random, count: int, exclude: set[int]) -> set[int]:
+        available = self.chunk_count - len(exclude)
+        picked: set[int] = set()
+        while len(picked) < min(count, available):
+            chunk = rng.randrange(self.chunk_count)
+            if chunk not in exclude:
+                picked.add(chunk)
+        return picked
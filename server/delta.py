@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+OBSERVATION_DELTA = "observation_delta"
+SUPPORTED_FEATURES = (OBSERVATION_DELTA,)
+ENTITY_KEYS = ("planets", "fleets", "pings")
+_MISSING = object()
+
+
+def negotiate_features(requested: Any) -> list[str]:
+    if not isinstance(requested, list):
+        return []
+    return [feature for feature in SUPPORTED_FEATURES if feature in requested]
+
+
+def diff_entities(base: dict[int, dict[str, Any]], current: list[dict[str, Any]]) -> dict[str, Any]:
+    """Field-level diff of an id-keyed entity list against the previous state.
+
+    New entities are sent whole, changed ones only carry `id` plus the fields
+    that differ, and vanished ids are listed under `remove`.
+    """
+    upsert: list[dict[str, Any]] = []
+    seen: set[int] = set()
+    for item in current:
+        item_id = item["id"]
+        seen.add(item_id)
+        previous = base.get(item_id)
+        if previous is None:
+            upsert.append(item)
+        elif previous is not item and previous != item:
+            patch = {key: value for key, value in item.items() if previous.get(key, _MISSING) != value}
+            patch["id"] = item_id
+            upsert.append(patch)
+    remove = [item_id for item_id in base if item_id not in seen]
+    return {"upsert": upsert, "remove": remove}
+
+
+class ObservationDeltaEncoder:
+    """Encodes one player's observations as deltas against the last acknowledged one.
+
+    Every message carries a `seq`. Deltas name the `base_seq` they apply to,
+    which is always the newest sequence the bot has acknowledged, and a full
+    keyframe is sent every `keyframe_interval` messages or after a resync.
+    """
+
+    def __init__(self, keyframe_interval: int) -> None:
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.seq = 0
+        self.acked_seq: int | None = None
+        self._since_keyframe = 0
+        self._force_keyframe = True
+        self._history: dict[int, dict[str, Any]] = {}
+
+    def encode(self, observation: dict[str, Any]) -> dict[str, Any]:
+        self.seq += 1
+        state = {
+            key: ({item["id"]: item for item in value} if key in ENTITY_KEYS else value)
+            for key, value in observation.items()
+        }
+        self._history[self.seq] = state
+        while len(self._history) > self.keyframe_interval + 1:
+            del self._history[next(iter(self._history))]
+        base = self._history.get(self.acked_seq) if self.acked_seq is not None else None
+        if self._force_keyframe or base is None or self._since_keyframe >= self.keyframe_interval:
+            self._force_keyframe = False
+            self._since_keyframe = 1
+            return {"mode": "keyframe", "seq": self.seq, "observation": observation}
+
+        self._since_keyframe += 1
+        changed = {
+            key: value
+            for key, value in observation.items()
+            if key not in ENTITY_KEYS and base.get(key, _MISSING) != value
+        }
+        removed = [key for key in base if key not in observation]
+        entities = {key: diff_entities(base.get(key, {}), observation.get(key, [])) for key in ENTITY_KEYS}
+        return {
+            "mode": "delta",
+            "seq": self.seq,
+            "base_seq": self.acked_seq,
+            "changed": changed,
+            "removed": removed,
+            **entities,
+        }
+
+    def ack(self, seq: Any) -> None:
+        if not isinstance(seq, int) or seq not in self._history:
+            return
+        if self.acked_seq is not None and seq <= self.acked_seq:
+            return
+        self.acked_seq = seq
+        for old_seq in [s for s in self._history if s < seq]:
+            del self._history[old_seq]
+
+    def request_keyframe(self) -> None:
+        self._force_keyframe = True
+
+    def handle_reply(self, reply: dict[str, Any]) -> None:
+        """Apply the `ack` / `resync` fields a bot attaches to its commit reply."""
+        if reply.get("resync"):
+            self.request_keyframe()
+        self.ack(reply.get("ack"))
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import hashlib
 import math
 import random
+import struct
 from typing import Any
 
+from .chunks import ChunkedUniverse
+from .fleets import FleetScheduler
 from .models import Action, Fleet, MatchConfig, Planet, Ping, PlayerState
-from .utils import clamp, deterministic_rng, distance
-
+from .planet_store import PlanetArrays, pack_planet_columns
+from .profiling import NULL_PROFILER, NullProfiler, TickProfiler
+from .scoring import CapRanking
+from .snapshot import GameSnapshot
+from .spatial import PlanetGrid
+from .utils import clamp, counter_key, counter_random, deterministic_rng, distance, rng_tag
+from .visibility import SensorCoverage
+from .worldgen import generate_columns, roll_level
+
+
+PING_RNG_TAG = rng_tag("ping")
+# Fixed-width records fed to `state_hash`: integer fields first, then floats.
+_FLEET_HASH = struct.Struct("<7qd")
+_PING_HASH = struct.Struct("<4q4d")
+_PLAYER_HASH = struct.Struct("<q3d")
 
 LEVEL_DISTRIBUTION = [
     (1, 0.4),
@@ -38,15 +55,196 @@ def stats_for_level(level: int) -> dict[str, float]:
 
 class GameState:
     def __init__(self, config: MatchConfig, player_names: list[str]):
+        if config.rng_version not in (1, 2):
+            # Falling back to another generator would silently change every ping of the match.
+            raise ValueError(f"unknown rng_version {config.rng_version!r}; expected 1 or 2")
         self.config = config
         self.tick = 0
         self.planets: list[Planet] = []
-        self.fleets: list[Fleet] = []
+        self.fleets = FleetScheduler()
         self.pings: list[Ping] = []
         self.players = [PlayerState(id=i, name=player_names[i]) for i in range(len(player_names))]
         self._next_fleet_id = 1
         self._next_ping_id = 1
-        self._generate_world()
+        self._ping_rng_key = counter_key(config.seed, PING_RNG_TAG)
+        self.profiler: TickProfiler | NullProfiler = NULL_PROFILER
+        self._store: PlanetArrays | None = None
+        self._universe: ChunkedUniverse | None = None
+        if config.world_chunks > 0:
+            if config.planet_store != "objects":
+                raise ValueError("world_chunks requires planet_store='objects'")
+            self._universe = ChunkedUniverse(
+                config, len(self.players), LEVEL_DISTRIBUTION, stats_for_level, self._on_chunk_materialized
+            )
+            self.planets = self._universe  # type: ignore[assignment]
+            self._grid = PlanetGrid((), self._universe.count)
+        elif config.world_generation == "bulk":
+            self._generate_world_bulk()
+        else:
+            self._generate_world()
+            if config.planet_store == "arrays":
+                self._store = PlanetArrays(self.planets)
+                self.planets = self._store.views()
+        self._owned: dict[int, set[int]] = {player.id: set() for player in self.players}
+        self._held_artifacts: dict[int, set[int]] = {player.id: set() for player in self.players}
+        self._rankings: dict[int, CapRanking] = {
+            player.id: CapRanking(config.score_top_n) for player in self.players
+        }
+        self._coverage: dict[int, SensorCoverage] = {player.id: SensorCoverage(self._grid) for player in self.players}
+        # Serialization caches: one dict per entity, rebuilt only when the entity changes.
+        self._planet_dicts: dict[int, dict[str, Any]] = {}
+        self._dirty_planets: set[int] = set()
+        self._planet_dict_list: list[dict[str, Any]] | None = None
+        self._fleet_dicts: dict[int, dict[str, Any]] = {}
+        self._fleet_dicts_clock = self.fleets.clock
+        self._ping_dicts: dict[int, dict[str, Any]] = {}
+        self._score_dicts: list[dict[str, Any]] | None = None
+        if self._universe is not None:
+            # Home chunks (and everything their sensors reach) materialize through the callback.
+            for home_id in sorted(self._universe.homes):
+                self.planets[home_id]
+        elif self._store is not None:
+            for planet_id in self._store.owned_ids():
+                planet = self.planets[planet_id]
+                self._index_ownership(planet, planet.owner, 1)
+            self._store.listener = self._on_planet_changed
+        else:
+            for planet in self.planets:
+                self._index_ownership(planet, planet.owner, 1)
+                planet.set_listener(self._on_planet_changed)
+        if self._universe is None:
+            self._dirty_planets.update(range(len(self.planets)))
+
+    def snapshot(self) -> GameSnapshot:
+        """Capture the match state so it can later be `restore()`d, any number of times."""
+        return self._capture().copy()
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """Rewind (or fast-forward) this state to `snapshot`, which may come from a fork."""
+        self._load(snapshot.copy())
+
+    def fork(self) -> GameState:
+        """Independent copy that advances exactly as this state would given the same actions."""
+        clone = GameState.__new__(GameState)
+        clone.config = self.config
+        clone._grid = self._grid
+        clone._ping_rng_key = self._ping_rng_key
+        clone.profiler = NULL_PROFILER
+        clone.planets = []
+        clone._store = None
+        clone._universe = None
+        clone._load(self._capture().copy())
+        return clone
+
+    def state_hash(self) -> str:
+        """Short digest of the simulated world, for catching desyncs between runs and re-simulations.
+
+        Covers the tick, id counters, every planet column, fleets, pings and
+        scores. Per-player known planets are left out since they follow from
+        the rest. Matches across planet stores.
+        """
+        hasher = hashlib.blake2b(digest_size=8)
+        hasher.update(struct.pack("<3q", self.tick, self._next_fleet_id, self._next_ping_id))
+        if self._store is not None:
+            hasher.update(self._store.packed_columns())
+        else:
+            hasher.update(pack_planet_columns(list(self.planets)))
+        for fleet in self.fleets:
+            hasher.update(
+                _FLEET_HASH.pack(
+                    fleet.id,
+                    fleet.owner,
+                    fleet.source_id,
+                    fleet.dest_id,
+                    fleet.launch_tick,
+                    fleet.total_ticks,
+                    self.fleets.ticks_remaining(fleet),
+                    fleet.energy,
+                )
+            )
+        for ping in self.pings:
+            hasher.update(
+                _PING_HASH.pack(
+                    ping.id, ping.source_player, ping.tick, ping.ttl, ping.x, ping.y, ping.radius, ping.strength
+                )
+            )
+        for player in self.players:
+            hasher.update(
+                _PLAYER_HASH.pack(
+                    player.artifacts_held, player.score, player.territory_score, player.artifact_score
+                )
+            )
+        return hasher.hexdigest()
+
+    def _capture(self) -> GameSnapshot:
+        # References the live containers; callers copy it before keeping it.
+        if self._universe is not None:
+            raise ValueError("snapshot/fork are not supported with world_chunks")
+        planet_list = self._all_planet_dicts()
+        return GameSnapshot(
+            tick=self.tick,
+            next_fleet_id=self._next_fleet_id,
+            next_ping_id=self._next_ping_id,
+            planet_dicts=self._planet_dicts,
+            planet_list=planet_list,
+            store=self._store,
+            fleets=self.fleets,
+            pings=self.pings,
+            players=self.players,
+            owned=self._owned,
+            held_artifacts=self._held_artifacts,
+            rankings=self._rankings,
+            coverage=self._coverage,
+            fleet_dicts=self._fleet_dicts,
+            fleet_dicts_clock=self._fleet_dicts_clock,
+            ping_dicts=self._ping_dicts,
+            score_dicts=self._score_dicts,
+        )
+
+    def _load(self, snapshot: GameSnapshot) -> None:
+        # Adopts the snapshot's containers; it must be a private copy.
+        self.tick = snapshot.tick
+        self._next_fleet_id = snapshot.next_fleet_id
+        self._next_ping_id = snapshot.next_ping_id
+        # Planet values are written without going through the change listener;
+        # the indexes and caches below are replaced wholesale instead.
+        if snapshot.store is not None:
+            if self._store is not None:
+                # Restoring in place keeps the existing views valid.
+                self._store.take_columns(snapshot.store)
+            else:
+                self._store = snapshot.store
+                self._store.listener = self._on_planet_changed
+                self.planets = self._store.views()
+        elif self.planets:
+            # A planet whose cached dict is the snapshot's own has not changed since.
+            self._flush_planet_dicts()
+            for planet, encoded in zip(self.planets, snapshot.planet_list):
+                if self._planet_dicts[planet.id] is not encoded:
+                    planet.__dict__.update(encoded)
+        else:
+            # Cached planet dicts carry exactly the Planet fields.
+            listener = self._on_planet_changed
+            for encoded in snapshot.planet_list:
+                planet = Planet.__new__(Planet)
+                attributes = planet.__dict__
+                attributes.update(encoded)
+                attributes["_listener"] = listener
+                self.planets.append(planet)
+        self.fleets = snapshot.fleets
+        self.pings = snapshot.pings
+        self.players = snapshot.players
+        self._owned = snapshot.owned
+        self._held_artifacts = snapshot.held_artifacts
+        self._rankings = snapshot.rankings
+        self._coverage = snapshot.coverage
+        self._planet_dicts = snapshot.planet_dicts
+        self._dirty_planets = set()
+        self._planet_dict_list = snapshot.planet_list
+        self._fleet_dicts = snapshot.fleet_dicts
+        self._fleet_dicts_clock = snapshot.fleet_dicts_clock
+        self._ping_dicts = snapshot.ping_dicts
+        self._score_dicts = snapshot.score_dicts
 
     def _generate_world(self) -> None:
         rng = random.Random(self.config.seed)
@@ -74,17 +272,24 @@ class GameState:
             planets.append(planet)
 
         self.planets = planets
+        self._grid = PlanetGrid(((p.id, p.x, p.y) for p in planets), len(planets))
         self._assign_home_planets(rng)
         self._assign_artifacts(rng)
 
+    def _generate_world_bulk(self) -> None:
+        columns = generate_columns(self.config, len(self.players), LEVEL_DISTRIBUTION, stats_for_level)
+        self._grid = PlanetGrid.from_arrays(columns["x"], columns["y"])
+        store = PlanetArrays.from_columns(columns)
+        if self.config.planet_store == "arrays":
+            self._store = store
+            self.planets = store.views()
+        else:
+            self.planets = [
+                Planet(**encoded) for encoded in store.to_dicts()
+            ]
+
     def _roll_level(self, rng: random.Random) -> int:
-        roll = rng.random()
-        cumulative = 0.0
-        for level, chance in LEVEL_DISTRIBUTION:
-            cumulative += chance
-            if roll <= cumulative:
-                return level
-        return 1
+        return roll_level(rng, LEVEL_DISTRIBUTION)
 
     def _assign_home_planets(self, rng: random.Random) -> None:
         candidates = self.planets[:]
@@ -130,22 +335,134 @@ class GameState:
     def _planet_by_id(self, planet_id: int) -> Planet:
         return self.planets[planet_id]
 
-    def advance_tick(self, actions_by_player: dict[int, list[Action]]) -> dict[str, Any]:
+    def _on_chunk_materialized(self, planets: list[Planet]) -> None:
+        for planet in planets:
+            self._grid.insert(planet.id, planet.x, planet.y)
+        for planet in planets:
+            planet.set_listener(self._on_planet_changed)
+            self._dirty_planets.add(planet.id)
+            self._index_ownership(planet, planet.owner, 1)
+
+    def _owned_planets(self, player_id: int) -> list[Planet]:
+        return [self._planet_by_id(planet_id) for planet_id in sorted(self._owned.get(player_id, ()))]
+
+    def _on_planet_changed(self, planet: Planet, field: str, old: Any) -> None:
+        self._dirty_planets.add(planet.id)
+        if field == "owner":
+            self._index_ownership(planet, old, -1)
+            self._index_ownership(planet, planet.owner, 1)
+        elif field == "energy_cap" and planet.owner is not None:
+            ranking = self._ranking(planet.owner)
+            ranking.remove(planet.id, old)
+            ranking.add(planet.id, planet.energy_cap)
+        elif field == "sensor_range" and planet.owner is not None:
+            coverage = self._sensor_coverage(planet.owner)
+            if self._universe is not None:
+                self._universe.touch(planet.x, planet.y, planet.sensor_range)
+            coverage.remove(planet, old)
+            coverage.add(planet, planet.sensor_range)
+        elif field == "is_artifact" and planet.owner is not None:
+            held = self._held_artifacts.setdefault(planet.owner, set())
+            if planet.is_artifact:
+                held.add(planet.id)
+            else:
+                held.discard(planet.id)
+
+    def _index_ownership(self, planet: Planet, owner: int | None, delta: int) -> None:
+        if owner is None:
+            return
+        owned = self._owned.setdefault(owner, set())
+        held = self._held_artifacts.setdefault(owner, set())
+        ranking = self._ranking(owner)
+        coverage = self._sensor_coverage(owner)
+        if delta > 0:
+            if self._universe is not None:
+                self._universe.touch(planet.x, planet.y, planet.sensor_range)
+            owned.add(planet.id)
+            ranking.add(planet.id, planet.energy_cap)
+            coverage.add(planet, planet.sensor_range)
+            if planet.is_artifact:
+                held.add(planet.id)
+        else:
+            owned.discard(planet.id)
+            ranking.remove(planet.id, planet.energy_cap)
+            coverage.remove(planet, planet.sensor_range)
+            held.discard(planet.id)
+
+    def _ranking(self, owner: int) -> CapRanking:
+        ranking = self._rankings.get(owner)
+        if ranking is None:
+            ranking = self._rankings[owner] = CapRanking(self.config.score_top_n)
+        return ranking
+
+    def _sensor_coverage(self, owner: int) -> SensorCoverage:
+        coverage = self._coverage.get(owner)
+        if coverage is None:
+            coverage = self._coverage[owner] = SensorCoverage(self._grid)
+        return coverage
+
+    def advance_tick(self, actions_by_player: dict[int, list[Action]], include_planets: bool = True) -> dict[str, Any]:
+        """Simulate one tick and return its snapshot.
+
+        With `include_planets=False` the snapshot has no `"planets"` entry and
+        planet encodings stay dirty until an observation, spectator view or
+        `snapshot()` asks for them, so a huge map is not re-serialized on
+        ticks whose state nobody records.
+        """
+        profiler = self.profiler
+        profiler.start()
         self._apply_growth()
+        profiler.lap("growth")
         scans = self._process_actions(actions_by_player)
+        profiler.lap("actions")
         self._move_fleets()
+        profiler.lap("movement")
         self._resolve_arrivals()
+        profiler.lap("arrivals")
         self._decay_pings()
         self._emit_artifact_pings()
+        profiler.lap("pings")
         self._update_scores()
-        snapshot = self._build_snapshot(scans)
+        profiler.lap("scores")
+        snapshot = self._build_snapshot(scans, include_planets)
+        profiler.lap("snapshot")
+        if profiler is not NULL_PROFILER:
+            self._record_gauges(profiler)
         self.tick += 1
         return snapshot
 
+    def _record_gauges(self, profiler: TickProfiler | NullProfiler) -> None:
+        profiler.gauge("tick", self.tick)
+        profiler.gauge("fleets_in_flight", len(self.fleets))
+        profiler.gauge("pings_active", len(self.pings))
+        for player in self.players:
+            profiler.gauge("planets_owned", len(self._owned.get(player.id, ())), {"player": player.id})
+
     def _apply_growth(self) -> None:
+        if self._store is not None:
+            self._dirty_planets.update(self._store.apply_growth())
+            return
+        if self._universe is not None:
+            self._universe.growth_steps += 1
+        # Inlined clamp(value, 0.0, cap); saturated planets are not written so
+        # they stay clean in the serialization cache.
         for planet in self.planets:
-            planet.energy = clamp(planet.energy + planet.energy_growth, 0.0, planet.energy_cap)
-            planet.silver = clamp(planet.silver + planet.silver_growth, 0.0, planet.silver_cap)
+            energy = planet.energy
+            grown = energy + planet.energy_growth
+            if not grown < planet.energy_cap:
+                grown = planet.energy_cap
+            if not grown > 0.0:
+                grown = 0.0
+            if grown != energy:
+                planet.energy = grown
+            silver = planet.silver
+            grown = silver + planet.silver_growth
+            if not grown < planet.silver_cap:
+                grown = planet.silver_cap
+            if not grown > 0.0:
+                grown = 0.0
+            if grown != silver:
+                planet.silver = grown
 
     def _process_actions(self, actions_by_player: dict[int, list[Action]]) -> dict[int, list[int]]:
         scans: dict[int, list[int]] = {pid: [] for pid in range(len(self.players))}
@@ -165,19 +482,16 @@ class GameState:
         radius = float(action["radius"])
         center = (float(action["x"]), float(action["y"]))
         cost = 8.0 * radius
-        owned = [p for p in self.planets if p.owner == player_id]
+        owned = self._owned_planets(player_id)
         if not owned:
             return []
-        owned.sort(key=lambda p: distance((p.x, p.y), center))
-        source = owned[0]
+        source = min(owned, key=lambda p: distance((p.x, p.y), center))
         if source.energy < cost:
             return []
         source.energy -= cost
-        revealed = []
-        for planet in self.planets:
-            if distance((planet.x, planet.y), center) <= radius:
-                revealed.append(planet.id)
-        return revealed
+        if self._universe is not None:
+            self._universe.touch(center[0], center[1], radius)
+        return self._grid.query_radius(center[0], center[1], radius)
 
     def _handle_send_fleet(self, player_id: int, action: Action) -> None:
         source_id = int(action["from_id"])
@@ -186,9 +500,10 @@ class GameState:
             return
         if source_id < 0 or source_id >= len(self.planets) or dest_id < 0 or dest_id >= len(self.planets):
             return
-        source = self._planet_by_id(source_id)
-        if source.owner != player_id:
+        # Checked on the owner index first: reading an arbitrary id would materialize its chunk.
+        if source_id not in self._owned.get(player_id, ()):
             return
+        source = self._planet_by_id(source_id)
         energy = float(action["energy"])
         if energy <= 0 or energy > source.energy:
             return
@@ -207,16 +522,16 @@ class GameState:
             ticks_remaining=travel_ticks,
         )
         self._next_fleet_id += 1
-        self.fleets.append(fleet)
+        self.fleets.add(fleet)
         self._emit_fleet_ping(fleet)
 
     def _handle_upgrade(self, player_id: int, action: Action) -> None:
         planet_id = int(action["planet_id"])
         if planet_id < 0 or planet_id >= len(self.planets):
             return
-        planet = self._planet_by_id(planet_id)
-        if planet.owner != player_id:
+        if planet_id not in self._owned.get(player_id, ()):
             return
+        planet = self._planet_by_id(planet_id)
         upgrade = action["upgrade"]
         cost = 15 + planet.level * 12
         if planet.silver < cost:
@@ -236,20 +551,16 @@ class GameState:
             planet.sensor_range += 0.04 + planet.level * 0.01
 
     def _move_fleets(self) -> None:
-        for fleet in self.fleets:
-            fleet.ticks_remaining -= 1
+        self.fleets.advance()
 
     def _resolve_arrivals(self) -> None:
-        arrived: list[Fleet] = [fleet for fleet in self.fleets if fleet.ticks_remaining <= 0]
-        arrived.sort(key=lambda f: f.id)
-        for fleet in arrived:
+        for fleet in self.fleets.pop_arrivals():
             dest = self._planet_by_id(fleet.dest_id)
             if dest.owner is None or dest.owner == fleet.owner:
                 dest.owner = fleet.owner
                 dest.energy = clamp(dest.energy + fleet.energy, 0.0, dest.energy_cap)
             else:
                 self._resolve_combat(dest, fleet)
-        self.fleets = [fleet for fleet in self.fleets if fleet.ticks_remaining > 0]
 
     def _resolve_combat(self, dest: Planet, fleet: Fleet) -> None:
         defense_factor = 1.0 + dest.defense * self.config.defense_multiplier
@@ -265,9 +576,15 @@ class GameState:
 
     def _emit_fleet_ping(self, fleet: Fleet) -> None:
         source = self._planet_by_id(fleet.source_id)
-        rng = deterministic_rng(self.config.seed, ["ping", self.tick, fleet.id])
-        jitter_x = rng.uniform(-self.config.ping_jitter, self.config.ping_jitter)
-        jitter_y = rng.uniform(-self.config.ping_jitter, self.config.ping_jitter)
+        jitter = self.config.ping_jitter
+        if self.config.rng_version == 2:
+            key = counter_key(self._ping_rng_key, self.tick, fleet.id)
+            jitter_x = jitter * (2.0 * counter_random(key, 0) - 1.0)
+            jitter_y = jitter * (2.0 * counter_random(key, 1) - 1.0)
+        else:
+            rng = deterministic_rng(self.config.seed, ["ping", self.tick, fleet.id])
+            jitter_x = rng.uniform(-jitter, jitter)
+            jitter_y = rng.uniform(-jitter, jitter)
         radius = self.config.ping_base_radius + math.sqrt(fleet.energy) * 0.01
         strength = self.config.ping_base_strength + math.sqrt(fleet.energy) * 0.02
         if source.is_artifact:
@@ -287,9 +604,9 @@ class GameState:
         self.pings.append(ping)
 
     def _emit_artifact_pings(self) -> None:
-        for planet in self.planets:
-            if not planet.is_artifact or planet.owner is None:
-                continue
+        holders = sorted(planet_id for held in self._held_artifacts.values() for planet_id in held)
+        for planet_id in holders:
+            planet = self._planet_by_id(planet_id)
             ping = Ping(
                 id=self._next_ping_id,
                 x=planet.x,
@@ -306,29 +623,82 @@ class GameState:
     def _decay_pings(self) -> None:
         for ping in self.pings:
             ping.ttl -= 1
+            if ping.ttl <= 0:
+                self._ping_dicts.pop(ping.id, None)
         self.pings = [ping for ping in self.pings if ping.ttl > 0]
 
     def _update_scores(self) -> None:
+        self._score_dicts = None
         for player in self.players:
-            owned = [p for p in self.planets if p.owner == player.id]
-            owned.sort(key=lambda p: p.energy_cap, reverse=True)
-            territory_gain = sum(p.energy_cap for p in owned[: self.config.score_top_n]) / 1000.0
-            artifacts = sum(1 for p in self.planets if p.owner == player.id and p.is_artifact)
+            territory_gain = self._rankings[player.id].top_sum() / 1000.0
+            artifacts = len(self._held_artifacts[player.id])
             player.artifacts_held = artifacts
             artifact_gain = artifacts * self.config.artifact_points_per_tick
             player.territory_score += territory_gain
             player.artifact_score += artifact_gain
             player.score = player.territory_score + player.artifact_score
 
-    def _build_snapshot(self, scans: dict[int, list[int]]) -> dict[str, Any]:
-        return {
-            "tick": self.tick,
-            "planets": [self._planet_to_dict(p) for p in self.planets],
-            "fleets": [self._fleet_to_dict(f) for f in self.fleets],
-            "pings": [self._ping_to_dict(p) for p in self.pings],
-            "scores": [self._player_score(p) for p in self.players],
-            "scans": scans,
-        }
+    def _build_snapshot(self, scans: dict[int, list[int]], include_planets: bool = True) -> dict[str, Any]:
+        snapshot: dict[str, Any] = {"tick": self.tick}
+        if include_planets:
+            snapshot["planets"] = self._all_planet_dicts()
+        snapshot["fleets"] = [self._fleet_dict(f) for f in self.fleets]
+        snapshot["pings"] = [self._ping_dict(p) for p in self.pings]
+        snapshot["scores"] = self._scores()
+        snapshot["scans"] = scans
+        return snapshot
+
+    # Cached encodings are shared by snapshots, observations and spectator
+    # payloads within a tick, so callers must copy rather than mutate them.
+
+    def _flush_planet_dicts(self, planet_ids: set[int] | None = None) -> None:
+        """Re-encode dirty planets: all of them, or only those among `planet_ids`."""
+        if not self._dirty_planets:
+            return
+        if planet_ids is None:
+            dirty = sorted(self._dirty_planets)
+            self._dirty_planets.clear()
+        else:
+            dirty = sorted(self._dirty_planets.intersection(planet_ids))
+            if not dirty:
+                return
+            self._dirty_planets.difference_update(dirty)
+        if self._store is not None:
+            fresh = self._store.to_dicts(dirty)
+        else:
+            fresh = [self._planet_to_dict(self._planet_by_id(planet_id)) for planet_id in dirty]
+        for encoded in fresh:
+            self._planet_dicts[encoded["id"]] = encoded
+        self._planet_dict_list = None
+
+    def _all_planet_dicts(self) -> list[dict[str, Any]]:
+        self._flush_planet_dicts()
+        if self._planet_dict_list is None:
+            if self._store is not None:
+                self._planet_dict_list = [self._planet_dicts[planet_id] for planet_id in range(len(self.planets))]
+            else:
+                self._planet_dict_list = [self._planet_dicts[planet.id] for planet in self.planets]
+        return self._planet_dict_list
+
+    def _fleet_dict(self, fleet: Fleet) -> dict[str, Any]:
+        if self._fleet_dicts_clock != self.fleets.clock:
+            self._fleet_dicts = {}
+            self._fleet_dicts_clock = self.fleets.clock
+        encoded = self._fleet_dicts.get(fleet.id)
+        if encoded is None:
+            encoded = self._fleet_dicts[fleet.id] = self._fleet_to_dict(fleet)
+        return encoded
+
+    def _ping_dict(self, ping: Ping) -> dict[str, Any]:
+        encoded = self._ping_dicts.get(ping.id)
+        if encoded is None:
+            encoded = self._ping_dicts[ping.id] = self._ping_to_dict(ping)
+        return encoded
+
+    def _scores(self) -> list[dict[str, Any]]:
+        if self._score_dicts is None:
+            self._score_dicts = [self._player_score(p) for p in self.players]
+        return self._score_dicts
 
     def _planet_to_dict(self, planet: Planet) -> dict[str, Any]:
         return {
@@ -336,10 +706,11 @@ class GameState:
             "x": planet.x,
             "y": planet.y,
             "level": planet.level,
-            "energy": planet.energy,
+            # Always floats on the wire, even when clamped to an int cap, so both planet stores agree (see README, Protocol Summary).
+            "energy": float(planet.energy),
             "energy_cap": planet.energy_cap,
             "energy_growth": planet.energy_growth,
-            "silver": planet.silver,
+            "silver": float(planet.silver),
             "silver_cap": planet.silver_cap,
             "silver_growth": planet.silver_growth,
             "defense": planet.defense,
@@ -352,7 +723,8 @@ class GameState:
     def _fleet_to_dict(self, fleet: Fleet) -> dict[str, Any]:
         source = self._planet_by_id(fleet.source_id)
         dest = self._planet_by_id(fleet.dest_id)
-        progress = 1.0 - (fleet.ticks_remaining / fleet.total_ticks)
+        ticks_remaining = self.fleets.ticks_remaining(fleet)
+        progress = 1.0 - (ticks_remaining / fleet.total_ticks)
         x = source.x + (dest.x - source.x) * progress
         y = source.y + (dest.y - source.y) * progress
         return {
@@ -361,7 +733,7 @@ class GameState:
             "source_id": fleet.source_id,
             "dest_id": fleet.dest_id,
             "energy": fleet.energy,
-            "ticks_remaining": fleet.ticks_remaining,
+            "ticks_remaining": ticks_remaining,
             "total_ticks": fleet.total_ticks,
             "x": x,
             "y": y,
@@ -392,43 +764,41 @@ class GameState:
         if scans is None:
             scans = []
         player = self.players[player_id]
+        coverage = self._sensor_coverage(player_id)
         visible_planets = set(scans)
-        owned = [p for p in self.planets if p.owner == player_id]
-        for planet in owned:
-            visible_planets.add(planet.id)
-        for planet in owned:
-            for other in self.planets:
-                if distance((planet.x, planet.y), (other.x, other.y)) <= planet.sensor_range:
-                    visible_planets.add(other.id)
+        visible_planets.update(self._owned.get(player_id, ()))
+        visible_planets.update(coverage.counts)
 
         observations = []
-        for planet in self.planets:
-            if planet.id in visible_planets:
-                snapshot = self._planet_to_dict(planet)
-                snapshot["visibility"] = "owned" if planet.owner == player_id else "visible"
-                snapshot["last_seen_tick"] = self.tick
-                player.known_planets[planet.id] = snapshot
-            elif planet.id in player.known_planets:
-                snapshot = dict(player.known_planets[planet.id])
-                snapshot["visibility"] = "stale"
+        known = player.known_planets
+        # Only what this player sees is re-encoded; other dirty planets wait for whoever reads them.
+        self._flush_planet_dicts(visible_planets)
+        for planet_id in sorted(visible_planets.union(known)):
+            if planet_id in visible_planets:
+                encoded = self._planet_dicts[planet_id]
+                snapshot = {
+                    **encoded,
+                    "visibility": "owned" if encoded["owner"] == player_id else "visible",
+                    "last_seen_tick": self.tick,
+                }
+                known[planet_id] = snapshot
             else:
-                continue
+                snapshot = known[planet_id]
+                if snapshot["visibility"] != "stale":
+                    # Stored once marked stale and reused until the planet is seen again.
+                    snapshot = known[planet_id] = {**snapshot, "visibility": "stale"}
             observations.append(snapshot)
 
         visible_fleets = []
         for fleet in self.fleets:
-            source = self._planet_by_id(fleet.source_id)
-            dest = self._planet_by_id(fleet.dest_id)
-            progress = 1.0 - (fleet.ticks_remaining / fleet.total_ticks)
-            x = source.x + (dest.x - source.x) * progress
-            y = source.y + (dest.y - source.y) * progress
-            if any(distance((x, y), (p.x, p.y)) <= p.sensor_range for p in owned):
-                visible_fleets.append(self._fleet_to_dict(fleet))
+            encoded = self._fleet_dict(fleet)
+            if coverage.senses(encoded["x"], encoded["y"]):
+                visible_fleets.append(encoded)
 
         visible_pings = []
         for ping in self.pings:
-            if any(distance((ping.x, ping.y), (p.x, p.y)) <= p.sensor_range for p in owned):
-                visible_pings.append(self._ping_to_dict(ping))
+            if coverage.senses(ping.x, ping.y):
+                visible_pings.append(self._ping_dict(ping))
 
         return {
             "tick": self.tick,
@@ -436,7 +806,7 @@ class GameState:
             "planets": observations,
             "fleets": visible_fleets,
             "pings": visible_pings,
-            "scores": [self._player_score(p) for p in self.players],
+            "scores": self._scores(),
             "max_actions": self.config.max_actions_per_tick,
             "match_ticks": self.config.match_ticks,
             "tick_ms": self.config.tick_ms,
@@ -446,10 +816,10 @@ class GameState:
         return {
             "tick": self.tick,
             "player_id": None,
-            "planets": [self._planet_to_dict(p) for p in self.planets],
-            "fleets": [self._fleet_to_dict(f) for f in self.fleets],
-            "pings": [self._ping_to_dict(p) for p in self.pings],
-            "scores": [self._player_score(p) for p in self.players],
+            "planets": self._all_planet_dicts(),
+            "fleets": [self._fleet_dict(f) for f in self.fleets],
+            "pings": [self._ping_dict(p) for p in self.pings],
+            "scores": self._scores(),
             "max_actions": self.config.max_actions_per_tick,
             "match_ticks": self.config.match_ticks,
             "tick_ms": self.config.tick_ms,
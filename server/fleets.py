@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from .models import Fleet
+
+
+class FleetScheduler:
+    """In-flight fleets bucketed by the movement step on which they arrive.
+
+    `clock` counts completed movement steps. A fleet added with
+    `ticks_remaining=n` lands when the clock reaches `clock + n`, exactly as if
+    it were decremented once per step, but a step only touches its own bucket.
+    Iteration yields fleets in launch (id) order.
+    """
+
+    def __init__(self) -> None:
+        self.clock = 0
+        self._fleets: dict[int, Fleet] = {}
+        self._arrivals: dict[int, int] = {}
+        self._buckets: dict[int, list[Fleet]] = {}
+
+    def __iter__(self) -> Iterator[Fleet]:
+        return iter(self._fleets.values())
+
+    def __len__(self) -> int:
+        return len(self._fleets)
+
+    def add(self, fleet: Fleet) -> None:
+        arrival = self.clock + max(1, fleet.ticks_remaining)
+        self._fleets[fleet.id] = fleet
+        self._arrivals[fleet.id] = arrival
+        self._buckets.setdefault(arrival, []).append(fleet)
+
+    def copy(self) -> FleetScheduler:
+        """Independent scheduler with the same fleets; `Fleet` objects are never mutated, so they are shared."""
+        clone = FleetScheduler()
+        clone.clock = self.clock
+        clone._fleets = dict(self._fleets)
+        clone._arrivals = dict(self._arrivals)
+        clone._buckets = {step: list(fleets) for step, fleets in self._buckets.items()}
+        return clone
+
+    def advance(self) -> None:
+        self.clock += 1
+
+    def pop_arrivals(self) -> list[Fleet]:
+        """Remove and return fleets landing on the current step, ordered by id."""
+        arrived = self._buckets.pop(self.clock, [])
+        for fleet in arrived:
+            del self._fleets[fleet.id]
+            del self._arrivals[fleet.id]
+        arrived.sort(key=lambda f: f.id)
+        return arrived
+
+    def ticks_remaining(self, fleet: Fleet) -> int:
+        return self._arrivals[fleet.id] - self.clock
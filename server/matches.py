@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any
+
+from .bot_manager import BotManager
+from .engine import GameState
+from .models import MatchConfig
+from .profiling import TickProfiler
+from .replay import BackgroundReplaySink, open_replay_logger
+from .spectators import SpectatorHub
+
+# Lifecycle of a hosted match.
+PENDING = "pending"
+RUNNING = "running"
+FINISHED = "finished"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class Match:
+    """One hosted match: its state, bots, replay and spectators, advanced by its own tick loop task."""
+
+    def __init__(
+        self,
+        match_id: str,
+        config: MatchConfig,
+        player_count: int = 4,
+        http_bots: list[str] | None = None,
+        replay_path: str | None = None,
+        replay_policy: str = "block",
+        replay_queue: int = 256,
+        spectator_queue: int = 2,
+    ) -> None:
+        self.id = match_id
+        self.config = config
+        self.state = GameState(config, [f"Player {i}" for i in range(player_count)])
+        self.state.profiler = TickProfiler()
+        self.bot_manager = BotManager(
+            config.commit_timeout_ms, config.reveal_timeout_ms, config.observation_keyframe_interval
+        )
+        for idx, url in enumerate(http_bots or []):
+            if idx < player_count:
+                self.bot_manager.register_http(idx, url)
+        self.replay_path = replay_path
+        self.replay_logger: BackgroundReplaySink | None = None
+        if replay_path is not None:
+            # Serialization and disk writes happen on a writer thread, off the event loop.
+            self.replay_logger = BackgroundReplaySink(
+                open_replay_logger(os.path.abspath(replay_path), config.replay_keyframe_interval, self.state),
+                max_pending=replay_queue,
+                policy=replay_policy,
+            )
+        # Each spectator is served by its own sender task; the tick loop only enqueues frames.
+        self.spectators = SpectatorHub(max_pending=spectator_queue)
+        self.latest_observations: dict[int, dict[str, Any]] = {}
+        self.status = PENDING
+        self.error: str | None = None
+        self.created_at = time.time()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Schedule the tick loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        state = self.state
+        config = self.config
+        bot_manager = self.bot_manager
+        replay_logger = self.replay_logger
+        spectators = self.spectators
+        profiler = state.profiler
+        outcome = FAILED
+        include_planets = replay_logger is not None and replay_logger.records_state
+        self.status = RUNNING
+        try:
+            observations: dict[int, dict[str, Any]] = {
+                player.id: state.observation_for_player(player.id) for player in state.players
+            }
+            self.latest_observations = observations
+            for _ in range(config.match_ticks):
+                profiler.start()
+                await bot_manager.commit_phase(state.tick, observations)
+                for player_id, size in bot_manager.observation_bytes.items():
+                    profiler.gauge("observation_payload_bytes", size, {"player": player_id})
+                actions = await bot_manager.reveal_phase(state.tick)
+                profiler.lap("bots")
+                snapshot = state.advance_tick(actions, include_planets)
+                processed_tick = snapshot["tick"]
+                observations = {
+                    player.id: state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
+                    for player in state.players
+                }
+                profiler.lap("observations")
+                self.latest_observations = observations
+                if replay_logger is not None:
+                    await replay_logger.log_tick(processed_tick, snapshot, observations, actions)
+                profiler.lap("replay")
+                spectators.publish(state, observations)
+                profiler.lap("broadcast")
+                spectators.report(profiler)
+                if replay_logger is not None:
+                    profiler.gauge("replay_pending", replay_logger.pending)
+                    profiler.gauge("replay_dropped", replay_logger.dropped)
+                await asyncio.sleep(config.tick_ms / 1000.0)
+            outcome = FINISHED
+        except asyncio.CancelledError:
+            outcome = CANCELLED
+            raise
+        except Exception as exc:
+            outcome = FAILED
+            self.error = repr(exc)
+            raise
+        finally:
+            # Reported only once the replay is complete on disk.
+            await self.close()
+            if self.status == RUNNING:
+                self.status = outcome
+
+    async def close(self) -> None:
+        """Drain the replay and disconnect spectators; safe to call more than once."""
+        try:
+            if self.replay_logger is not None:
+                await asyncio.to_thread(self.replay_logger.close)
+        except Exception as exc:
+            # Reported through the registry instead of an unretrieved task exception.
+            self.status = FAILED
+            self.error = self.error or repr(exc)
+        await self.spectators.close()
+
+    async def cancel(self) -> None:
+        if self._task is None or self._task.done():
+            if self.status == PENDING:
+                self.status = CANCELLED
+            await self.close()
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    @property
+    def active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "tick": self.state.tick,
+            "match_ticks": self.config.match_ticks,
+            "players": [p.name for p in self.state.players],
+            "spectators": len(self.spectators),
+            "replay": self.replay_path,
+            "error": self.error,
+        }
+
+
+class MatchRegistry:
+    """The matches hosted by one server process, keyed by id."""
+
+    def __init__(self, replay_dir: str | None = None, max_active: int = 64) -> None:
+        self.replay_dir = replay_dir
+        self.max_active = max_active
+        self.matches: dict[str, Match] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def get(self, match_id: str) -> Match:
+        """Raises `KeyError` for unknown ids."""
+        return self.matches[match_id]
+
+    def list(self) -> list[Match]:
+        return list(self.matches.values())
+
+    def active_count(self) -> int:
+        return sum(1 for match in self.matches.values() if match.active)
+
+    def create(self, config: MatchConfig, match_id: str | None = None, **options: Any) -> Match:
+        """Build a match and register it; call `Match.start()` (or `start`) from the event loop to run it.
+
+        Without an explicit `replay_path` the replay goes to `replay_dir`, or
+        is not written when the registry has none. Raises `ValueError` for a
+        duplicate id and `RuntimeError` when `max_active` matches are already
+        pending or running.
+        """
+        if self.active_count() >= self.max_active:
+            raise RuntimeError(f"already hosting {self.max_active} active matches")
+        if match_id is None:
+            while str(self._next_id) in self.matches:
+                self._next_id += 1
+            match_id = str(self._next_id)
+            self._next_id += 1
+        elif match_id in self.matches:
+            raise ValueError(f"match {match_id!r} already exists")
+        if options.get("replay_path") is None and self.replay_dir is not None:
+            options["replay_path"] = os.path.join(self.replay_dir, f"match_{int(time.time())}_{match_id}.ofr")
+        match = self.matches[match_id] = Match(match_id, config, **options)
+        return match
+
+    def start(self, config: MatchConfig, match_id: str | None = None, **options: Any) -> Match:
+        match = self.create(config, match_id, **options)
+        match.start()
+        return match
+
+    async def cancel(self, match_id: str) -> Match:
+        """Stop a match if it is still running and forget it."""
+        match = self.matches.pop(match_id)
+        await match.cancel()
+        return match
+
+    async def close(self) -> None:
+        for match_id in list(self.matches):
+            await self.cancel(match_id)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Literal, TypedDict, Union
+from typing import Any, Callable, Literal, TypedDict, Union
 
 
 class ActionScan(TypedDict):
@@ -45,6 +45,23 @@ class Planet:
     owner: int | None = None
     is_artifact: bool = False
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        listener = self.__dict__.get("_listener")
+        if listener is None:
+            object.__setattr__(self, name, value)
+            return
+        old = getattr(self, name)
+        object.__setattr__(self, name, value)
+        if old != value:
+            listener(self, name, old)
+
+    def set_listener(self, listener: PlanetListener | None) -> None:
+        """Register a callback fired as `listener(planet, field, old_value)` whenever a field changes."""
+        object.__setattr__(self, "_listener", listener)
+
+
+PlanetListener = Callable[[Any, str, Any], None]
+
 
 @dataclass
 class Fleet:
@@ -55,6 +72,7 @@ class Fleet:
     energy: float
     launch_tick: int
     total_ticks: int
+    # Travel ticks left when scheduled; GameState derives the live value from its FleetScheduler.
     ticks_remaining: int
 
 
@@ -103,3 +121,14 @@ class MatchConfig:
     commit_timeout_ms: int
     reveal_timeout_ms: int
     player_home_min_distance: float
+    planet_store: Literal["objects", "arrays"] = "objects"
+    # Offer observation deltas to bots, with a keyframe every N ticks; 0 sends only full observations.
+    observation_keyframe_interval: int = 50
+    # 1: SHA-256 seeded Mersenne Twister per event (original replays); 2: counter-based SplitMix64.
+    rng_version: Literal[1, 2] = 1
+    # "bulk" builds the world with vectorized numpy generation (a different, equally deterministic map).
+    world_generation: Literal["sequential", "bulk"] = "sequential"
+    # Chunks per map side for a lazily generated universe; 0 builds every planet up front.
+    world_chunks: int = 0
+    # Binary replays store a full record every N ticks and field-level deltas in between; 0 stores every tick in full.
+    replay_keyframe_interval: int = 0
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Iterator, Sequence, overload
+
+from .models import Planet, PlanetListener
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only planet_store="arrays" needs it
+    np = None
+
+
+# Stored as float64 columns; the caps are whole numbers and are serialized as ints.
+FLOAT_FIELDS = (
+    "x",
+    "y",
+    "energy",
+    "energy_cap",
+    "energy_growth",
+    "silver",
+    "silver_cap",
+    "silver_growth",
+    "defense",
+    "speed",
+    "sensor_range",
+)
+PLANET_DICT_KEYS = (
+    "id",
+    "x",
+    "y",
+    "level",
+    "energy",
+    "energy_cap",
+    "energy_growth",
+    "silver",
+    "silver_cap",
+    "silver_growth",
+    "defense",
+    "speed",
+    "sensor_range",
+    "owner",
+    "is_artifact",
+)
+COLUMN_FIELDS = (*FLOAT_FIELDS, "level", "owner", "is_artifact")
+INT_CAP_FIELDS = ("energy_cap", "silver_cap")
+NO_OWNER = -1
+
+
+def pack_planet_columns(planets: Sequence[Planet]) -> bytes:
+    """Ids and every column field as little-endian float64, column by column.
+
+    Gives the same bytes as `PlanetArrays.packed_columns` for the same
+    planets, so state digests agree across planet stores.
+    """
+    packed = array("d", [planet.id for planet in planets])
+    for name in COLUMN_FIELDS:
+        if name == "owner":
+            packed.extend([NO_OWNER if planet.owner is None else planet.owner for planet in planets])
+        else:
+            packed.extend([getattr(planet, name) for planet in planets])
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+class PlanetArrays:
+    """Struct-of-arrays planet storage with `PlanetView` objects as thin views.
+
+    Per-tick phases that touch every planet (growth, snapshots) run as vectorized numpy operations over the columns, using the
+    same float64 arithmetic as the dataclass path.
+    """
+
+    def __init__(self, planets: list[Planet]) -> None:
+        if np is None:
+            raise RuntimeError("planet_store='arrays' requires numpy to be installed")
+        self.count = len(planets)
+        for name in FLOAT_FIELDS:
+            setattr(self, name, np.array([getattr(p, name) for p in planets], dtype=np.float64))
+        self.level = np.array([p.level for p in planets], dtype=np.int64)
+        self.owner = np.array([NO_OWNER if p.owner is None else p.owner for p in planets], dtype=np.int64)
+        self.is_artifact = np.array([p.is_artifact for p in planets], dtype=bool)
+        self.listener: PlanetListener | None = None
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Any]) -> PlanetArrays:
+        """Wrap ready-made columns (as built by `worldgen.generate_columns`) without copying them."""
+        store = cls.__new__(cls)
+        store.count = len(columns["x"])
+        for name in COLUMN_FIELDS:
+            setattr(store, name, columns[name])
+        store.listener = None
+        return store
+
+    def owned_ids(self) -> list[int]:
+        return np.flatnonzero(self.owner != NO_OWNER).tolist()
+
+    def packed_columns(self) -> bytes:
+        """Ids and columns laid out like `pack_planet_columns`."""
+        parts = [np.arange(self.count, dtype="<f8").tobytes()]
+        parts.extend(getattr(self, name).astype("<f8").tobytes() for name in COLUMN_FIELDS)
+        return b"".join(parts)
+
+    def copy(self) -> PlanetArrays:
+        """Detached copy of every column; the listener is not carried over."""
+        clone = PlanetArrays.__new__(PlanetArrays)
+        clone.count = self.count
+        for name in COLUMN_FIELDS:
+            setattr(clone, name, getattr(self, name).copy())
+        clone.listener = None
+        return clone
+
+    def take_columns(self, other: PlanetArrays) -> None:
+        """Adopt `other`'s column arrays (which must not be used afterwards), keeping this store's views."""
+        for name in COLUMN_FIELDS:
+            setattr(self, name, getattr(other, name))
+
+    def views(self) -> PlanetViews:
+        return PlanetViews(self)
+
+    def apply_growth(self) -> list[int]:
+        """Grow energy and silver in place and return the ids of planets that changed."""
+        energy = np.maximum(np.minimum(self.energy + self.energy_growth, self.energy_cap), 0.0)
+        silver = np.maximum(np.minimum(self.silver + self.silver_growth, self.silver_cap), 0.0)
+        changed = np.flatnonzero((energy != self.energy) | (silver != self.silver))
+        self.energy = energy
+        self.silver = silver
+        return changed.tolist()
+
+    def to_dicts(self, planet_ids: list[int] | None = None) -> list[dict[str, Any]]:
+        """Serialize planets column-wise (all, or just `planet_ids`), matching `GameState._planet_to_dict`."""
+        if planet_ids is None or len(planet_ids) == self.count:
+            planet_ids = range(self.count)
+            index: Any = slice(None)
+        else:
+            index = np.asarray(planet_ids, dtype=np.int64)
+        columns = {name: getattr(self, name)[index].tolist() for name in FLOAT_FIELDS if name not in INT_CAP_FIELDS}
+        for name in INT_CAP_FIELDS:
+            columns[name] = getattr(self, name)[index].astype(np.int64).tolist()
+        owners = [None if owner == NO_OWNER else owner for owner in self.owner[index].tolist()]
+        rows = zip(
+            planet_ids,
+            columns["x"],
+            columns["y"],
+            self.level[index].tolist(),
+            columns["energy"],
+            columns["energy_cap"],
+            columns["energy_growth"],
+            columns["silver"],
+            columns["silver_cap"],
+            columns["silver_growth"],
+            columns["defense"],
+            columns["speed"],
+            columns["sensor_range"],
+            owners,
+            self.is_artifact[index].tolist(),
+        )
+        return [dict(zip(PLANET_DICT_KEYS, row)) for row in rows]
+
+
+def _float_column(name: str) -> property:
+    def getter(view: PlanetView) -> float:
+        return float(getattr(view._store, name)[view.id])
+
+    def setter(view: PlanetView, value: float) -> None:
+        old = getter(view)
+        getattr(view._store, name)[view.id] = value
+        view._notify(name, old, value)
+
+    return property(getter, setter)
+
+
+class PlanetView:
+    """Attribute-compatible stand-in for `Planet` backed by a `PlanetArrays` row."""
+
+    __slots__ = ("_store", "id")
+
+    def __init__(self, store: PlanetArrays, index: int) -> None:
+        self._store = store
+        self.id = index
+
+    @property
+    def level(self) -> int:
+        return int(self._store.level[self.id])
+
+    @level.setter
+    def level(self, value: int) -> None:
+        old = self.level
+        self._store.level[self.id] = value
+        self._notify("level", old, value)
+
+    @property
+    def owner(self) -> int | None:
+        owner = int(self._store.owner[self.id])
+        return None if owner == NO_OWNER else owner
+
+    @owner.setter
+    def owner(self, value: int | None) -> None:
+        old = self.owner
+        self._store.owner[self.id] = NO_OWNER if value is None else value
+        self._notify("owner", old, value)
+
+    @property
+    def is_artifact(self) -> bool:
+        return bool(self._store.is_artifact[self.id])
+
+    @is_artifact.setter
+    def is_artifact(self, value: bool) -> None:
+        old = self.is_artifact
+        self._store.is_artifact[self.id] = value
+        self._notify("is_artifact", old, value)
+
+    def _notify(self, name: str, old: Any, value: Any) -> None:
+        listener = self._store.listener
+        if listener is not None and old != value:
+            listener(self, name, old)
+
+    def set_listener(self, listener: PlanetListener | None) -> None:
+        self._store.listener = listener
+
+    def __repr__(self) -> str:
+        fields: dict[str, Any] = {"id": self.id, "level": self.level, "owner": self.owner}
+        fields.update((name, getattr(self, name)) for name in FLOAT_FIELDS)
+        fields["is_artifact"] = self.is_artifact
+        return "PlanetView(" + ", ".join(f"{key}={value!r}" for key, value in fields.items()) + ")"
+
+
+class PlanetViews(Sequence[PlanetView]):
+    """List-like sequence of a store's rows that creates each `PlanetView` on first access.
+
+    Keeps building (or forking) a huge map from allocating a view per planet
+    up front; a row always returns the same view object once created.
+    """
+
+    def __init__(self, store: PlanetArrays) -> None:
+        self._store = store
+        self._views: list[PlanetView | None] = [None] * store.count
+
+    def __len__(self) -> int:
+        return self._store.count
+
+    @overload
+    def __getitem__(self, index: int) -> PlanetView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[PlanetView]: ...
+
+    def __getitem__(self, index: int | slice) -> PlanetView | list[PlanetView]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._store.count))]
+        if index < 0:
+            index += self._store.count
+        view = self._views[index]
+        if view is None:
+            view = self._views[index] = PlanetView(self._store, index)
+        return view
+
+    def __iter__(self) -> Iterator[PlanetView]:
+        for index in range(self._store.count):
+            yield self[index]
+
+
+for _name in FLOAT_FIELDS:
+    setattr(PlanetView, _name, _float_column(_name))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any
+
+# Upper bounds in seconds, from 100us up to multi-second stalls.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DEFAULT_WINDOW = 1000
+
+
+class RollingHistogram:
+    """Bucket counts over the most recent `window` samples.
+
+    Each sample remembers its bucket, so evicting the oldest one is a single
+    decrement and observing stays O(log buckets).
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.window = max(1, window)
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.samples: deque[tuple[float, int]] = deque()
+
+    def observe(self, value: float) -> None:
+        bucket = bisect_left(self.bounds, value)
+        self.counts[bucket] += 1
+        self.samples.append((value, bucket))
+        if len(self.samples) > self.window:
+            _, evicted = self.samples.popleft()
+            self.counts[evicted] -= 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """`(upper_bound, samples <= bound)` pairs, ending with `+inf`."""
+        running = 0
+        buckets = []
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            running += count
+            buckets.append((bound, running))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(value for value, _ in self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def total(self) -> float:
+        return sum(value for value, _ in self.samples)
+
+
+class TickProfiler:
+    """Accumulates wall-clock time per named phase of a tick, plus match gauges.
+
+    `start()` marks the beginning of a tick and each `lap(name)` charges the
+    time since the previous mark to `name`, so timing a phase costs a single
+    `perf_counter` call. Lifetime totals, counts and maxima and a rolling
+    histogram per phase back `summary()`; the histograms also back
+    `render_prometheus()`.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.maxima: dict[str, float] = {}
+        self.histograms: dict[str, RollingHistogram] = {}
+        self.gauges: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self._mark = 0.0
+
+    def start(self) -> None:
+        self._mark = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.record(phase, now - self._mark)
+        self._mark = now
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        if seconds > self.maxima.get(phase, 0.0):
+            self.maxima[phase] = seconds
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = RollingHistogram(self.window)
+        histogram.observe(seconds)
+
+    def gauge(self, name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+        self.gauges.setdefault(name, {})[key] = value
+
+    def clear_gauge(self, name: str) -> None:
+        """Forget every labelled series of a gauge, e.g. before re-reporting per-connection values."""
+        self.gauges.pop(name, None)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Per-phase timings in milliseconds.
+
+        `total_ms`, `mean_ms`, `count` and `max_ms` cover every lap of the
+        match; `window_count`, `window_p50_ms` and `window_p95_ms` cover only
+        the last `window` laps, like the Prometheus histograms.
+        """
+        return {
+            phase: {
+                "total_ms": total * 1000.0,
+                "mean_ms": total * 1000.0 / self.counts[phase],
+                "count": self.counts[phase],
+                "max_ms": self.maxima.get(phase, 0.0) * 1000.0,
+                "window_count": len(self.histograms[phase].samples),
+                "window_p50_ms": self.histograms[phase].quantile(0.5) * 1000.0,
+                "window_p95_ms": self.histograms[phase].quantile(0.95) * 1000.0,
+            }
+            for phase, total in self.totals.items()
+        }
+
+    def gauge_values(self) -> dict[str, Any]:
+        """Gauges as plain values, or `{label_value: value}` for labelled ones."""
+        values: dict[str, Any] = {}
+        for name, series in self.gauges.items():
+            if list(series) == [()]:
+                values[name] = series[()]
+            else:
+                values[name] = {",".join(v for _, v in key): value for key, value in sorted(series.items())}
+        return values
+
+    def render_prometheus(self, prefix: str = "openforest") -> str:
+        """Prometheus text exposition of the phase histograms and gauges.
+
+        Histogram buckets, `_sum` and `_count` cover the rolling window, not
+        the whole match.
+        """
+        lines = [
+            f"# HELP {prefix}_phase_seconds Tick phase durations over the last {self.window} ticks.",
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for phase, histogram in sorted(self.histograms.items()):
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {histogram.total()!r}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {len(histogram.samples)}')
+        for name, series in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for key, value in sorted(series.items()):
+                labels = ",".join(f'{k}="{v}"' for k, v in key)
+                lines.append(f"{prefix}_{name}{{{labels}}} {value!r}" if labels else f"{prefix}_{name} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    def start(self) -> None:
+        pass
+
+    def lap(self, phase: str) -> None:
+        pass
+
+    def record(self, phase: str, seconds: float) -> None:
+        pass
+
+    def gauge(self, name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        pass
+
+    def clear_gauge(self, name: str) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -1,12 +1,44 @@
+import asyncio
+import bisect
+import dataclasses
 import json
 import os
-from typing import Any
+import queue
+import threading
+from typing import Any, Iterator, Union
+
+from .engine import GameState
+from .models import MatchConfig
+
+from .delta import ENTITY_KEYS
+from .replay_codec import (
+    COMPRESSORS,
+    DecodedChunk,
+    ReplayFormatError,
+    encode_chunk,
+    project,
+    read_chunk,
+    read_header,
+    read_index,
+    write_chunk,
+    write_header,
+    write_index,
+)
+
+BINARY_REPLAY_SUFFIX = ".ofr"
+ACTION_REPLAY_SUFFIX = ".actions.jsonl"
+_MISSING = object()
 
 
 class ReplayLogger:
+    # Whether records hold the state's planets, i.e. `advance_tick` must include them.
+    records_state = True
+
     def __init__(self, path: str) -> None:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         self.path = path
+        # Flush after every record; `BackgroundReplaySink` turns this off and batches flushes itself.
+        self.autoflush = True
         self._file = open(path, "w", encoding="utf-8")
 
     def log_tick(
@@ -16,14 +48,691 @@ class ReplayLogger:
         observations: dict[int, dict[str, Any]],
         actions: dict[int, list[dict[str, Any]]],
     ) -> None:
-        record = {
+        self.write_record(self.make_record(tick, state, observations, actions))
+
+    def make_record(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        return {
             "tick": tick,
             "state": state,
             "observations": observations,
             "actions": actions,
         }
+
+    def write_record(self, record: dict[str, Any]) -> None:
         self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if self.autoflush:
+            self._file.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _id_ordered(items: Any) -> bool:
+    if not isinstance(items, list) or not all(type(item) is dict and "id" in item for item in items):
+        return False
+    return all(a["id"] < b["id"] for a, b in zip(items, items[1:]))
+
+
+def _grown(value: float, growth: float, cap: float) -> float:
+    # Same steps and float arithmetic as `GameState._apply_growth`.
+    grown = value + growth
+    if not grown < cap:
+        grown = float(cap)
+    if not grown > 0.0:
+        grown = 0.0
+    return grown
+
+
+def _predicted_fields(item: dict[str, Any], tick: Any, planets: dict[Any, dict[str, Any]]) -> dict[str, Any]:
+    """The fields of `item` that change on their own by the next record.
+
+    `tick` is the next record section's own tick and `planets` its planets by
+    id. Planets that are not stale grow energy and silver, planets a player
+    sees get `last_seen_tick` set to the observation's tick, and fleets move
+    one tick along the line between their endpoints, with the same float
+    arithmetic as the engine. Deltas only store a field when it differs from
+    this prediction.
+    """
+    if item.get("visibility") == "stale":
+        return {}
+    fields: dict[str, Any] = {}
+    if "energy_growth" in item:
+        fields["energy"] = _grown(item["energy"], item["energy_growth"], item["energy_cap"])
+        fields["silver"] = _grown(item["silver"], item["silver_growth"], item["silver_cap"])
+    if "last_seen_tick" in item and tick is not None:
+        fields["last_seen_tick"] = tick
+    if "total_ticks" in item:
+        source = planets.get(item["source_id"])
+        dest = planets.get(item["dest_id"])
+        if source is not None and dest is not None:
+            # As `GameState._fleet_to_dict`.
+            ticks_remaining = item["ticks_remaining"] - 1
+            progress = 1.0 - (ticks_remaining / item["total_ticks"])
+            fields["ticks_remaining"] = ticks_remaining
+            fields["x"] = source["x"] + (dest["x"] - source["x"]) * progress
+            fields["y"] = source["y"] + (dest["y"] - source["y"]) * progress
+    return fields
+
+
+def _predicted(item: dict[str, Any], tick: Any, planets: dict[Any, dict[str, Any]]) -> dict[str, Any]:
+    fields = _predicted_fields(item, tick, planets)
+    if all(item.get(key, _MISSING) == value for key, value in fields.items()):
+        return item
+    return {**item, **fields}
+
+
+def _diff_predicted(
+    base: dict[Any, dict[str, Any]], current: list[dict[str, Any]], tick: Any, planets: dict[Any, dict[str, Any]]
+) -> dict[str, Any]:
+    """`diff_entities` against what `_predicted` expects each base entity to hold next."""
+    upsert: list[dict[str, Any]] = []
+    seen: set[int] = set()
+    for item in current:
+        item_id = item["id"]
+        seen.add(item_id)
+        previous = base.get(item_id)
+        if previous is None:
+            upsert.append(item)
+            continue
+        expected = _predicted(previous, tick, planets)
+        if expected is not item and expected != item:
+            patch = {key: value for key, value in item.items() if expected.get(key, _MISSING) != value}
+            patch["id"] = item_id
+            upsert.append(patch)
+    remove = [item_id for item_id in base if item_id not in seen]
+    return {"upsert": upsert, "remove": remove}
+
+
+def _section_index(current: dict[str, Any]) -> dict[str, dict[Any, dict[str, Any]]]:
+    return {
+        key: {item["id"]: item for item in value}
+        for key, value in current.items()
+        if key in ENTITY_KEYS and _id_ordered(value)
+    }
+
+
+def _diff_section(
+    base: dict[str, Any], base_index: dict[str, dict[Any, dict[str, Any]]], current: dict[str, Any]
+) -> tuple[dict[str, Any], dict[str, dict[Any, dict[str, Any]]]]:
+    """Delta of one record section (the state, or one observation) plus the id index for the next diff.
+
+    Entity lists are diffed field by field against `_predicted` entities as
+    long as they are ordered by id, which is how the engine emits them;
+    anything else that changed is stored whole under `changed`.
+    """
+    delta: dict[str, Any] = {"changed": {}, "removed": [key for key in base if key not in current]}
+    index = _section_index(current)
+    tick, planets = current.get("tick"), index.get("planets", {})
+    for key, value in current.items():
+        if key in index and key in base_index:
+            delta[key] = _diff_predicted(base_index[key], value, tick, planets)
+        elif base.get(key, _MISSING) != value:
+            delta["changed"][key] = value
+    return delta, index
+
+
+def _apply_section(base: dict[str, Any], delta: dict[str, Any], predicted: bool) -> dict[str, Any]:
+    removed = set(delta["removed"])
+    section = {key: value for key, value in base.items() if key not in removed}
+    section.update(delta["changed"])
+    planets: dict[Any, dict[str, Any]] = {}
+    for key in ENTITY_KEYS:
+        changes = delta.get(key)
+        if changes is None:
+            continue
+        if predicted:
+            # Planets come first in `ENTITY_KEYS`, so fleets see this record's planets.
+            if key != "planets" and not planets and _id_ordered(section.get("planets")):
+                planets = {item["id"]: item for item in section["planets"]}
+            tick = section.get("tick")
+            items = {item["id"]: _predicted(item, tick, planets) for item in base.get(key, [])}
+        else:
+            items = {item["id"]: item for item in base.get(key, [])}
+        for item_id in changes["remove"]:
+            items.pop(item_id, None)
+        for patch in changes["upsert"]:
+            previous = items.get(patch["id"])
+            items[patch["id"]] = {**previous, **patch} if previous is not None else patch
+        section[key] = [items[item_id] for item_id in sorted(items)]
+        if key == "planets":
+            planets = items
+    return section
+
+
+class ReplayDeltaEncoder:
+    """Turns a stream of replay records into a keyframe every `keyframe_interval` ticks and deltas between.
+
+    A delta record keeps `tick` and `actions` as they are. The state and
+    each player's observation are diffed against the previous record after
+    `_predicted` has advanced it: planets that only grew, and visible planets
+    that only had `last_seen_tick` bumped, cost nothing, and neither do
+    unchanged planets (including stale `known_planets` entries repeated in
+    observations). Keyframe ticks are stored as they are without diffing.
+    """
+
+    def __init__(self, keyframe_interval: int) -> None:
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._since_keyframe = 0
+        self._state: tuple[dict[str, Any], dict[str, Any]] | None = None
+        self._observations: dict[Any, tuple[dict[str, Any], dict[str, Any]]] = {}
+
+    def encode(self, record: dict[str, Any]) -> tuple[bool, dict[str, Any]]:
+        """`(is_keyframe, record_to_store)` for the next record."""
+        keyframe = self._state is None or self._since_keyframe >= self.keyframe_interval
+        self._since_keyframe = 1 if keyframe else self._since_keyframe + 1
+        if keyframe:
+            self._state = (record["state"], _section_index(record["state"]))
+            self._observations = {
+                player_id: (observation, _section_index(observation))
+                for player_id, observation in record["observations"].items()
+            }
+            return True, record
+        state_delta, state_index = _diff_section(*self._state, record["state"])
+        self._state = (record["state"], state_index)
+        observations: dict[Any, Any] = {}
+        for player_id, observation in record["observations"].items():
+            previous = self._observations.get(player_id)
+            delta, index = _diff_section(*(previous or ({}, {})), observation)
+            self._observations[player_id] = (observation, index)
+            observations[player_id] = {"delta": delta} if previous is not None else {"full": observation}
+        for player_id in [pid for pid in self._observations if pid not in record["observations"]]:
+            del self._observations[player_id]
+        delta = {"tick": record["tick"], "predicted": True, "state": state_delta, "observations": observations}
+        return False, {**delta, "actions": record["actions"]}
+
+
+def apply_replay_delta(base: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    """Rebuild the full record that `ReplayDeltaEncoder` stored as `delta` after `base`.
+
+    Deltas written before entities were predicted carry no `predicted` flag
+    and are applied as plain field diffs. Unchanged entities are shared with
+    `base`, so treat records as read-only.
+    """
+    predicted = bool(delta.get("predicted"))
+    observations = {}
+    for player_id, entry in delta["observations"].items():
+        if "full" in entry:
+            observations[player_id] = entry["full"]
+        else:
+            observations[player_id] = _apply_section(base["observations"][player_id], entry["delta"], predicted)
+    return {
+        "tick": delta["tick"],
+        "state": _apply_section(base["state"], delta["state"], predicted),
+        "observations": observations,
+        "actions": delta["actions"],
+    }
+
+
+class BinaryReplayLogger:
+    """Writes the same per-tick records as `ReplayLogger` into a seekable binary file.
+
+    Ticks are buffered and written `chunk_ticks` at a time as one compressed,
+    columnar chunk. `close()` appends an index of every chunk's offset and
+    ticks, so readers can jump straight to any tick; a file that was never
+    closed is still readable by scanning its chunks. With a positive
+    `keyframe_interval` only every K-th tick is stored in full and the rest
+    as `ReplayDeltaEncoder` deltas.
+    """
+
+    records_state = True
+
+    def __init__(
+        self,
+        path: str,
+        chunk_ticks: int = 16,
+        compression: str = "zlib",
+        metadata: dict[str, Any] | None = None,
+        keyframe_interval: int = 0,
+    ) -> None:
+        if compression not in COMPRESSORS:
+            raise ValueError(f"unknown replay compression {compression!r}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.chunk_ticks = max(1, chunk_ticks)
+        self.compression = compression
+        self.autoflush = True
+        self._compress = COMPRESSORS[compression][0]
+        self._deltas = ReplayDeltaEncoder(keyframe_interval) if keyframe_interval > 0 else None
+        self._pending: list[tuple[int, dict[str, Any]]] = []
+        self._pending_keyframes: list[bool] = []
+        self._chunks: list[dict[str, Any]] = []
+        self._file = open(path, "wb")
+        header = {"compression": compression, "keyframe_interval": max(0, keyframe_interval)}
+        write_header(self._file, {**header, **(metadata or {})})
+
+    def log_tick(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> None:
+        self.write_record(self.make_record(tick, state, observations, actions))
+
+    def make_record(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        return {"tick": tick, "state": state, "observations": observations, "actions": actions}
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        tick = record["tick"]
+        keyframe = True
+        if self._deltas is not None:
+            keyframe, record = self._deltas.encode(record)
+        self._pending.append((tick, record))
+        self._pending_keyframes.append(keyframe)
+        if len(self._pending) >= self.chunk_ticks:
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+        ticks = [tick for tick, _ in self._pending]
+        offset = self._file.tell()
+        keyframes = self._pending_keyframes if self._deltas is not None else None
+        write_chunk(self._file, ticks, self._compress(encode_chunk(self._pending, keyframes)))
+        if self.autoflush:
+            self._file.flush()
+        chunk: dict[str, Any] = {"offset": offset, "ticks": ticks}
+        if keyframes is not None:
+            chunk["keyframes"] = keyframes
+        self._chunks.append(chunk)
+        self._pending = []
+        self._pending_keyframes = []
+
+    def flush(self) -> None:
+        """Flush written chunks to disk; ticks still buffered for the next chunk stay in memory."""
         self._file.flush()
 
     def close(self) -> None:
+        if self._file.closed:
+            return
+        self._write_pending()
+        write_index(self._file, self._chunks)
         self._file.close()
+
+
+class BinaryReplayReader:
+    """Random access to a file written by `BinaryReplayLogger`.
+
+    `read_tick(tick)` decompresses only the chunk holding that tick (the most
+    recent chunk is kept, so reading neighbouring ticks is cheap) and
+    decodes only that tick's record. In a delta-encoded file it starts from
+    the nearest keyframe at or before the tick, or from the last tick it
+    rebuilt when that is closer, and applies the deltas in between.
+    Records may share entries with each other, so treat them as read-only.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self.metadata = read_header(self._file)
+            compression = self.metadata.get("compression", "zlib")
+            if compression not in COMPRESSORS:
+                raise ReplayFormatError(f"unknown replay compression {compression!r}")
+            self._decompress = COMPRESSORS[compression][1]
+            self._data_start = self._file.tell()
+            chunks = read_index(self._file)
+            self._chunks = chunks if chunks is not None else self._scan_chunks()
+        except Exception:
+            self._file.close()
+            raise
+        # Entries in logged order, which is the order deltas apply in.
+        self._entries: list[tuple[int, int]] = []
+        self._keyframes: list[int] = []
+        self._sequence: dict[int, int] = {}
+        for chunk_index, chunk in enumerate(self._chunks):
+            flags = chunk.get("keyframes") or [True] * len(chunk["ticks"])
+            for position, (tick, keyframe) in enumerate(zip(chunk["ticks"], flags)):
+                if keyframe:
+                    self._keyframes.append(len(self._entries))
+                self._sequence[tick] = len(self._entries)
+                self._entries.append((chunk_index, position))
+        self.delta_encoded = any(chunk.get("keyframes") for chunk in self._chunks)
+        self.ticks = sorted(self._sequence)
+        self._cached: tuple[int, DecodedChunk] | None = None
+        self._rebuilt: tuple[int, dict[str, Any]] | None = None
+
+    def _scan_chunks(self) -> list[dict[str, Any]]:
+        """Rebuild the index of an unclosed file, stopping at the first torn chunk."""
+        chunks = []
+        offset = self._data_start
+        while True:
+            try:
+                data, next_offset = read_chunk(self._file, offset)
+                decoded = DecodedChunk(self._decompress(data))
+            except Exception:
+                return chunks
+            chunk: dict[str, Any] = {"offset": offset, "ticks": decoded.ticks}
+            if not all(decoded.keyframes):
+                chunk["keyframes"] = decoded.keyframes
+            chunks.append(chunk)
+            offset = next_offset
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for tick in self.ticks:
+            yield self.read_tick(tick)
+
+    def _chunk(self, chunk_index: int) -> DecodedChunk:
+        if self._cached is None or self._cached[0] != chunk_index:
+            data, _ = read_chunk(self._file, self._chunks[chunk_index]["offset"])
+            self._cached = (chunk_index, DecodedChunk(self._decompress(data)))
+        return self._cached[1]
+
+    def _stored(self, sequence: int, projection: dict[str, Any] | None = None) -> dict[str, Any]:
+        chunk_index, position = self._entries[sequence]
+        return self._chunk(chunk_index).record(position, projection)
+
+    def read_tick(self, tick: int, projection: dict[str, Any] | None = None) -> dict[str, Any]:
+        """One tick's record, optionally cut down to a `parse_fields` projection.
+
+        Without deltas, a projection also skips decoding the unselected
+        columns; delta-encoded ticks are rebuilt whole and then projected.
+        """
+        sequence = self._sequence.get(tick)
+        if sequence is None:
+            raise KeyError(f"tick {tick} is not in {self.path}")
+        if not self.delta_encoded:
+            return self._stored(sequence, projection)
+        keyframes = self._keyframes
+        start = keyframes[bisect.bisect_right(keyframes, sequence) - 1]
+        if self._rebuilt is not None and start <= self._rebuilt[0] <= sequence:
+            current, record = self._rebuilt
+        else:
+            current, record = start, self._stored(start)
+        while current < sequence:
+            current += 1
+            record = apply_replay_delta(record, self._stored(current))
+        self._rebuilt = (sequence, record)
+        return project(record, projection)
+
+    def seek(self, tick: int) -> Iterator[dict[str, Any]]:
+        """Records from the first logged tick at or after `tick` onwards."""
+        for logged in self.ticks[bisect.bisect_left(self.ticks, tick) :]:
+            yield self.read_tick(logged)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BinaryReplayReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ReplayDesyncError(RuntimeError):
+    def __init__(self, tick: int, expected: str, actual: str) -> None:
+        super().__init__(f"state hash mismatch at tick {tick}: replay has {expected}, re-simulation gives {actual}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+class ActionReplayLogger:
+    """Records only what is needed to re-simulate a match: config, roster and actions per tick.
+
+    The first line is a header with the config, player names and the
+    starting `state_hash()`; every following line holds one tick's revealed
+    actions and the state hash after it. `resimulate` replays the file
+    through `GameState.advance_tick` and checks every hash.
+    """
+
+    records_state = False
+
+    def __init__(self, path: str, state: GameState) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.state = state
+        self.autoflush = True
+        self._file = open(path, "w", encoding="utf-8")
+        header = {
+            "format": "actions",
+            "config": dataclasses.asdict(state.config),
+            "players": [player.name for player in state.players],
+            "start_tick": state.tick,
+            "hash": state.state_hash(),
+        }
+        self._file.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+    def log_tick(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> None:
+        self.write_record(self.make_record(tick, state, observations, actions))
+
+    def make_record(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        # Hashes the live engine, so this must run right after the tick it records.
+        return {"tick": tick, "actions": actions, "hash": self.state.state_hash()}
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if self.autoflush:
+            self._file.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def resimulate(path: str, verify: bool = True, observe: bool = True) -> Iterator[tuple[GameState, dict[str, Any]]]:
+    """Replay an `ActionReplayLogger` file, yielding `(state, record)` after each tick.
+
+    `record` has the shape `ReplayLogger` writes: tick, state snapshot,
+    observations and actions.
+
+    With `verify`, a `ReplayDesyncError` is raised at the first tick whose
+    state hash differs from the recorded one. Observations are rebuilt the
+    way the server builds them (each player, every tick, starting before the
+    first tick) because they also maintain each player's known planets;
+    pass `observe=False` to skip them when only the world state is needed.
+    The yielded state is live and advances with the iteration.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("format") != "actions":
+            raise ValueError(f"{path} is not an actions-only replay")
+        state = GameState(MatchConfig(**header["config"]), header["players"])
+        if verify and state.state_hash() != header["hash"]:
+            raise ReplayDesyncError(state.tick, header["hash"], state.state_hash())
+        if observe:
+            for player in state.players:
+                state.observation_for_player(player.id)
+        for line in file:
+            record = json.loads(line)
+            actions = {int(player_id): acts for player_id, acts in record["actions"].items()}
+            snapshot = state.advance_tick(actions)
+            if verify:
+                actual = state.state_hash()
+                if actual != record["hash"]:
+                    raise ReplayDesyncError(record["tick"], record["hash"], actual)
+            observations: dict[int, dict[str, Any]] = {}
+            if observe:
+                observations = {
+                    player.id: state.observation_for_player(player.id, snapshot["scans"].get(player.id, []))
+                    for player in state.players
+                }
+            yield state, {
+                "tick": record["tick"],
+                "state": snapshot,
+                "observations": observations,
+                "actions": actions,
+            }
+
+
+_STOP = object()
+DROP_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+
+class BackgroundReplaySink:
+    """Hands replay records to a writer thread so `log_tick` returns without serializing or touching disk.
+
+    `log_tick` is a coroutine for the event loop: it builds the record (the
+    action logger's state hash must be taken on the caller's thread) and
+    queues it. When `max_pending` records are waiting, `policy` decides:
+    `block` waits for the writer on a worker thread (backpressure without
+    stalling the loop), `drop_newest` discards the incoming record and
+    `drop_oldest` evicts the oldest queued one; drops are counted in
+    `dropped`. Actions-only replays cannot skip ticks and only accept
+    `block`. The writer flushes after `flush_every` records, or once the
+    queue has been idle for `flush_interval_s`. `close()` drains everything
+    queued, closes the wrapped logger and re-raises any writer error.
+    """
+
+    def __init__(
+        self,
+        logger: "AnyReplayLogger",
+        max_pending: int = 256,
+        policy: str = "block",
+        flush_every: int = 16,
+        flush_interval_s: float = 1.0,
+    ) -> None:
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"unknown replay drop policy {policy!r}")
+        if policy != "block" and isinstance(logger, ActionReplayLogger):
+            raise ValueError("actions-only replays need every tick to re-simulate; use the block policy")
+        self.logger = logger
+        self.policy = policy
+        self.flush_every = max(1, flush_every)
+        self.flush_interval_s = flush_interval_s
+        self.dropped = 0
+        self.written = 0
+        self.error: BaseException | None = None
+        logger.autoflush = False
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, max_pending))
+        self._thread = threading.Thread(target=self._run, name="replay-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def records_state(self) -> bool:
+        return self.logger.records_state
+
+    async def log_tick(
+        self,
+        tick: int,
+        state: dict[str, Any],
+        observations: dict[int, dict[str, Any]],
+        actions: dict[int, list[dict[str, Any]]],
+    ) -> None:
+        if self.error is not None:
+            self.dropped += 1
+            return
+        record = self.logger.make_record(tick, state, observations, actions)
+        if self.policy == "block":
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                await asyncio.to_thread(self._queue.put, record)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def _run(self) -> None:
+        unflushed = 0
+        while True:
+            try:
+                record = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                if unflushed:
+                    self._flush()
+                    unflushed = 0
+                continue
+            if record is _STOP:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.logger.write_record(record)
+            except BaseException as exc:  # surfaced by close()
+                self.error = exc
+                continue
+            self.written += 1
+            unflushed += 1
+            if unflushed >= self.flush_every:
+                self._flush()
+                unflushed = 0
+
+    def _flush(self) -> None:
+        try:
+            self.logger.flush()
+        except BaseException as exc:
+            self.error = exc
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.logger.close()
+        if self.error is not None:
+            raise self.error
+
+
+AnyReplayLogger = Union[ReplayLogger, BinaryReplayLogger, ActionReplayLogger]
+
+
+def open_replay_logger(path: str, keyframe_interval: int = 0, state: GameState | None = None) -> AnyReplayLogger:
+    """Pick a replay writer from the file name.
+
+    `.actions.jsonl` records actions and state hashes only (and needs the
+    live `state`), other `.jsonl` paths get full JSONL, and anything else
+    the binary format, delta-encoded when `keyframe_interval` is positive.
+    """
+    if path.endswith(ACTION_REPLAY_SUFFIX):
+        if state is None:
+            raise ValueError("actions-only replays need the GameState they record")
+        return ActionReplayLogger(path, state)
+    if path.endswith(".jsonl"):
+        return ReplayLogger(path)
+    return BinaryReplayLogger(path, keyframe_interval=keyframe_interval)
+
+
+def export_jsonl(source_path: str, out_path: str) -> int:
+    """Rewrite a binary replay as `ReplayLogger` JSONL; returns the number of ticks written."""
+    with BinaryReplayReader(source_path) as reader, open(out_path, "w", encoding="utf-8") as out:
+        for record in reader:
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return len(reader)
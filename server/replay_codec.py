@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, BinaryIO, Callable
+
+# File layout: header, then chunk frames, then a compressed JSON index and a
+# fixed-size footer pointing at it.
+MAGIC = b"OFRP"
+FORMAT_VERSION = 1
+CHUNK_MAGIC = b"OFCH"
+INDEX_MAGIC = b"OFIX"
+_HEADER = struct.Struct("<4sHI")  # magic, version, metadata length
+_CHUNK = struct.Struct("<4sIqI")  # magic, compressed length, first tick, tick count
+_FOOTER = struct.Struct("<QI4s")  # index offset, index length, magic
+_U32 = struct.Struct("<I")
+_NULL_INT = -(1 << 63)
+
+COMPRESSORS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "none": (bytes, bytes),
+}
+
+
+class ReplayFormatError(ValueError):
+    pass
+
+
+def _pack(typecode: str, values: Any) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _fits_int64(values: list[int]) -> bool:
+    # The smallest int64 is reserved as the `None` marker of nullable columns.
+    return _NULL_INT < min(values) and max(values) < -_NULL_INT
+
+
+def _unpack(typecode: str, blob: bytes) -> list[Any]:
+    unpacked = array(typecode)
+    unpacked.frombytes(blob)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+class RecordEncoder:
+    """Splits a JSON-like record into a small JSON skeleton plus binary column blobs.
+
+    Lists of same-keyed dicts become tables with one column per key, and
+    homogeneous lists of floats, ints (optionally with `None`), bools or
+    strings are packed into typed arrays. Dicts with mixed keys are split
+    into one table per key set. Every list in the skeleton is tagged (`$t`
+    table, `$g` grouped tables, `$c` column, `$l` plain list) so the decoder
+    never has to guess. Each blob is named by its path in the record, which
+    lets a chunk store the same column from consecutive ticks side by side.
+    """
+
+    def __init__(self) -> None:
+        self.blobs: list[tuple[str, bytes]] = []
+
+    def encode(self, value: Any, path: str = "") -> Any:
+        if isinstance(value, dict):
+            return {str(key): self.encode(item, f"{path}.{key}") for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return self._encode_list(list(value), path)
+        return value
+
+    def _blob(self, path: str, data: bytes) -> int:
+        self.blobs.append((path, data))
+        return len(self.blobs) - 1
+
+    def _encode_list(self, values: list[Any], path: str) -> Any:
+        if not values:
+            return ["$l", []]
+        first = values[0]
+        if isinstance(first, dict):
+            keys = tuple(first)
+            if all(type(row) is dict and tuple(row) == keys for row in values):
+                columns = {str(key): self._encode_list([row[key] for row in values], f"{path}.{key}") for key in keys}
+                return ["$t", len(values), columns]
+            if all(type(row) is dict for row in values):
+                return self._encode_groups(values, path)
+            return ["$l", [self.encode(item, path) for item in values]]
+        kinds = set(map(type, values))
+        if kinds == {float}:
+            return ["$c", "d", self._blob(path, _pack("d", values))]
+        if kinds == {int} and _fits_int64(values):
+            return ["$c", "q", self._blob(path, _pack("q", values))]
+        if kinds == {int, type(None)} and _fits_int64([v for v in values if v is not None]):
+            packed = _pack("q", [_NULL_INT if v is None else v for v in values])
+            return ["$c", "n", self._blob(path, packed)]
+        if kinds == {bool}:
+            return ["$c", "b", self._blob(path, bytes(values))]
+        if kinds == {str}:
+            uniques: dict[str, int] = {}
+            indices = [uniques.setdefault(v, len(uniques)) for v in values]
+            return ["$c", "s", self._blob(path, _pack("I", indices)), list(uniques)]
+        return ["$l", [self.encode(item, path) for item in values]]
+
+
+    def _encode_groups(self, rows: list[dict[str, Any]], path: str) -> Any:
+        """Dicts with differing keys (such as field-level patches) as one table per key set."""
+        groups: dict[tuple[Any, ...], list[int]] = {}
+        for position, row in enumerate(rows):
+            groups.setdefault(tuple(row), []).append(position)
+        return [
+            "$g",
+            len(rows),
+            [
+                [self._encode_list(positions, f"{path}.$pos"), self._encode_list([rows[i] for i in positions], path)]
+                for positions in groups.values()
+            ],
+        ]
+
+
+def parse_fields(fields: Any) -> dict[str, Any] | None:
+    """Turn dotted paths such as `state.scores` or `observations.2` into a projection tree.
+
+    A `None` leaf keeps the whole value, and a path running through a list
+    applies to each element, so `state.planets.owner` keeps just the owner
+    of every planet. `None` (no fields) keeps everything.
+    """
+    if fields is None:
+        return None
+    tree: dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:  # an ancestor is already kept whole
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def project(value: Any, projection: dict[str, Any] | None) -> Any:
+    if projection is None:
+        return value
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in projection.items() if key in value}
+    if isinstance(value, list):
+        return [project(item, projection) for item in value]
+    return value
+
+
+def decode_record(skeleton: Any, blobs: Any, projection: dict[str, Any] | None = None) -> Any:
+    """Inverse of `RecordEncoder.encode`; with a `projection`, only the selected keys and columns are decoded."""
+    if isinstance(skeleton, dict):
+        if projection is None:
+            return {key: decode_record(item, blobs) for key, item in skeleton.items()}
+        return {key: decode_record(skeleton[key], blobs, sub) for key, sub in projection.items() if key in skeleton}
+    if isinstance(skeleton, list):
+        tag = skeleton[0]
+        if tag == "$t":
+            count, columns = skeleton[1], skeleton[2]
+            if projection is None:
+                keys = list(columns)
+                decoded = [decode_record(columns[key], blobs) for key in keys]
+            else:
+                keys = [key for key in projection if key in columns]
+                decoded = [decode_record(columns[key], blobs, projection[key]) for key in keys]
+            return [dict(zip(keys, row)) for row in zip(*decoded)] if keys else [{} for _ in range(count)]
+        if tag == "$c":
+            kind, blob = skeleton[1], blobs[skeleton[2]]
+            if kind == "d":
+                return _unpack("d", blob)
+            if kind == "q":
+                return _unpack("q", blob)
+            if kind == "n":
+                return [None if v == _NULL_INT else v for v in _unpack("q", blob)]
+            if kind == "b":
+                return [v != 0 for v in blob]
+            if kind == "s":
+                uniques = skeleton[3]
+                return [uniques[i] for i in _unpack("I", blob)]
+            raise ReplayFormatError(f"unknown column kind {kind!r}")
+        if tag == "$g":
+            rows: list[Any] = [None] * skeleton[1]
+            for positions, table in skeleton[2]:
+                for position, row in zip(decode_record(positions, blobs), decode_record(table, blobs, projection)):
+                    rows[position] = row
+            return rows
+        if tag == "$l":
+            return [decode_record(item, blobs, projection) for item in skeleton[1]]
+        raise ReplayFormatError(f"unknown list tag {tag!r}")
+    return skeleton
+
+
+def encode_chunk(records: list[tuple[int, Any]], keyframes: list[bool] | None = None) -> bytes:
+    """Serialize `(tick, record)` pairs into one uncompressed chunk payload.
+
+    `keyframes` flags which records are full states in a delta-encoded
+    replay; it is stored so that a file can be re-indexed without its footer.
+
+    Blobs are laid out grouped by path, so the zlib window sees, say, the
+    planet `x` column of every tick in the chunk back to back.
+    """
+    skeletons = []
+    placed: list[tuple[str, int, int, bytes]] = []
+    for position, (_, record) in enumerate(records):
+        encoder = RecordEncoder()
+        skeletons.append(encoder.encode(record))
+        placed.extend((path, position, local, data) for local, (path, data) in enumerate(encoder.blobs))
+    placed.sort(key=lambda item: (item[0], item[1]))
+    spans: list[list[Any]] = [[None] * count for count in _blob_counts(placed, len(records))]
+    offset = 0
+    body = []
+    for _, position, local, data in placed:
+        spans[position][local] = [offset, len(data)]
+        body.append(data)
+        offset += len(data)
+    header_fields: dict[str, Any] = {"ticks": [tick for tick, _ in records], "skeletons": skeletons, "blobs": spans}
+    if keyframes is not None:
+        header_fields["keyframes"] = keyframes
+    header = json.dumps(header_fields, separators=(",", ":")).encode("utf-8")
+    return _U32.pack(len(header)) + header + b"".join(body)
+
+
+def _blob_counts(placed: list[tuple[str, int, int, bytes]], records: int) -> list[int]:
+    counts = [0] * records
+    for _, position, _, _ in placed:
+        counts[position] += 1
+    return counts
+
+
+class DecodedChunk:
+    """A decompressed chunk; records are decoded lazily, one tick at a time."""
+
+    def __init__(self, payload: bytes) -> None:
+        (header_len,) = _U32.unpack_from(payload, 0)
+        header = json.loads(payload[_U32.size : _U32.size + header_len])
+        self.ticks: list[int] = header["ticks"]
+        self.keyframes: list[bool] = header.get("keyframes", [True] * len(self.ticks))
+        self._skeletons = header["skeletons"]
+        self._spans = header["blobs"]
+        self._body = memoryview(payload)[_U32.size + header_len :]
+
+    def record(self, position: int, projection: dict[str, Any] | None = None) -> Any:
+        return decode_record(self._skeletons[position], _BlobSlices(self._body, self._spans[position]), projection)
+
+
+class _BlobSlices:
+    """Blob lookup that only slices out the blobs a (projected) decode actually touches."""
+
+    def __init__(self, body: memoryview, spans: list[list[int]]) -> None:
+        self._body = body
+        self._spans = spans
+
+    def __getitem__(self, index: int) -> bytes:
+        start, length = self._spans[index]
+        return self._body[start : start + length].tobytes()
+
+
+def write_header(file: BinaryIO, metadata: dict[str, Any]) -> None:
+    encoded = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded)) + encoded)
+
+
+def read_header(file: BinaryIO) -> dict[str, Any]:
+    raw = file.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise ReplayFormatError("file too short for a replay header")
+    magic, version, meta_len = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ReplayFormatError("not a binary replay file")
+    if version != FORMAT_VERSION:
+        raise ReplayFormatError(f"unsupported replay format version {version}")
+    return json.loads(file.read(meta_len))
+
+
+def write_chunk(file: BinaryIO, ticks: list[int], compressed: bytes) -> None:
+    file.write(_CHUNK.pack(CHUNK_MAGIC, len(compressed), ticks[0], len(ticks)))
+    file.write(compressed)
+
+
+def read_chunk(file: BinaryIO, offset: int) -> tuple[bytes, int]:
+    """Compressed payload of the chunk frame at `offset`, and the offset just past it."""
+    file.seek(offset)
+    raw = file.read(_CHUNK.size)
+    if len(raw) < _CHUNK.size:
+        raise ReplayFormatError(f"truncated chunk frame at {offset}")
+    magic, length, _, _ = _CHUNK.unpack(raw)
+    if magic != CHUNK_MAGIC:
+        raise ReplayFormatError(f"no chunk frame at {offset}")
+    data = file.read(length)
+    if len(data) < length:
+        raise ReplayFormatError(f"truncated chunk at {offset}")
+    return data, offset + _CHUNK.size + length
+
+
+def write_index(file: BinaryIO, chunks: list[dict[str, Any]]) -> None:
+    offset = file.tell()
+    encoded = zlib.compress(json.dumps({"chunks": chunks}, separators=(",", ":")).encode("utf-8"))
+    file.write(encoded)
+    file.write(_FOOTER.pack(offset, len(encoded), INDEX_MAGIC))
+
+
+def read_index(file: BinaryIO) -> list[dict[str, Any]] | None:
+    """The footer index, or `None` when the writer never closed the file."""
+    end = file.seek(0, 2)
+    if end < _FOOTER.size:
+        return None
+    file.seek(end - _FOOTER.size)
+    offset, length, magic = _FOOTER.unpack(file.read(_FOOTER.size))
+    if magic != INDEX_MAGIC or offset + length + _FOOTER.size != end:
+        return None
+    file.seek(offset)
+    return json.loads(zlib.decompress(file.read(length)))["chunks"]
@@ -0,0 +1,166 @@
+import json
+from typing import Any, Iterable, Iterator
+
+from .replay import ACTION_REPLAY_SUFFIX, BinaryReplayReader, resimulate
+from .replay_codec import parse_fields, project
+
+# Top-level keys of a replay record, in the order every writer emits them.
+RECORD_SECTIONS = ("tick", "state", "observations", "actions")
+_DECODER = json.JSONDecoder()
+
+
+def iter_replay(path: str, fields: Iterable[str] | None = None) -> Iterator[dict[str, Any]]:
+    """Stream a replay one tick at a time, whatever its format, keeping only `fields`.
+
+    `fields` are dotted paths into the record, e.g. `state.scores`,
+    `observations.2` or `state.planets.owner`; `tick` is always included.
+    Records come out as the JSONL format would parse them (player ids as
+    string keys), and only one tick is held in memory at a time.
+
+    Each format skips what it can: JSONL lines only decode the selected
+    sections and keys, binary replays only decode the selected columns, and
+    actions-only replays skip rebuilding observations unless asked for.
+    """
+    projection = parse_fields(fields)
+    if projection is not None:
+        projection = {"tick": None, **projection}
+    if path.endswith(ACTION_REPLAY_SUFFIX):
+        yield from _iter_actions(path, projection)
+    elif path.endswith(".jsonl"):
+        yield from _iter_jsonl(path, projection)
+    else:
+        with BinaryReplayReader(path) as reader:
+            for tick in reader.ticks:
+                yield reader.read_tick(tick, projection)
+
+
+def _iter_actions(path: str, projection: dict[str, Any] | None) -> Iterator[dict[str, Any]]:
+    observe = projection is None or "observations" in projection
+    for _, record in resimulate(path, verify=False, observe=observe):
+        # Player ids are still ints here; key them as strings first so `observations.2` matches.
+        record = {**record, "observations": _str_keys(record["observations"]), "actions": _str_keys(record["actions"])}
+        if "scans" in record["state"]:
+            record["state"] = {**record["state"], "scans": _str_keys(record["state"]["scans"])}
+        # Round-trip so the remaining keys and containers look exactly as in the other formats.
+        yield json.loads(json.dumps(project(record, projection), separators=(",", ":")))
+
+
+def _str_keys(section: dict[Any, Any]) -> dict[str, Any]:
+    return {str(key): value for key, value in section.items()}
+
+
+def _iter_jsonl(path: str, projection: dict[str, Any] | None) -> Iterator[dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if projection is None:
+                yield json.loads(line)
+            else:
+                yield project_jsonl_line(line, projection)
+
+
+def project_jsonl_line(line: str, projection: dict[str, Any]) -> dict[str, Any]:
+    """Decode only the projected parts of one `ReplayLogger` line.
+
+    Sections are located by their keys rather than parsed: a quote inside a
+    JSON string is always escaped, so `,"observations":` can only be the
+    structural key, and engine records never reuse the top-level or
+    state-level key names deeper in. Lines that do not look like that are
+    decoded whole.
+    """
+    bounds = _section_bounds(line)
+    if bounds is None:
+        return project(json.loads(line), projection)
+    record: dict[str, Any] = {}
+    for section, sub in projection.items():
+        span = bounds.get(section)
+        if span is None:
+            continue
+        text = line[span[0] : span[1]]
+        if sub is None:
+            record[section] = json.loads(text)
+        elif isinstance(sub, dict):
+            record[section] = _project_object(text, sub)
+    return record
+
+
+def _section_bounds(line: str) -> dict[str, tuple[int, int]] | None:
+    starts = []
+    position = 0
+    for index, section in enumerate(RECORD_SECTIONS):
+        marker = f'{"{" if index == 0 else ","}"{section}":'
+        found = line.find(marker, position)
+        if found < 0:
+            return None
+        starts.append((found, found + len(marker)))
+        position = found + len(marker)
+    end = line.rstrip().rfind("}")
+    bounds = {}
+    for index, section in enumerate(RECORD_SECTIONS):
+        value_end = starts[index + 1][0] if index + 1 < len(starts) else end
+        bounds[section] = (starts[index][1], value_end)
+    return bounds
+
+
+def _project_object(text: str, projection: dict[str, Any]) -> Any:
+    """Pull the projected keys out of one JSON object's text, decoding each value on its own."""
+    if not text.startswith("{"):
+        return project(json.loads(text), projection)
+    result: dict[str, Any] = {}
+    for key, sub in projection.items():
+        marker = json.dumps(key) + ":"
+        found = text.find(marker)
+        if found < 0:
+            continue
+        value, _ = _DECODER.raw_decode(text, found + len(marker))
+        result[key] = project(value, sub)
+    return result
+
+
+SERIES_FIELDS = (
+    "state.scores.id",
+    "state.scores.score",
+    "state.planets.owner",
+    "state.planets.energy",
+    "state.fleets.id",
+    "state.fleets.owner",
+)
+SERIES_COLUMNS = ("tick", "player", "score", "planets", "energy", "fleets_launched")
+
+
+def player_series(path: str) -> Iterator[dict[str, Any]]:
+    """Yield one row per tick and player: score, planets owned, energy held on them and fleets launched.
+
+    Launches are counted from fleet ids above the highest id seen so far, so
+    a fleet that launches and lands within the same tick is not counted.
+    Only the running maximum is carried between ticks, so memory does not
+    grow with match length.
+    """
+    last_fleet_id = -1
+    for record in iter_replay(path, SERIES_FIELDS):
+        state = record.get("state", {})
+        planets: dict[Any, int] = {}
+        energy: dict[Any, float] = {}
+        for planet in state.get("planets", []):
+            owner = planet["owner"]
+            if owner is not None:
+                planets[owner] = planets.get(owner, 0) + 1
+                energy[owner] = energy.get(owner, 0.0) + planet["energy"]
+        launched: dict[Any, int] = {}
+        newest = last_fleet_id
+        for fleet in state.get("fleets", []):
+            if fleet["id"] > last_fleet_id:
+                launched[fleet["owner"]] = launched.get(fleet["owner"], 0) + 1
+                newest = max(newest, fleet["id"])
+        last_fleet_id = newest
+        for entry in state.get("scores", []):
+            player = entry["id"]
+            yield {
+                "tick": record["tick"],
+                "player": player,
+                "score": entry["score"],
+                "planets": planets.get(player, 0),
+                "energy": round(energy.get(player, 0.0), 6),
+                "fleets_launched": launched.get(player, 0),
+            }
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+
+
+class CapRanking:
+    """One player's planets ordered by energy_cap, largest first, ties by id.
+
+    Kept up to date on capture, loss and upgrade so the per-tick territory
+    score reads a cached top-N sum instead of sorting every owned planet.
+    """
+
+    def __init__(self, top_n: int) -> None:
+        self.top_n = top_n
+        self._keys: list[tuple[float, int]] = []
+        self._top_sum: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def copy(self) -> CapRanking:
+        clone = CapRanking(self.top_n)
+        clone._keys = list(self._keys)
+        clone._top_sum = self._top_sum
+        return clone
+
+    def add(self, planet_id: int, energy_cap: float) -> None:
+        key = (-energy_cap, planet_id)
+        if bisect_left(self._keys, key) < self.top_n:
+            self._top_sum = None
+        insort(self._keys, key)
+
+    def remove(self, planet_id: int, energy_cap: float) -> None:
+        key = (-energy_cap, planet_id)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+            if index < self.top_n:
+                self._top_sum = None
+
+    def top_sum(self) -> float:
+        if self._top_sum is None:
+            # Summed largest-first, the same order as sorting owned planets by cap.
+            self._top_sum = sum(-neg_cap for neg_cap, _ in self._keys[: self.top_n])
+        return self._top_sum
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import copy
+import dataclasses
+from dataclasses import dataclass
+from typing import Any
+
+from .fleets import FleetScheduler
+from .models import Ping, PlayerState
+from .planet_store import PlanetArrays
+from .scoring import CapRanking
+from .visibility import SensorCoverage
+
+
+@dataclass
+class GameSnapshot:
+    """Everything `GameState` needs to resume a match from a given tick.
+
+    Planets are captured as the engine's cached planet dicts, which are never
+    mutated once built, so they are shared rather than copied; with the numpy
+    store the columns are copied instead. Index structures use their own
+    `copy()` (sensor coverage is copy-on-write). Config and the spatial grid
+    never change and are not part of the snapshot.
+    """
+
+    tick: int
+    next_fleet_id: int
+    next_ping_id: int
+    planet_dicts: dict[int, dict[str, Any]]
+    planet_list: list[dict[str, Any]]
+    store: PlanetArrays | None
+    fleets: FleetScheduler
+    pings: list[Ping]
+    players: list[PlayerState]
+    owned: dict[int, set[int]]
+    held_artifacts: dict[int, set[int]]
+    rankings: dict[int, CapRanking]
+    coverage: dict[int, SensorCoverage]
+    fleet_dicts: dict[int, dict[str, Any]]
+    fleet_dicts_clock: int
+    ping_dicts: dict[int, dict[str, Any]]
+    score_dicts: list[dict[str, Any]] | None
+
+    def copy(self) -> GameSnapshot:
+        """Copy every mutable container so the result can be adopted by a live `GameState`."""
+        return GameSnapshot(
+            tick=self.tick,
+            next_fleet_id=self.next_fleet_id,
+            next_ping_id=self.next_ping_id,
+            planet_dicts=dict(self.planet_dicts),
+            planet_list=self.planet_list,
+            store=self.store.copy() if self.store is not None else None,
+            fleets=self.fleets.copy(),
+            pings=[copy.copy(ping) for ping in self.pings],
+            players=[
+                dataclasses.replace(player, known_planets=dict(player.known_planets)) for player in self.players
+            ],
+            owned={player_id: set(ids) for player_id, ids in self.owned.items()},
+            held_artifacts={player_id: set(ids) for player_id, ids in self.held_artifacts.items()},
+            rankings={player_id: ranking.copy() for player_id, ranking in self.rankings.items()},
+            coverage={player_id: coverage.copy() for player_id, coverage in self.coverage.items()},
+            fleet_dicts=dict(self.fleet_dicts),
+            fleet_dicts_clock=self.fleet_dicts_clock,
+            ping_dicts=dict(self.ping_dicts),
+            score_dicts=self.score_dicts,
+        )
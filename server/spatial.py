@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable, Iterator
+
+from .utils import distance
+
+
+MAP_MIN = -1.0
+MAP_MAX = 1.0
+TARGET_PER_CELL = 4
+MAX_CELLS_PER_SIDE = 512
+# Widens cell ranges slightly so float rounding at cell borders never drops a candidate.
+CELL_EPSILON = 1e-9
+
+
+class PlanetGrid:
+    """Uniform grid over the [-1, 1]^2 map for static planet positions.
+
+    Candidates come from the cells overlapping a query circle and are checked
+    with the same `distance` call the engine uses, so results match a full scan
+    exactly. Positions outside the map are clamped into the border cells.
+    Only non-empty cells are stored, so a sparsely filled map (such as a
+    chunked universe with few chunks materialized) costs memory only where
+    planets are.
+    """
+
+    def __init__(self, positions: Iterable[tuple[int, float, float]], count: int) -> None:
+        side = int(math.sqrt(max(count, 1) / TARGET_PER_CELL))
+        self.side = max(1, min(MAX_CELLS_PER_SIDE, side))
+        self.cell_size = (MAP_MAX - MAP_MIN) / self.side
+        self.cell_count = self.side * self.side
+        self.cells: dict[int, list[tuple[int, float, float]]] = {}
+        for planet_id, x, y in positions:
+            self.cells.setdefault(self.cell_of(x, y), []).append((planet_id, x, y))
+        self._columns: tuple[Any, Any, Any, Any] | None = None
+
+    @classmethod
+    def from_arrays(cls, x: Any, y: Any) -> PlanetGrid:
+        """Index numpy position columns (planet id = row) without building per-planet tuples.
+
+        Planets are sorted by cell once; a cell's entry list is only built the
+        first time a query touches it.
+        """
+        import numpy as np
+
+        grid = cls((), len(x))
+        cols = np.clip(((x - MAP_MIN) / grid.cell_size).astype(np.int64), 0, grid.side - 1)
+        rows = np.clip(((y - MAP_MIN) / grid.cell_size).astype(np.int64), 0, grid.side - 1)
+        cell_ids = rows * grid.side + cols
+        order = np.argsort(cell_ids, kind="stable")
+        bounds = np.searchsorted(cell_ids[order], np.arange(grid.cell_count + 1))
+        grid._columns = (x, y, order, bounds)
+        return grid
+
+    def _cell(self, cell: int) -> list[tuple[int, float, float]] | tuple[()]:
+        entries = self.cells.get(cell)
+        if entries is None:
+            if self._columns is None:
+                return ()
+            x, y, order, bounds = self._columns
+            ids = order[bounds[cell] : bounds[cell + 1]]
+            entries = self.cells[cell] = list(zip(ids.tolist(), x[ids].tolist(), y[ids].tolist()))
+        return entries
+
+    def insert(self, planet_id: int, x: float, y: float) -> None:
+        cell = self.cell_of(x, y)
+        self._cell(cell)  # built from the columns first, if the grid has them
+        self.cells.setdefault(cell, []).append((planet_id, x, y))
+
+    def _axis_cell(self, value: float) -> int:
+        # Clamp before int(): huge finite coordinates would overflow it, and they land in a border cell anyway.
+        value = min(MAP_MAX, max(MAP_MIN, value))
+        cell = int((value - MAP_MIN) / self.cell_size)
+        return max(0, min(self.side - 1, cell))
+
+    def cell_of(self, x: float, y: float) -> int:
+        return self._axis_cell(y) * self.side + self._axis_cell(x)
+
+    def cells_in_box(self, x: float, y: float, radius: float) -> Iterator[int]:
+        """Yield every cell index touched by the bounding box of a circle."""
+        pad = radius + CELL_EPSILON
+        col_min = self._axis_cell(x - pad)
+        col_max = self._axis_cell(x + pad)
+        for row in range(self._axis_cell(y - pad), self._axis_cell(y + pad) + 1):
+            base = row * self.side
+            yield from range(base + col_min, base + col_max + 1)
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[int]:
+        """Return ids of planets within `radius` of (x, y), in ascending order."""
+        if not radius >= 0:
+            return []
+        center = (x, y)
+        if all(math.isfinite(value) for value in (x, y, radius)):
+            cells: Iterable[int] = self.cells_in_box(x, y, radius)
+        else:
+            cells = range(self.cell_count)
+        found: list[int] = []
+        for cell in cells:
+            for planet_id, px, py in self._cell(cell):
+                if distance(center, (px, py)) <= radius:
+                    found.append(planet_id)
+        found.sort()
+        return found
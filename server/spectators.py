@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+from typing import Any
+
+from fastapi import WebSocket
+
+from .engine import GameState
+
+# View key of spectators watching the whole map rather than one player's perspective.
+OMNISCIENT = "omniscient"
+# Side of the coarse ownership grid sent alongside viewport-culled frames; viewports snap to its cells.
+OVERVIEW_GRID = 16
+# Below this zoom, planets in the viewport are sent with just the fields the map draws.
+DETAIL_ZOOM = 2.0
+COMPACT_PLANET_FIELDS = ("id", "x", "y", "level", "owner", "is_artifact", "visibility")
+
+
+def parse_viewport(data: dict[str, Any]) -> tuple[int, int, int, int, bool] | None:
+    """Turn a `set_viewport` message into `(col0, row0, col1, row1, detail)` overview cells.
+
+    Bounds are `[min_x, min_y, max_x, max_y]` in map coordinates and are
+    widened to whole overview cells, so spectators looking at nearly the
+    same area share one encoded frame. `"bounds": null` goes back to the
+    full map. Raises `ValueError` on malformed bounds.
+    """
+    bounds = data.get("bounds")
+    if bounds is None:
+        return None
+    if not isinstance(bounds, (list, tuple)) or len(bounds) != 4:
+        raise ValueError("bounds must be [min_x, min_y, max_x, max_y]")
+    min_x, min_y, max_x, max_y = (float(value) for value in bounds)
+    zoom = float(data.get("zoom", 1.0))
+    if not all(math.isfinite(value) for value in (min_x, min_y, max_x, max_y, zoom)):
+        raise ValueError("viewport values must be finite")
+    if min_x > max_x or min_y > max_y:
+        raise ValueError("viewport bounds are inverted")
+    scale = OVERVIEW_GRID / 2.0
+
+    def cell(value: float, round_up: bool) -> int:
+        index = math.ceil((value + 1.0) * scale) if round_up else math.floor((value + 1.0) * scale)
+        return min(OVERVIEW_GRID, max(0, index))
+
+    return (cell(min_x, False), cell(min_y, False), cell(max_x, True), cell(max_y, True), zoom >= DETAIL_ZOOM)
+
+
+def overview_cells(planets: list[dict[str, Any]]) -> dict[str, Any]:
+    """Planet counts per overview cell and owner, as sparse `[cell, owner, count]` rows (`cell = row * grid + col`)."""
+    scale = OVERVIEW_GRID / 2.0
+    last = OVERVIEW_GRID - 1
+    counts: dict[tuple[int, Any], int] = {}
+    for planet in planets:
+        col = min(last, max(0, int((planet["x"] + 1.0) * scale)))
+        row = min(last, max(0, int((planet["y"] + 1.0) * scale)))
+        key = (row * OVERVIEW_GRID + col, planet["owner"])
+        counts[key] = counts.get(key, 0) + 1
+    rows = sorted(counts.items(), key=lambda item: (item[0][0], -1 if item[0][1] is None else item[0][1]))
+    return {"grid": OVERVIEW_GRID, "cells": [[cell, owner, count] for (cell, owner), count in rows]}
+
+
+def cull_payload(
+    payload: dict[str, Any], viewport: tuple[int, int, int, int, bool], overview: dict[str, Any]
+) -> dict[str, Any]:
+    """Keep the entities inside `viewport` and attach the whole-map `overview`; other fields pass through."""
+    col0, row0, col1, row1, detail = viewport
+    size = 2.0 / OVERVIEW_GRID
+    min_x, min_y, max_x, max_y = col0 * size - 1.0, row0 * size - 1.0, col1 * size - 1.0, row1 * size - 1.0
+
+    def inside(entity: dict[str, Any], margin: float = 0.0) -> bool:
+        return min_x - margin <= entity["x"] <= max_x + margin and min_y - margin <= entity["y"] <= max_y + margin
+
+    planets = [planet for planet in payload["planets"] if inside(planet)]
+    if not detail:
+        planets = [{key: planet[key] for key in COMPACT_PLANET_FIELDS if key in planet} for planet in planets]
+    return {
+        **payload,
+        "planets": planets,
+        "fleets": [fleet for fleet in payload["fleets"] if inside(fleet)],
+        "pings": [ping for ping in payload["pings"] if inside(ping, ping["radius"])],
+        "viewport": {"bounds": [min_x, min_y, max_x, max_y], "detail": detail},
+        "overview": overview,
+    }
+
+
+class SpectatorHub:
+    """Spectator connections of one match, and the per-tick fan-out to them.
+
+    Every spectator has a bounded outbound queue drained by its own sender
+    task, so `publish` never waits on spectator I/O. A spectator whose queue
+    is full loses its oldest frame: a client on a slow link skips ahead to
+    the latest state instead of falling further behind.
+    """
+
+    def __init__(self, max_pending: int = 2) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_pending = max_pending
+        self.spectators: list[dict[str, Any]] = []
+        # Size of the last full-map frame built for each view, for metrics.
+        self.payload_bytes: dict[str, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.spectators)
+
+    def add(self, websocket: WebSocket) -> dict[str, Any]:
+        """Register a spectator and start its sender task; must be called from the event loop."""
+        spectator = {
+            "id": self._next_id,
+            "ws": websocket,
+            "player_id": None,
+            "omniscient": True,
+            "viewport": None,
+            "queue": asyncio.Queue(self.max_pending),
+            "dropped": 0,
+            "frame_bytes": 0,
+        }
+        self._next_id += 1
+        spectator["task"] = asyncio.create_task(self._send_loop(spectator))
+        self.spectators.append(spectator)
+        return spectator
+
+    def remove(self, spectator: dict[str, Any]) -> None:
+        if spectator in self.spectators:
+            self.spectators.remove(spectator)
+        task = spectator.get("task")
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def handle_message(self, spectator: dict[str, Any], data: dict[str, Any]) -> None:
+        if data.get("type") == "set_perspective":
+            player_id = data.get("player_id")
+            # Anything but a plain int id is malformed and falls back to the omniscient view.
+            spectator["player_id"] = player_id if type(player_id) is int else None
+            spectator["omniscient"] = bool(data.get("omniscient"))
+        elif data.get("type") == "set_viewport":
+            try:
+                spectator["viewport"] = parse_viewport(data)
+            except (TypeError, ValueError):
+                pass  # keep the previous viewport, as with any malformed client message
+
+    @staticmethod
+    def view_of(spectator: dict[str, Any], observations: dict[int, dict[str, Any]]) -> Any:
+        """Which payload a spectator gets: a player id, or `OMNISCIENT` (also the fallback for unknown players)."""
+        player_id = spectator.get("player_id")
+        if spectator.get("omniscient") or player_id not in observations:
+            return OMNISCIENT
+        return player_id
+
+    def frame_key(self, spectator: dict[str, Any], observations: dict[int, dict[str, Any]]) -> tuple[Any, Any]:
+        return self.view_of(spectator, observations), spectator.get("viewport")
+
+    def encode_views(self, state: GameState, observations: dict[int, dict[str, Any]]) -> dict[tuple[Any, Any], str]:
+        """Build and serialize each distinct frame (view plus viewport) that has a subscriber, once per tick."""
+        payloads: dict[Any, dict[str, Any]] = {}
+        overviews: dict[Any, dict[str, Any]] = {}
+        frames: dict[tuple[Any, Any], str] = {}
+        for spectator in self.spectators:
+            key = self.frame_key(spectator, observations)
+            if key in frames:
+                continue
+            view, viewport = key
+            payload = payloads.get(view)
+            if payload is None:
+                payload = payloads[view] = state.observation_omniscient() if view == OMNISCIENT else observations[view]
+            if viewport is not None:
+                if view not in overviews:
+                    overviews[view] = overview_cells(payload["planets"])
+                payload = cull_payload(payload, viewport, overviews[view])
+            frames[key] = json.dumps({"type": "state", "payload": payload}, separators=(",", ":"))
+            if viewport is None:
+                self.payload_bytes[str(view)] = len(frames[key])
+        return frames
+
+    def publish(self, state: GameState, observations: dict[int, dict[str, Any]]) -> None:
+        """Queue this tick's frame for every spectator without waiting for any of them."""
+        if not self.spectators:
+            return
+        frames = self.encode_views(state, observations)
+        for spectator in self.spectators:
+            queue: asyncio.Queue = spectator["queue"]
+            if queue.full():
+                queue.get_nowait()
+                spectator["dropped"] += 1
+            frame = frames[self.frame_key(spectator, observations)]
+            spectator["frame_bytes"] = len(frame)
+            queue.put_nowait(frame)
+
+    def report(self, profiler: Any) -> None:
+        """Record hub gauges: spectator count, full frame size per view, and queue depth, drops and frame size per spectator."""
+        profiler.gauge("spectators", len(self.spectators))
+        for view, size in self.payload_bytes.items():
+            profiler.gauge("spectator_payload_bytes", size, {"view": view})
+        # Rebuilt every tick so disconnected spectators drop out of the metrics.
+        profiler.clear_gauge("spectator_queue_depth")
+        profiler.clear_gauge("spectator_dropped_frames")
+        profiler.clear_gauge("spectator_frame_bytes")
+        for spectator in self.spectators:
+            labels = {"spectator": spectator["id"]}
+            profiler.gauge("spectator_queue_depth", spectator["queue"].qsize(), labels)
+            profiler.gauge("spectator_dropped_frames", spectator["dropped"], labels)
+            profiler.gauge("spectator_frame_bytes", spectator["frame_bytes"], labels)
+
+    async def close(self) -> None:
+        """Stop every sender task and close the connections."""
+        for spectator in list(self.spectators):
+            await self._disconnect(spectator)
+
+    async def _send_loop(self, spectator: dict[str, Any]) -> None:
+        queue: asyncio.Queue = spectator["queue"]
+        while True:
+            frame = await queue.get()
+            try:
+                await spectator["ws"].send_text(frame)
+            except Exception:
+                await self._disconnect(spectator)
+                return
+
+    async def _disconnect(self, spectator: dict[str, Any]) -> None:
+        self.remove(spectator)
+        try:
+            await spectator["ws"].close()
+        except Exception:
+            pass
@@ -9,6 +9,15 @@ def json_dumps(obj: Any) -> str:
     return json.dumps(obj, sort_keys=True, separators=(",", ":"))
 
 
+def copy_json(value: Any) -> Any:
+    """Deep copy of JSON-shaped data (dicts, lists and scalars), without `copy.deepcopy`'s memo bookkeeping."""
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
 def sha256_hex(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
@@ -30,3 +39,42 @@ def deterministic_rng(seed: int, parts: Iterable[Any]) -> random.Random:
     digest = hasher.hexdigest()
     seed_int = int(digest[:16], 16)
     return random.Random(seed_int)
+
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+_TO_UNIT = 1.0 / (1 << 53)
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer: a bijective scramble of a 64-bit integer."""
+    value = (value + _GOLDEN_GAMMA) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def rng_tag(name: str) -> int:
+    """Stable 64-bit integer naming a `counter_key` stream; compute once, not per draw."""
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "little")
+
+
+def counter_key(*parts: int) -> int:
+    """Fold integers such as (seed, tag, tick, id) into a 64-bit stream key.
+
+    Keys can be extended later, so a constant prefix like (seed, tag) only
+    needs mixing once: `counter_key(counter_key(seed, tag), tick, id)`.
+    """
+    key = 0
+    for part in parts:
+        key = _mix64(key ^ (part & _MASK64))
+    return key
+
+
+def counter_random(key: int, index: int = 0) -> float:
+    """The `index`-th uniform float in [0, 1) of the stream `key`.
+
+    Counter-based: each value is a pure function of (key, index), so no
+    generator is allocated and draws can be made in any order.
+    """
+    return (_mix64(key + index) >> 11) * _TO_UNIT
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .spatial import PlanetGrid
+from .utils import distance
+
+
+class SensorCoverage:
+    """One player's sensor footprint, updated as planets are gained, lost or upgraded.
+
+    `counts` maps each sensed planet id to the number of owned sensor circles
+    covering it. `cells` buckets those circles, stored as `(x, y, range)`, by
+    grid cell so point checks for fleets and pings only look at circles that
+    can reach the point. `copy()` shares both tables until either side next
+    changes, which keeps forking a `GameState` cheap.
+    """
+
+    def __init__(self, grid: PlanetGrid) -> None:
+        self.grid = grid
+        self.counts: dict[int, int] = {}
+        self.cells: dict[int, dict[int, tuple[float, float, float]]] = {}
+        self._shared = False
+
+    def copy(self) -> SensorCoverage:
+        clone = SensorCoverage(self.grid)
+        clone.counts = self.counts
+        clone.cells = self.cells
+        clone._shared = self._shared = True
+        return clone
+
+    def _unshare(self) -> None:
+        self.counts = dict(self.counts)
+        self.cells = {cell: dict(circles) for cell, circles in self.cells.items()}
+        self._shared = False
+
+    def add(self, planet: Any, sensor_range: float) -> None:
+        if self._shared:
+            self._unshare()
+        for planet_id in self.grid.query_radius(planet.x, planet.y, sensor_range):
+            self.counts[planet_id] = self.counts.get(planet_id, 0) + 1
+        circle = (planet.x, planet.y, sensor_range)
+        for cell in self.grid.cells_in_box(planet.x, planet.y, sensor_range):
+            self.cells.setdefault(cell, {})[planet.id] = circle
+
+    def remove(self, planet: Any, sensor_range: float) -> None:
+        if self._shared:
+            self._unshare()
+        for planet_id in self.grid.query_radius(planet.x, planet.y, sensor_range):
+            remaining = self.counts[planet_id] - 1
+            if remaining:
+                self.counts[planet_id] = remaining
+            else:
+                del self.counts[planet_id]
+        for cell in self.grid.cells_in_box(planet.x, planet.y, sensor_range):
+            circles = self.cells[cell]
+            del circles[planet.id]
+            if not circles:
+                del self.cells[cell]
+
+    def senses(self, x: float, y: float) -> bool:
+        circles = self.cells.get(self.grid.cell_of(x, y))
+        if not circles:
+            return False
+        return any(distance((x, y), (cx, cy)) <= radius for cx, cy, radius in circles.values())
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Any
+
+from .models import MatchConfig
+from .planet_store import NO_OWNER
+from .utils import distance
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only world_generation="bulk" needs it
+    np = None
+
+
+HOME_LEVEL = 3
+STAT_FIELDS = (
+    "energy_cap",
+    "energy_growth",
+    "silver_cap",
+    "silver_growth",
+    "defense",
+    "speed",
+    "sensor_range",
+)
+
+
+def roll_level(rng: random.Random, level_distribution: list[tuple[int, float]]) -> int:
+    roll = rng.random()
+    cumulative = 0.0
+    for level, chance in level_distribution:
+        cumulative += chance
+        if roll <= cumulative:
+            return level
+    return 1
+
+
+def level_stat_table(stats_for_level: Any, max_level: int) -> dict[str, Any]:
+    """One float64 array per stat, indexed by level, so stats for every planet are a single gather."""
+    rows = [stats_for_level(level) for level in range(max_level + 1)]
+    return {name: np.array([row[name] for row in rows], dtype=np.float64) for name in STAT_FIELDS}
+
+
+def generate_columns(
+    config: MatchConfig,
+    player_count: int,
+    level_distribution: list[tuple[int, float]],
+    stats_for_level: Any,
+) -> dict[str, Any]:
+    """Build a whole world as numpy columns keyed like `PlanetArrays` attributes.
+
+    Uses numpy's PCG64 stream seeded from `config.seed`, so the world is
+    deterministic per seed but differs from the sequential generator's.
+    """
+    if np is None:
+        raise RuntimeError("world_generation='bulk' requires numpy to be installed")
+    rng = np.random.Generator(np.random.PCG64(config.seed))
+    count = config.planet_count
+    x = rng.uniform(-1.0, 1.0, count)
+    y = rng.uniform(-1.0, 1.0, count)
+    levels, chances = zip(*level_distribution)
+    slot = np.searchsorted(np.cumsum(chances), rng.random(count), side="left")
+    # Rolls past the last cumulative bound fall back to level 1, as in `_roll_level`.
+    level = np.append(np.asarray(levels, dtype=np.int64), 1)[slot]
+
+    table = level_stat_table(stats_for_level, max(max(levels), HOME_LEVEL))
+    columns: dict[str, Any] = {"x": x, "y": y, "level": level}
+    for name in STAT_FIELDS:
+        columns[name] = table[name][level]
+    columns["energy"] = columns["energy_cap"] * 0.5
+    columns["silver"] = columns["silver_cap"] * 0.4
+    columns["owner"] = np.full(count, NO_OWNER, dtype=np.int64)
+    columns["is_artifact"] = np.zeros(count, dtype=bool)
+
+    homes = place_homes(x, y, rng.permutation(count), player_count, config.player_home_min_distance)
+    for player_id, home in enumerate(homes):
+        columns["level"][home] = HOME_LEVEL
+        for name in STAT_FIELDS:
+            columns[name][home] = table[name][HOME_LEVEL]
+        columns["energy"][home] = columns["energy_cap"][home] * 0.8
+        columns["silver"][home] = columns["silver_cap"][home] * 0.5
+        columns["owner"][home] = player_id
+
+    artifacts = pick_artifacts(columns["level"], columns["owner"], config.artifact_count, rng)
+    columns["is_artifact"][artifacts] = True
+    return columns
+
+
+def place_homes(x: Any, y: Any, order: Any, players: int, min_distance: float) -> list[int]:
+    """Greedily accept candidates in `order` that are at least `min_distance` from every accepted home.
+
+    Accepted homes are bucketed on a grid of `min_distance` cells, so each
+    candidate is only compared with homes in the neighbouring cells. If too
+    few candidates qualify, the remaining seats take the next unused ones.
+    """
+    chosen: list[int] = []
+    if players <= 0:
+        return chosen
+    cell_size = min_distance if min_distance > 0 else math.inf
+    buckets: dict[tuple[int, int], list[tuple[float, float]]] = {}
+
+    def cell_of(px: float, py: float) -> tuple[int, int]:
+        if math.isinf(cell_size):
+            return (0, 0)
+        return (math.floor(px / cell_size), math.floor(py / cell_size))
+
+    for index in order.tolist():
+        px, py = float(x[index]), float(y[index])
+        col, row = cell_of(px, py)
+        if any(
+            distance((px, py), home) < min_distance
+            for dc in (-1, 0, 1)
+            for dr in (-1, 0, 1)
+            for home in buckets.get((col + dc, row + dr), ())
+        ):
+            continue
+        chosen.append(index)
+        buckets.setdefault((col, row), []).append((px, py))
+        if len(chosen) == players:
+            return chosen
+
+    taken = set(chosen)
+    for index in order.tolist():
+        if len(chosen) == players:
+            break
+        if index not in taken:
+            chosen.append(index)
+            taken.add(index)
+    return chosen
+
+
+def pick_artifacts(level: Any, owner: Any, artifact_count: int, rng: Any) -> Any:
+    """Shuffle the highest-level unowned planets and take `artifact_count` of them.
+
+    Candidates are gathered level by level, highest first and by id within a
+    level, which is the order a stable descending sort would give, without
+    sorting the whole map.
+    """
+    wanted = max(artifact_count * 4, artifact_count)
+    if wanted <= 0:
+        return np.zeros(0, dtype=np.int64)
+    unowned = owner == NO_OWNER
+    top: list[Any] = []
+    found = 0
+    for value in sorted(np.unique(level).tolist(), reverse=True):
+        ids = np.flatnonzero(unowned & (level == value))
+        top.append(ids[: wanted - found])
+        found += len(top[-1])
+        if found >= wanted:
+            break
+    candidates = np.concatenate(top) if top else np.zeros(0, dtype=np.int64)
+    return candidates[rng.permutation(len(candidates))[:artifact_count]]
@@ -0,0 +1,29 @@
+from runner.benchmark import BenchCase, compare, run_case
+
+
+def test_run_case_reports_phases_and_memory() -> None:
+    result = run_case(BenchCase(planets=300, players=2, load="heavy", ticks=4, warmup=1))
+    assert result["case"] == "planets=300,players=2,load=heavy"
+    for phase in ("growth", "actions", "arrivals", "snapshot", "observations"):
+        assert result["phases"][phase]["p50_ms"] >= 0.0
+    assert result["peak_rss_mb"] > 0.0
+    assert result["calibration_ms"] > 0.0
+
+
+def test_compare_flags_slowdowns_scaled_by_calibration() -> None:
+    def entry(growth_ms: float, calibration_ms: float) -> dict:
+        return {
+            "case": "c",
+            "calibration_ms": calibration_ms,
+            "phases": {"growth": {"p50_ms": growth_ms}, "pings": {"p50_ms": 0.01}},
+        }
+
+    baseline = [entry(10.0, 5.0)]
+    assert compare([entry(11.0, 5.0)], baseline, tolerance=0.25) == []
+    assert compare([entry(20.0, 5.0)], baseline, tolerance=0.25) == [
+        {"case": "c", "phase": "growth", "baseline_ms": 10.0, "current_ms": 20.0}
+    ]
+    # A machine half as fast doubles the allowance.
+    assert compare([entry(20.0, 10.0)], baseline, tolerance=0.25) == []
+    # Sub-noise-floor phases never count, however large the ratio.
+    assert compare([{**entry(10.0, 5.0), "phases": {"pings": {"p50_ms": 0.05}}}], baseline, 0.25) == []
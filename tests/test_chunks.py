@@ -0,0 +1,114 @@
+import pytest
+
+from server.engine import GameState
+from server.models import MatchConfig
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=21,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=9600,
+        artifact_count=3,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+        world_chunks=40,
+    )
+
+
+def untouched_chunk(state: GameState) -> int:
+    universe = state._universe
+    return next(chunk for chunk in range(universe.chunk_count) if not universe.is_materialized(chunk))
+
+
+def test_chunks_materialize_lazily_and_deterministically() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    universe = state._universe
+    assert len(state.planets) == 9600
+    assert 0 < universe.materialized_count < 9600
+    homes = [p for p in state.planets if p.owner is not None]
+    assert sorted(p.owner for p in homes) == [0, 1]
+
+    chunk = untouched_chunk(state)
+    before = universe.materialized_count
+    planet = state.planets[chunk * universe.per_chunk + 3]
+    assert universe.materialized_count == before + universe.per_chunk
+
+    other = GameState(build_config(), ["A", "B"])
+    assert other.planets[planet.id] == planet
+    assert state.advance_tick({})["planets"] == other.advance_tick({})["planets"]
+
+
+def test_late_chunk_growth_uses_closed_form() -> None:
+    early = GameState(build_config(), ["A", "B"])
+    late = GameState(build_config(), ["A", "B"])
+    planet_id = untouched_chunk(early) * early._universe.per_chunk
+    early.planets[planet_id]
+    for _ in range(25):
+        early.advance_tick({})
+        late.advance_tick({})
+    grown, skipped = early.planets[planet_id], late.planets[planet_id]
+    assert skipped.energy == pytest.approx(grown.energy)
+    assert skipped.silver == pytest.approx(grown.silver)
+
+
+def test_scans_and_fleets_materialize_chunks() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    universe = state._universe
+    home = next(p for p in state.planets if p.owner == 0)
+    target_chunk = untouched_chunk(state)
+    row, col = divmod(target_chunk, universe.side)
+    x = -1.0 + (col + 0.5) * universe.chunk_size
+    y = -1.0 + (row + 0.5) * universe.chunk_size
+    scan = {"type": "scan", "x": x, "y": y, "radius": universe.chunk_size / 4}
+    snapshot = state.advance_tick({0: [scan]})
+    assert universe.is_materialized(target_chunk)
+    assert all(pid // universe.per_chunk == target_chunk for pid in snapshot["scans"][0])
+
+    dest_chunk = untouched_chunk(state)
+    dest_id = dest_chunk * universe.per_chunk
+    fleet = {"type": "send_fleet", "from_id": home.id, "to_id": dest_id, "energy": 5.0}
+    state.advance_tick({0: [fleet]})
+    assert universe.is_materialized(dest_chunk)
+
+
+def test_invalid_actions_do_not_materialize_chunks() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    universe = state._universe
+    before = universe.materialized_count
+    assert len(state._grid.cells) < state._grid.cell_count
+    home = state._owned_planets(0)[0]
+    targets = [chunk * universe.per_chunk for chunk in range(universe.chunk_count) if not universe.is_materialized(chunk)]
+    for start in range(0, 40, 5):
+        actions = [
+            {"type": "upgrade", "planet_id": target, "upgrade": "energy"} for target in targets[start : start + 3]
+        ] + [
+            {"type": "send_fleet", "from_id": targets[start + 3], "to_id": home.id, "energy": 1.0},
+            {"type": "send_fleet", "from_id": home.id, "to_id": targets[start + 4], "energy": 1e9},
+        ]
+        state.advance_tick({0: actions, 1: actions})
+    assert universe.materialized_count == before
+
+
+def test_chunked_world_rejects_unsupported_modes() -> None:
+    config = build_config()
+    state = GameState(config, ["A", "B"])
+    with pytest.raises(ValueError):
+        state.fork()
+    config.planet_store = "arrays"
+    with pytest.raises(ValueError):
+        GameState(config, ["A", "B"])
@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import time
+
+from runner.run_match import BotProcess, negotiate_deltas
+from server.delta import ObservationDeltaEncoder
+from server.engine import GameState
+from server.models import MatchConfig
+
+SDK_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "sdks", "python"))
+if SDK_PATH not in sys.path:
+    sys.path.insert(0, SDK_PATH)
+
+from openforest_sdk.delta import ObservationDecoder  # noqa: E402
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=13,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=120,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_delta_roundtrip_with_missed_acks() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    encoder = ObservationDeltaEncoder(keyframe_interval=8)
+    decoder = ObservationDecoder()
+    modes = []
+    for tick in range(30):
+        owned = [p for p in state.planets if p.owner == 0]
+        actions = {
+            0: [
+                {"type": "send_fleet", "from_id": owned[0].id, "to_id": (tick * 11) % 120, "energy": 5.0},
+                {"type": "scan", "x": 0.0, "y": 0.0, "radius": 0.2 + (tick % 3) * 0.1},
+            ]
+        }
+        snapshot = state.advance_tick(actions)
+        observation = state.observation_for_player(0, snapshot["scans"].get(0, []))
+        message = encoder.encode(observation)
+        modes.append(message["mode"])
+        decoded = decoder.apply(message)
+        assert decoded == observation
+        if tick % 4 != 3:
+            encoder.ack(message["seq"])
+    assert "delta" in modes
+    assert modes.count("keyframe") >= 3
+
+
+def test_decoder_survives_bots_mutating_their_observation() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    encoder = ObservationDeltaEncoder(keyframe_interval=8)
+    decoder = ObservationDecoder()
+    for tick in range(20):
+        owned = [p for p in state.planets if p.owner == 0]
+        actions = {0: [{"type": "send_fleet", "from_id": owned[0].id, "to_id": (tick * 11) % 120, "energy": 5.0}]}
+        snapshot = state.advance_tick(actions)
+        observation = state.observation_for_player(0, snapshot["scans"].get(0, []))
+        # Over the wire the bot never shares objects with the server.
+        message = json.loads(json.dumps(encoder.encode(observation)))
+        decoded = decoder.apply(message)
+        assert decoded == json.loads(json.dumps(observation))
+        encoder.ack(message["seq"])
+        decoded["planets"][0]["energy"] = -1.0
+        decoded["planets"][0]["scratch"] = {"target": 3}
+        decoded["planets"].pop()
+        decoded["fleets"].clear()
+        decoded["scores"][0]["score"] = 1e9
+        decoded["tick"] = -1
+
+
+def test_decoder_requests_resync_on_unknown_base() -> None:
+    encoder = ObservationDeltaEncoder(keyframe_interval=10)
+    observation = {"tick": 1, "planets": [{"id": 1, "energy": 2.0}], "fleets": [], "pings": []}
+    encoder.encode(observation)
+    encoder.ack(1)
+    delta = encoder.encode({**observation, "tick": 2})
+    assert delta["mode"] == "delta"
+    assert ObservationDecoder().apply(delta) is None
+    encoder.handle_reply({"resync": True})
+    assert encoder.encode({**observation, "tick": 3})["mode"] == "keyframe"
+
+
+def test_delta_handshake_waits_for_all_bots_together(tmp_path) -> None:
+    silent = tmp_path / "silent_bot.py"
+    silent.write_text("import sys\nfor _ in sys.stdin:\n    pass\n")
+    sdk = tmp_path / "sdk_bot.py"
+    sdk.write_text(
+        f"import sys\nsys.path.insert(0, {SDK_PATH!r})\n"
+        "from openforest_sdk import run_stdio\n"
+        "run_stdio(lambda observation: [])\n"
+    )
+    bots = [BotProcess(str(silent)), BotProcess(str(silent)), BotProcess(str(sdk))]
+    try:
+        started = time.perf_counter()
+        encoders = negotiate_deltas(bots, build_config(), timeout_s=1.0)
+        elapsed = time.perf_counter() - started
+    finally:
+        for bot in bots:
+            bot.close()
+    assert list(encoders) == [2]
+    assert elapsed < 1.8
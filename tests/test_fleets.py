@@ -0,0 +1,42 @@
+from server.fleets import FleetScheduler
+from server.models import Fleet
+
+
+def make_fleet(fleet_id: int, ticks: int) -> Fleet:
+    return Fleet(
+        id=fleet_id,
+        owner=0,
+        source_id=0,
+        dest_id=1,
+        energy=10,
+        launch_tick=0,
+        total_ticks=ticks,
+        ticks_remaining=ticks,
+    )
+
+
+def test_scheduler_arrivals_by_step_and_id() -> None:
+    scheduler = FleetScheduler()
+    scheduler.add(make_fleet(3, 2))
+    scheduler.add(make_fleet(1, 1))
+    scheduler.advance()
+    scheduler.add(make_fleet(2, 1))
+    assert [f.id for f in scheduler] == [3, 1, 2]
+    assert [f.id for f in scheduler.pop_arrivals()] == [1]
+
+    assert [scheduler.ticks_remaining(f) for f in scheduler] == [1, 1]
+    scheduler.advance()
+    assert [f.id for f in scheduler.pop_arrivals()] == [2, 3]
+    assert len(scheduler) == 0
+
+
+def test_scheduler_only_pops_current_step() -> None:
+    scheduler = FleetScheduler()
+    scheduler.add(make_fleet(1, 3))
+    scheduler.advance()
+    assert scheduler.pop_arrivals() == []
+    scheduler.advance()
+    assert scheduler.pop_arrivals() == []
+    assert scheduler.ticks_remaining(next(iter(scheduler))) == 1
+    scheduler.advance()
+    assert [f.id for f in scheduler.pop_arrivals()] == [1]
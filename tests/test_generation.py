@@ -1,5 +1,8 @@
+import pytest
+
 from server.engine import GameState
 from server.models import MatchConfig
+from server.utils import distance
 
 
 def build_config(seed: int) -> MatchConfig:
@@ -43,3 +46,42 @@ def test_planet_generation_seed_variation() -> None:
     sample_a = [(p.x, p.y, p.level) for p in state_a.planets[:5]]
     sample_b = [(p.x, p.y, p.level) for p in state_b.planets[:5]]
     assert sample_a != sample_b
+
+
+@pytest.mark.parametrize("planet_store", ["objects", "arrays"])
+def test_bulk_generation_deterministic_and_valid(planet_store: str) -> None:
+    pytest.importorskip("numpy")
+    config = build_config(42)
+    config.world_generation = "bulk"
+    config.planet_store = planet_store
+    players = ["A", "B", "C", "D"]
+    state_a = GameState(config, players)
+    state_b = GameState(config, players)
+    assert state_a.observation_omniscient() == state_b.observation_omniscient()
+    assert len(state_a.planets) == config.planet_count
+
+    homes = [next(p for p in state_a.planets if p.owner == player_id) for player_id in range(len(players))]
+    for i, home in enumerate(homes):
+        assert home.level == 3
+        assert home.energy == home.energy_cap * 0.8
+        for other in homes[i + 1 :]:
+            assert distance((home.x, home.y), (other.x, other.y)) >= config.player_home_min_distance
+
+    artifacts = [p for p in state_a.planets if p.is_artifact]
+    assert len(artifacts) == config.artifact_count
+    assert all(p.owner is None and p.level == 5 for p in artifacts)
+
+    config.seed = 43
+    other = GameState(config, players)
+    assert [(p.x, p.y) for p in other.planets[:5]] != [(p.x, p.y) for p in state_a.planets[:5]]
+
+
+def test_bulk_generation_matches_across_stores() -> None:
+    pytest.importorskip("numpy")
+    config = build_config(7)
+    config.world_generation = "bulk"
+    objects = GameState(config, ["A", "B"])
+    config.planet_store = "arrays"
+    arrays = GameState(config, ["A", "B"])
+    assert objects.advance_tick({}) == arrays.advance_tick({})
+    assert arrays.planets[3] is arrays.planets[3]
@@ -0,0 +1,73 @@
+import os
+
+from runner.run_match import run_headless
+from server.replay import BinaryReplayReader
+from server.models import MatchConfig
+
+BOTS_DIR = os.path.join(os.path.dirname(__file__), "..", "bots", "python")
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=4,
+        tick_ms=500,
+        match_ticks=25,
+        planet_count=150,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_headless_run_reports_stats() -> None:
+    bots = [os.path.join(BOTS_DIR, "rush_bot.py"), os.path.join(BOTS_DIR, "expansion_bot.py")]
+    stats = run_headless(build_config(), bots)
+    assert stats["ticks"] == 25
+    assert not stats["truncated"]
+    assert stats["ticks_per_sec"] > 0
+    for phase in ("bots", "growth", "actions", "arrivals", "scores", "snapshot", "observations"):
+        assert stats["phases"][phase]["count"] == 25
+    assert [entry["bot"] for entry in stats["scores"]] == bots
+    assert run_headless(build_config(), bots)["scores"] == stats["scores"]
+
+
+def test_headless_budget_stops_early() -> None:
+    bots = [os.path.join(BOTS_DIR, "random_bot.py")] * 2
+    stats = run_headless(build_config(), bots, budget_s=0.0)
+    assert stats["truncated"]
+    assert stats["ticks"] == 0
+
+
+def test_bots_mutating_observations_do_not_leak_into_other_seats_or_replays(tmp_path) -> None:
+    idle = tmp_path / "idle_bot.py"
+    idle.write_text("def bot(observation):\n    return []\n")
+    vandal = tmp_path / "vandal_bot.py"
+    vandal.write_text(
+        "def bot(observation):\n"
+        "    for entry in observation['scores']:\n"
+        "        entry['score'] = -999.0\n"
+        "    for planet in observation['planets']:\n"
+        "        planet['owner'] = 99\n"
+        "    observation['fleets'].clear()\n"
+        "    return []\n"
+    )
+    replays = {}
+    for name, first in (("idle", idle), ("vandal", vandal)):
+        path = str(tmp_path / f"{name}.ofr")
+        run_headless(build_config(), [str(first), str(idle)], replay_path=path)
+        with BinaryReplayReader(path) as reader:
+            replays[name] = list(reader)
+    assert replays["vandal"] == replays["idle"]
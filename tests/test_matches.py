@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from server.app import create_app
+from server.matches import MatchRegistry
+from server.models import MatchConfig
+from server.replay import BinaryReplayReader
+
+SMALL = {"planet_count": 60, "artifact_count": 2, "tick_ms": 1, "commit_timeout_ms": 5, "reveal_timeout_ms": 5}
+
+
+def load_config_dict() -> dict:
+    with open(os.path.join(os.path.dirname(__file__), "..", "config.json"), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def wait_for(client: TestClient, match_id: str, status: str) -> dict:
+    for _ in range(500):
+        summary = client.get(f"/matches/{match_id}").json()
+        if summary["status"] == status:
+            return summary
+        time.sleep(0.01)
+    raise AssertionError(f"match {match_id} is still {summary['status']}")
+
+
+def test_registry_hosts_isolated_matches_over_http(tmp_path) -> None:
+    app = create_app(default_match=False)
+    app.state.matches.replay_dir = str(tmp_path)
+    with TestClient(app) as client:
+        assert client.get("/matches").json() == []
+        assert client.get("/status").status_code == 404
+        short = client.post("/matches", json={"players": 2, "config": {**SMALL, "match_ticks": 5}}).json()
+        long = client.post(
+            "/matches", json={"players": 3, "match_id": "featured", "config": {**SMALL, "match_ticks": 100000, "seed": 7}}
+        ).json()
+        assert (short["id"], long["id"]) == ("0", "featured")
+        assert client.post("/matches", json={"match_id": "featured"}).status_code == 409
+        assert client.post("/matches", json={"config": {"no_such_field": 1}}).status_code == 400
+        for override in (
+            {"planet_count": -1},
+            {"planet_count": 10**7},
+            {"tick_ms": -5},
+            {"observation_keyframe_interval": -1},
+            {"player_home_min_distance": 5.0},
+            {"world_chunks": 4096},
+        ):
+            assert client.post("/matches", json={"config": override}).status_code == 400, override
+        assert client.post("/matches", json={"match_id": "../etc"}).status_code == 422
+
+        finished = wait_for(client, "0", "finished")
+        assert finished["tick"] == 5 and len(finished["players"]) == 2
+        with BinaryReplayReader(finished["replay"]) as reader:
+            assert reader.ticks == list(range(5))
+
+        with client.websocket_connect("/matches/featured/ws/spectator") as ws:
+            frame = ws.receive_json()
+            assert frame["type"] == "state" and len(frame["payload"]["scores"]) == 3
+        assert "openforest_phase_seconds" in client.get("/matches/featured/metrics").text
+
+        cancelled = client.delete("/matches/featured").json()
+        assert cancelled["status"] == "cancelled" and 0 < cancelled["tick"] < 100000
+        assert [match["id"] for match in client.get("/matches").json()] == ["0"]
+        assert client.get("/matches/featured").status_code == 404
+        assert client.delete("/matches/featured").status_code == 404
+
+
+def test_malformed_spectator_messages_do_not_end_the_match(tmp_path) -> None:
+    app = create_app(default_match=False)
+    app.state.matches.replay_dir = str(tmp_path)
+    with TestClient(app) as client:
+        client.post("/matches", json={"players": 2, "match_id": "m", "config": {**SMALL, "match_ticks": 100000}})
+        with client.websocket_connect("/matches/m/ws/spectator") as ws:
+            ws.receive_json()
+            for player_id in ([1], {"id": 1}, "1", 1.5, True):
+                ws.send_json({"type": "set_perspective", "player_id": player_id, "omniscient": False})
+            ws.send_json({"type": "set_viewport", "bounds": [[0], 1, 2, 3]})
+            start = ws.receive_json()["payload"]["tick"]
+            for _ in range(4):
+                frame = ws.receive_json()
+            assert frame["payload"]["player_id"] is None and frame["payload"]["tick"] > start
+        summary = client.get("/matches/m").json()
+        assert summary["status"] == "running" and summary["error"] is None
+        client.delete("/matches/m")
+
+
+def test_cancelling_a_match_that_never_started() -> None:
+    async def scenario() -> None:
+        registry = MatchRegistry()
+        match = registry.create(MatchConfig(**{**load_config_dict(), **SMALL}), "idle")
+        assert match.status == "pending"
+        assert (await registry.cancel("idle")).status == "cancelled"
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+from server.engine import GameState
+from server.models import Fleet, MatchConfig
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=21,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=60,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def assert_index_consistent(state: GameState) -> None:
+    for player in state.players:
+        expected = {p.id for p in state.planets if p.owner == player.id}
+        artifacts = {p.id for p in state.planets if p.owner == player.id and p.is_artifact}
+        assert state._owned[player.id] == expected
+        assert state._held_artifacts[player.id] == artifacts
+
+
+def test_ownership_index_tracks_direct_mutation() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    assert_index_consistent(state)
+    planet = next(p for p in state.planets if p.owner is None)
+    planet.owner = 1
+    planet.is_artifact = True
+    assert_index_consistent(state)
+    planet.owner = 0
+    assert_index_consistent(state)
+    planet.owner = None
+    assert_index_consistent(state)
+
+
+def test_ownership_index_tracks_capture() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    target = next(p for p in state.planets if p.owner == 1)
+    target.energy = 1.0
+    fleet = Fleet(
+        id=1,
+        owner=0,
+        source_id=target.id,
+        dest_id=target.id,
+        energy=500,
+        launch_tick=0,
+        total_ticks=1,
+        ticks_remaining=0,
+    )
+    state._resolve_combat(target, fleet)
+    assert target.owner == 0
+    assert target.id in state._owned[0]
+    assert target.id not in state._owned[1]
+    assert_index_consistent(state)
@@ -1,6 +1,8 @@
+import pytest
+
 from server.engine import GameState
 from server.models import Fleet, MatchConfig
-from server.utils import deterministic_rng
+from server.utils import counter_key, counter_random, deterministic_rng, rng_tag
 
 
 def build_config() -> MatchConfig:
@@ -52,3 +54,43 @@ def test_ping_deterministic() -> None:
 
     assert abs(ping.x - (source.x + jitter_x)) < 1e-9
     assert abs(ping.y - (source.y + jitter_y)) < 1e-9
+
+
+def test_unknown_rng_version_is_rejected() -> None:
+    config = build_config()
+    for version in (0, 3, "2"):
+        config.rng_version = version
+        with pytest.raises(ValueError):
+            GameState(config, ["A", "B"])
+
+
+def test_counter_rng_ping_jitter() -> None:
+    config = build_config()
+    config.rng_version = 2
+    state = GameState(config, ["A", "B"])
+    fleets = [
+        Fleet(id=fleet_id, owner=0, source_id=0, dest_id=1, energy=40, launch_tick=0, total_ticks=1, ticks_remaining=1)
+        for fleet_id in (5, 6)
+    ]
+    for fleet in fleets:
+        state._emit_fleet_ping(fleet)
+    first, second = state.pings
+    source = state.planets[0]
+    assert (first.x, first.y) != (second.x, second.y)
+    for ping in state.pings:
+        assert abs(ping.x - source.x) <= config.ping_jitter
+        assert abs(ping.y - source.y) <= config.ping_jitter
+
+    again = GameState(config, ["A", "B"])
+    again._emit_fleet_ping(fleets[0])
+    assert (again.pings[0].x, again.pings[0].y) == (first.x, first.y)
+
+
+def test_counter_random_is_keyed_and_uniform() -> None:
+    key = counter_key(7, rng_tag("ping"), 3, 11)
+    assert counter_random(key, 1) == counter_random(counter_key(7, rng_tag("ping"), 3, 11), 1)
+    assert counter_random(key, 0) != counter_random(key, 1)
+    assert counter_key(7, rng_tag("ping"), 3, 11) != counter_key(7, rng_tag("ping"), 11, 3)
+    draws = [counter_random(counter_key(7, tick), 0) for tick in range(4000)]
+    assert all(0.0 <= value < 1.0 for value in draws)
+    assert abs(sum(draws) / len(draws) - 0.5) < 0.02
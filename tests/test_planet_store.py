@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from server.engine import GameState
+from server.models import MatchConfig
+
+pytest.importorskip("numpy")
+
+
+def build_config(planet_store: str) -> MatchConfig:
+    return MatchConfig(
+        seed=11,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=200,
+        artifact_count=3,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+        planet_store=planet_store,
+    )
+
+
+def scripted_actions(state: GameState) -> dict[int, list[dict]]:
+    actions: dict[int, list[dict]] = {}
+    for player in state.players:
+        owned = [p for p in state.planets if p.owner == player.id]
+        if not owned:
+            continue
+        source = owned[0]
+        target = (source.id + 7 * (state.tick + 1)) % len(state.planets)
+        actions[player.id] = [
+            {"type": "send_fleet", "from_id": source.id, "to_id": target, "energy": source.energy * 0.4},
+            {"type": "upgrade", "planet_id": source.id, "upgrade": "energy"},
+        ]
+    return actions
+
+
+def wire(payload: dict) -> list[str]:
+    """Serialized payload, one line per value so a mismatch is reported line by line."""
+    return json.dumps(payload, indent=1).splitlines()
+
+
+def test_array_store_matches_dataclass_path() -> None:
+    objects = GameState(build_config("objects"), ["A", "B", "C"])
+    arrays = GameState(build_config("arrays"), ["A", "B", "C"])
+    for _ in range(40):
+        snapshot_objects = objects.advance_tick(scripted_actions(objects))
+        snapshot_arrays = arrays.advance_tick(scripted_actions(arrays))
+        # Compared as the JSON written to replays and bots, where 80 and 80.0 differ.
+        assert wire(snapshot_arrays) == wire(snapshot_objects)
+        # Energy and silver are always floats on the wire (README, Protocol Summary).
+        assert {type(p[key]) for p in snapshot_objects["planets"] for key in ("energy", "silver")} == {float}
+    assert wire(arrays.observation_for_player(0)) == wire(objects.observation_for_player(0))
+
+
+@pytest.mark.parametrize("planet_store", ["objects", "arrays"])
+def test_snapshots_without_planets_defer_encoding(planet_store: str) -> None:
+    eager = GameState(build_config(planet_store), ["A", "B", "C"])
+    lazy = GameState(build_config(planet_store), ["A", "B", "C"])
+    for tick in range(30):
+        snapshot = eager.advance_tick(scripted_actions(eager))
+        partial = lazy.advance_tick(scripted_actions(lazy), include_planets=False)
+        assert "planets" not in partial
+        assert partial == {key: value for key, value in snapshot.items() if key != "planets"}
+        if tick % 7 == 3:
+            for player in eager.players:
+                scans = snapshot["scans"].get(player.id, [])
+                assert lazy.observation_for_player(player.id, scans) == eager.observation_for_player(player.id, scans)
+    assert lazy.observation_omniscient() == eager.observation_omniscient()
+
+
+def test_planet_view_writes_through() -> None:
+    state = GameState(build_config("arrays"), ["A", "B"])
+    planet = state.planets[4]
+    planet.owner = 1
+    planet.energy = 12.5
+    assert state._store is not None
+    assert state._store.owner[4] == 1
+    assert state._store.energy[4] == 12.5
+    planet.owner = None
+    assert state.planets[4].owner is None
@@ -0,0 +1,66 @@
+from server.engine import GameState
+from server.models import MatchConfig
+from server.profiling import RollingHistogram, TickProfiler
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=17,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=40,
+        artifact_count=1,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_rolling_histogram_evicts_old_samples() -> None:
+    histogram = RollingHistogram(window=3, bounds=(0.001, 0.01))
+    for value in (0.0005, 0.005, 0.5, 0.0002):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.001, 1), (0.01, 2), (float("inf"), 3)]
+    assert histogram.quantile(1.0) == 0.5
+    assert histogram.total() == 0.005 + 0.5 + 0.0002
+
+
+def test_profiler_exposes_phases_and_engine_gauges() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    profiler = TickProfiler(window=5)
+    state.profiler = profiler
+    for _ in range(8):
+        state.advance_tick({})
+
+    summary = profiler.summary()
+    assert summary["growth"]["count"] == 8 and summary["growth"]["window_count"] == 5
+    assert summary["snapshot"]["window_p95_ms"] <= summary["snapshot"]["max_ms"]
+
+    # The lifetime maximum survives the slow lap leaving the window.
+    profiler.record("bots", 2.0)
+    for _ in range(6):
+        profiler.record("bots", 0.001)
+    bots = profiler.summary()["bots"]
+    assert bots["max_ms"] == 2000.0 and bots["count"] == 7 and bots["window_p95_ms"] == 1.0
+    gauges = profiler.gauge_values()
+    assert gauges["tick"] == 7
+    assert gauges["planets_owned"] == {"0": 1, "1": 1}
+
+    text = profiler.render_prometheus()
+    assert '# TYPE openforest_phase_seconds histogram' in text
+    assert 'openforest_phase_seconds_bucket{phase="growth",le="+Inf"} 5' in text
+    assert 'openforest_phase_seconds_count{phase="arrivals"} 5' in text
+    assert 'openforest_planets_owned{player="1"} 1' in text
+    assert "openforest_fleets_in_flight 0" in text
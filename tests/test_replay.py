@@ -0,0 +1,337 @@
+import asyncio
+import dataclasses
+import inspect
+import json
+import threading
+
+import pytest
+
+from server.engine import GameState
+from server.models import MatchConfig
+from server.replay import (
+    ActionReplayLogger,
+    BackgroundReplaySink,
+    BinaryReplayLogger,
+    BinaryReplayReader,
+    ReplayDeltaEncoder,
+    ReplayDesyncError,
+    ReplayLogger,
+    apply_replay_delta,
+    export_jsonl,
+    resimulate,
+)
+from server.replay_codec import parse_fields, project
+from server.replay_stream import iter_replay, player_series
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=17,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=40,
+        artifact_count=1,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def play(ticks: int, loggers: list, state: GameState | None = None) -> None:
+    state = state or GameState(build_config(), ["A", "B"])
+    for tick in range(ticks):
+        home = state._owned_planets(tick % 2)[0]
+        actions = {tick % 2: [{"type": "send_fleet", "from_id": home.id, "to_id": (tick * 7) % 40, "energy": 5.0}]}
+        snapshot = state.advance_tick(actions)
+        observations = {p.id: state.observation_for_player(p.id, snapshot["scans"][p.id]) for p in state.players}
+        for logger in loggers:
+            logged = logger.log_tick(snapshot["tick"], snapshot, observations, actions)
+            if inspect.isawaitable(logged):  # BackgroundReplaySink
+                asyncio.run(logged)
+    for logger in loggers:
+        logger.close()
+
+
+def test_binary_replay_matches_jsonl_and_seeks(tmp_path) -> None:
+    jsonl_path, binary_path = str(tmp_path / "m.jsonl"), str(tmp_path / "m.ofr")
+    play(12, [ReplayLogger(jsonl_path), BinaryReplayLogger(binary_path, chunk_ticks=5)])
+    with open(jsonl_path, encoding="utf-8") as file:
+        expected = [json.loads(line) for line in file]
+
+    with BinaryReplayReader(binary_path) as reader:
+        assert reader.ticks == list(range(12))
+        assert reader.read_tick(9) == expected[9]
+        assert reader.read_tick(2) == expected[2]
+        assert [record["tick"] for record in reader.seek(10)] == [10, 11]
+        assert list(reader) == expected
+
+    export_path = str(tmp_path / "export.jsonl")
+    assert export_jsonl(binary_path, export_path) == 12
+    with open(export_path, encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == expected
+
+
+def test_unclosed_binary_replay_is_recovered_by_scanning(tmp_path) -> None:
+    path = str(tmp_path / "crash.ofr")
+    logger = BinaryReplayLogger(path, chunk_ticks=4)
+    state = GameState(build_config(), ["A", "B"])
+    for _ in range(10):
+        snapshot = state.advance_tick({})
+        logger.log_tick(snapshot["tick"], snapshot, {}, {})
+    logger._file.close()  # simulate a crash: no final chunk, no index
+
+    with BinaryReplayReader(path) as reader:
+        assert reader.ticks == list(range(8))
+        assert reader.read_tick(7)["state"]["tick"] == 7
+
+
+def test_delta_replay_rebuilds_every_tick_in_any_order(tmp_path) -> None:
+    jsonl_path, binary_path = str(tmp_path / "m.jsonl"), str(tmp_path / "m.ofr")
+    delta_logger = BinaryReplayLogger(binary_path, chunk_ticks=4, keyframe_interval=5)
+    play(14, [ReplayLogger(jsonl_path), delta_logger])
+    with open(jsonl_path, encoding="utf-8") as file:
+        expected = [json.loads(line) for line in file]
+
+    with BinaryReplayReader(binary_path) as reader:
+        assert reader.delta_encoded
+        assert reader.metadata["keyframe_interval"] == 5
+        for tick in (13, 3, 4, 12, 0, 7, 8, 9):
+            assert reader.read_tick(tick) == expected[tick]
+        assert list(reader) == expected
+
+
+def test_delta_records_only_carry_changed_fields() -> None:
+    base_planet = {"id": 1, "energy": 5.0, "owner": None}
+    stale = {"id": 2, "energy": 1.0, "visibility": "stale"}
+    encoder = ReplayDeltaEncoder(keyframe_interval=10)
+    first = {
+        "tick": 0,
+        "state": {"tick": 0, "planets": [base_planet]},
+        "observations": {0: {"planets": [stale]}},
+        "actions": {},
+    }
+    assert encoder.encode(first) == (True, first)
+    second = {
+        "tick": 1,
+        "state": {"tick": 1, "planets": [{**base_planet, "energy": 6.0}]},
+        "observations": {0: {"planets": [stale]}},
+        "actions": {},
+    }
+    keyframe, delta = encoder.encode(second)
+    assert not keyframe
+    assert delta["state"]["changed"] == {"tick": 1}
+    assert delta["state"]["planets"] == {"upsert": [{"energy": 6.0, "id": 1}], "remove": []}
+    assert delta["observations"][0]["delta"]["planets"] == {"upsert": [], "remove": []}
+    assert apply_replay_delta(first, delta) == second
+
+
+def test_delta_records_predict_growth_sightings_and_fleet_motion() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    home = state._owned_planets(0)[0]
+    records = []
+    for tick in range(6):
+        actions = {0: [{"type": "send_fleet", "from_id": home.id, "to_id": 17, "energy": 5.0}]} if tick == 0 else {}
+        snapshot = state.advance_tick(actions)
+        observations = {p.id: state.observation_for_player(p.id, snapshot["scans"][p.id]) for p in state.players}
+        record = {"tick": tick, "state": snapshot, "observations": observations, "actions": actions}
+        records.append(json.loads(json.dumps(record)))
+    encoder = ReplayDeltaEncoder(keyframe_interval=10)
+    assert encoder.encode(records[0]) == (True, records[0])
+    previous = records[0]
+    for record in records[1:]:
+        keyframe, delta = encoder.encode(record)
+        assert not keyframe
+        if record["state"]["fleets"]:
+            # Planets only grew and fleets only moved, so there is nothing to store.
+            assert delta["state"]["planets"] == {"upsert": [], "remove": []}
+            assert delta["state"]["fleets"] == {"upsert": [], "remove": []}
+            for entry in delta["observations"].values():
+                assert entry["delta"]["planets"]["upsert"] == []
+        assert apply_replay_delta(previous, delta) == record
+        previous = record
+
+    # Deltas without the `predicted` flag are plain field diffs.
+    grown = {**records[0]["state"]["planets"][0], "energy": 1.5}
+    legacy = {
+        "tick": 1,
+        "state": {"changed": {}, "removed": [], "planets": {"upsert": [{"id": grown["id"], "energy": 1.5}], "remove": []}},
+        "observations": {},
+        "actions": {},
+    }
+    assert apply_replay_delta(records[0], legacy)["state"]["planets"][0] == grown
+
+
+def test_streaming_projection_agrees_across_formats(tmp_path) -> None:
+    paths = [str(tmp_path / name) for name in ("m.jsonl", "m.ofr", "d.ofr", "m.actions.jsonl")]
+    state = GameState(build_config(), ["A", "B"])
+    loggers = [
+        ReplayLogger(paths[0]),
+        BinaryReplayLogger(paths[1], chunk_ticks=4),
+        BinaryReplayLogger(paths[2], chunk_ticks=4, keyframe_interval=3),
+        ActionReplayLogger(paths[3], state),
+    ]
+    play(9, loggers, state)
+    with open(paths[0], encoding="utf-8") as file:
+        full = [json.loads(line) for line in file]
+
+    fields = ["state.scores", "state.planets.owner", "state.scans.1", "observations.1", "actions.0"]
+    expected = [project(record, parse_fields(["tick", *fields])) for record in full]
+    assert expected[1]["actions"] == {} and expected[0]["actions"]["0"]
+    assert all(record["observations"]["1"]["planets"] for record in expected)
+    for path in paths:
+        assert list(iter_replay(path, fields)) == expected
+        assert list(iter_replay(path)) == full
+
+
+def test_player_series_counts_launches_once(tmp_path) -> None:
+    path = str(tmp_path / "m.ofr")
+    play(6, [BinaryReplayLogger(path)])
+    rows = list(player_series(path))
+    assert [(row["tick"], row["player"]) for row in rows[:4]] == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert [row["fleets_launched"] for row in rows] == [1, 0, 0, 1] * 3
+    with BinaryReplayReader(path) as reader:
+        last = reader.read_tick(5)["state"]
+    owned = [planet for planet in last["planets"] if planet["owner"] == 1]
+    assert rows[-1]["planets"] == len(owned)
+    assert rows[-1]["energy"] == pytest.approx(sum(planet["energy"] for planet in owned))
+    assert rows[-1]["score"] == last["scores"][1]["score"]
+
+
+def test_actions_only_replay_resimulates_and_catches_desyncs(tmp_path) -> None:
+    path = str(tmp_path / "m.actions.jsonl")
+    jsonl_path = str(tmp_path / "m.jsonl")
+    state = GameState(build_config(), ["A", "B"])
+    loggers = [ActionReplayLogger(path, state), ReplayLogger(jsonl_path)]
+    observations = {p.id: state.observation_for_player(p.id) for p in state.players}
+    for tick in range(15):
+        home = state._owned_planets(tick % 2)[0]
+        actions = {tick % 2: [{"type": "send_fleet", "from_id": home.id, "to_id": (tick * 7) % 40, "energy": 5.0}]}
+        snapshot = state.advance_tick(actions)
+        observations = {p.id: state.observation_for_player(p.id, snapshot["scans"][p.id]) for p in state.players}
+        for logger in loggers:
+            logger.log_tick(snapshot["tick"], snapshot, observations, actions)
+    for logger in loggers:
+        logger.close()
+    with open(jsonl_path, encoding="utf-8") as file:
+        expected = [json.loads(line) for line in file]
+
+    records = [json.loads(json.dumps(record)) for _, record in resimulate(path)]
+    assert records == expected
+
+    with open(path, encoding="utf-8") as file:
+        lines = file.readlines()
+    tampered = json.loads(lines[6])
+    tampered["actions"] = {}
+    lines[6] = json.dumps(tampered) + "\n"
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+    with pytest.raises(ReplayDesyncError) as excinfo:
+        for _ in resimulate(path, observe=False):
+            pass
+    assert excinfo.value.tick == 5
+
+
+def test_state_hash_agrees_across_planet_stores() -> None:
+    pytest.importorskip("numpy")
+    config = build_config()
+    objects = GameState(config, ["A", "B"])
+    arrays = GameState(dataclasses.replace(config, planet_store="arrays"), ["A", "B"])
+    for tick in range(10):
+        home = objects._owned_planets(0)[0]
+        actions = {0: [{"type": "send_fleet", "from_id": home.id, "to_id": tick + 3, "energy": 4.0}]}
+        objects.advance_tick(actions)
+        arrays.advance_tick(actions)
+        assert objects.state_hash() == arrays.state_hash()
+    before = objects.state_hash()
+    objects.planets[5].energy += 1.0
+    assert objects.state_hash() != before
+
+
+class GatedLogger:
+    """Minimal replay logger whose writes wait until the test opens the gate."""
+
+    def __init__(self) -> None:
+        self.autoflush = True
+        self.gate = threading.Event()
+        self.written: list[int] = []
+        self.flushes = 0
+        self.closed = False
+
+    def make_record(self, tick, state, observations, actions):
+        return {"tick": tick}
+
+    def write_record(self, record) -> None:
+        self.gate.wait()
+        if record["tick"] < 0:
+            raise OSError("disk full")
+        self.written.append(record["tick"])
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_background_sink_matches_direct_writes_and_drains_on_close(tmp_path) -> None:
+    direct_path, background_path = str(tmp_path / "direct.ofr"), str(tmp_path / "bg.ofr")
+    inner = BinaryReplayLogger(background_path, chunk_ticks=4, keyframe_interval=3)
+    sink = BackgroundReplaySink(inner, flush_every=2)
+    play(11, [BinaryReplayLogger(direct_path, chunk_ticks=4, keyframe_interval=3), sink])
+    assert sink.written == 11 and sink.dropped == 0
+    with BinaryReplayReader(direct_path) as direct, BinaryReplayReader(background_path) as background:
+        assert list(background) == list(direct)
+
+
+def test_background_sink_blocks_without_stalling_the_event_loop(tmp_path) -> None:
+    async def scenario() -> None:
+        sink = BackgroundReplaySink(GatedLogger(), max_pending=1)
+        # The writer holds one record and the queue another; the third has to wait.
+        await sink.log_tick(0, {}, {}, {})
+        await sink.log_tick(1, {}, {}, {})
+        blocked = asyncio.create_task(sink.log_tick(2, {}, {}, {}))
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+        assert not blocked.done()
+        sink.logger.gate.set()
+        await blocked
+        await asyncio.to_thread(sink.close)
+        assert sink.logger.written == [0, 1, 2] and sink.dropped == 0
+
+    asyncio.run(scenario())
+    state = GameState(build_config(), ["A", "B"])
+    for policy in ("drop_newest", "drop_oldest"):
+        with pytest.raises(ValueError):
+            BackgroundReplaySink(ActionReplayLogger(str(tmp_path / "m.actions.jsonl"), state), policy=policy)
+
+
+def test_background_sink_drop_policies_and_errors() -> None:
+    newest = BackgroundReplaySink(GatedLogger(), max_pending=2, policy="drop_newest")
+    oldest = BackgroundReplaySink(GatedLogger(), max_pending=2, policy="drop_oldest")
+    for sink in (newest, oldest):
+        for tick in range(6):
+            asyncio.run(sink.log_tick(tick, {}, {}, {}))
+        sink.logger.gate.set()
+        sink.close()
+        assert sink.logger.closed and not sink.logger.autoflush
+        assert sink.written + sink.dropped == 6 and sink.dropped >= 3
+    assert newest.logger.written == sorted(newest.logger.written) and newest.logger.written[0] == 0
+    assert oldest.logger.written[-1] == 5
+
+    failing = BackgroundReplaySink(GatedLogger())
+    failing.logger.gate.set()
+    asyncio.run(failing.log_tick(-1, {}, {}, {}))
+    with pytest.raises(OSError):
+        failing.close()
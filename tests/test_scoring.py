@@ -47,3 +47,34 @@ def test_scoring_updates() -> None:
     assert player.territory_score == (100 + 80 + 60) / 1000.0
     assert player.artifact_score == config.artifact_points_per_tick
     assert player.score == player.territory_score + player.artifact_score
+
+
+def test_scoring_tracks_upgrades_and_captures() -> None:
+    config = build_config()
+    config.score_top_n = 2
+    state = GameState(config, ["A", "B"])
+    for planet in state.planets:
+        planet.owner = None
+        planet.is_artifact = False
+
+    for planet_id, cap in [(0, 100), (1, 80), (2, 60)]:
+        state.planets[planet_id].owner = 0
+        state.planets[planet_id].energy_cap = cap
+
+    def territory_gains() -> list[float]:
+        for player in state.players:
+            player.territory_score = 0.0
+        state._update_scores()
+        return [player.territory_score for player in state.players]
+
+    assert territory_gains() == [(100 + 80) / 1000.0, 0.0]
+
+    state.planets[2].level = 3
+    state.planets[2].silver = 1000
+    state._handle_upgrade(0, {"type": "upgrade", "planet_id": 2, "upgrade": "energy"})
+    upgraded_cap = state.planets[2].energy_cap
+    assert upgraded_cap > 80
+    assert territory_gains() == [(100 + upgraded_cap) / 1000.0, 0.0]
+
+    state.planets[0].owner = 1
+    assert territory_gains() == [(upgraded_cap + 80) / 1000.0, 100 / 1000.0]
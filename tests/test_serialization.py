@@ -0,0 +1,56 @@
+from server.engine import GameState
+from server.models import MatchConfig
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=17,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=40,
+        artifact_count=1,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_planet_encoding_reused_until_mutated() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    for _ in range(200):
+        state.advance_tick({})
+    first = state.observation_omniscient()["planets"]
+    second = state.advance_tick({})["planets"]
+    assert all(a is b for a, b in zip(first, second))
+
+    state.planets[3].defense = 9.5
+    third = state.observation_omniscient()["planets"]
+    assert third[3]["defense"] == 9.5
+    assert third[3] is not second[3]
+    assert third[4] is second[4]
+
+
+def test_fleet_position_encoded_once_per_tick() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    source = next(p for p in state.planets if p.owner == 0)
+    target = next(p for p in state.planets if p.owner is None)
+    action = {"type": "send_fleet", "from_id": source.id, "to_id": target.id, "energy": 1.0}
+    snapshot = state.advance_tick({0: [action]})
+    omniscient = state.observation_omniscient()
+    assert snapshot["fleets"] and snapshot["fleets"][0] is omniscient["fleets"][0]
+    moved = state.advance_tick({})
+    if moved["fleets"]:
+        assert moved["fleets"][0] is not snapshot["fleets"][0]
+        assert moved["fleets"][0]["ticks_remaining"] == snapshot["fleets"][0]["ticks_remaining"] - 1
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from runner.run_match import load_bot_function
+from server.engine import GameState
+from server.models import MatchConfig
+
+BOTS_DIR = os.path.join(os.path.dirname(__file__), "..", "bots", "python")
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=4,
+        tick_ms=500,
+        match_ticks=25,
+        planet_count=150,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def bot_actions(state: GameState, bots: list) -> dict:
+    return {player.id: bot(state.observation_for_player(player.id)) for player, bot in zip(state.players, bots)}
+
+
+def play(state: GameState, bots: list, ticks: int) -> list[dict]:
+    return [state.advance_tick(bot_actions(state, bots)) for _ in range(ticks)]
+
+
+@pytest.mark.parametrize("store", ["objects", "arrays"])
+def test_fork_advances_identically(store: str) -> None:
+    if store == "arrays":
+        pytest.importorskip("numpy")
+    config = build_config()
+    config.planet_store = store
+    bots = [load_bot_function(os.path.join(BOTS_DIR, name)) for name in ("rush_bot.py", "expansion_bot.py")]
+    state = GameState(config, ["A", "B"])
+    play(state, bots, 20)
+
+    fork = state.fork()
+    assert fork.tick == state.tick
+    assert play(fork, bots, 20) == play(state, bots, 20)
+    assert fork._next_fleet_id == state._next_fleet_id > 1
+    assert fork._next_ping_id == state._next_ping_id
+    assert fork.observation_for_player(1) == state.observation_for_player(1)
+
+
+@pytest.mark.parametrize("store", ["objects", "arrays"])
+def test_restore_rewinds_and_isolates_branches(store: str) -> None:
+    if store == "arrays":
+        pytest.importorskip("numpy")
+    config = build_config()
+    config.planet_store = store
+    bots = [load_bot_function(os.path.join(BOTS_DIR, name)) for name in ("rush_bot.py", "turtle_bot.py")]
+    state = GameState(config, ["A", "B"])
+    play(state, bots, 10)
+    saved = state.snapshot()
+    before = state.observation_omniscient()
+
+    expected = play(state, bots, 15)
+    state.restore(saved)
+    assert state.observation_omniscient() == before
+    assert play(state, bots, 15) == expected
+
+    # A branch that diverges must not leak into the original or the snapshot.
+    branch = state.fork()
+    home = next(p for p in branch.planets if p.owner == 0)
+    branch.planets[home.id].owner = 1
+    branch.advance_tick({})
+    assert state.planets[home.id].owner == 0
+    state.restore(saved)
+    assert play(state, bots, 15) == expected
+
+    state.restore(branch.snapshot())
+    assert state.observation_omniscient() == branch.observation_omniscient()
+    assert state.advance_tick({}) == branch.advance_tick({})
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from server.engine import GameState
+from server.models import MatchConfig
+from server.spatial import PlanetGrid
+from server.utils import distance
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=17,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=40,
+        artifact_count=1,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_grid_query_matches_full_scan() -> None:
+    rng = random.Random(3)
+    points = [(i, rng.uniform(-1, 1), rng.uniform(-1, 1)) for i in range(500)]
+    grid = PlanetGrid(points, len(points))
+    for _ in range(200):
+        x = rng.uniform(-1.2, 1.2)
+        y = rng.uniform(-1.2, 1.2)
+        radius = rng.uniform(0.0, 0.8)
+        expected = [pid for pid, px, py in points if distance((px, py), (x, y)) <= radius]
+        assert grid.query_radius(x, y, radius) == expected
+
+
+def test_grid_query_non_finite_radius() -> None:
+    points = [(0, 0.0, 0.0), (1, 0.5, -0.5)]
+    grid = PlanetGrid(points, len(points))
+    assert grid.query_radius(0.0, 0.0, float("inf")) == [0, 1]
+    assert grid.query_radius(0.0, 0.0, float("nan")) == []
+    assert grid.query_radius(0.0, 0.0, -1.0) == []
+
+
+def test_grid_query_extreme_coordinates() -> None:
+    points = [(0, 0.0, 0.0), (1, 0.99, -0.99)]
+    grid = PlanetGrid(points, len(points))
+    assert grid.query_radius(1e308, 0.0, 0.1) == []
+    assert grid.query_radius(-1e308, -1e308, 0.1) == []
+    assert grid.query_radius(0.0, 0.0, 1e308) == [0, 1]
+    assert grid.query_radius(1e308, 1e308, 1.7e308) == [0, 1]
+
+    state = GameState(build_config(), ["A", "B"])
+    scan = {"type": "scan", "x": 1e308, "y": 0.0, "radius": 0.1}
+    assert state.advance_tick({0: [scan]})["scans"][0] == []
+
+
+def test_grid_from_arrays_matches_tuple_grid() -> None:
+    np = pytest.importorskip("numpy")
+    rng = random.Random(5)
+    points = [(i, rng.uniform(-1, 1), rng.uniform(-1, 1)) for i in range(800)]
+    grid = PlanetGrid(points, len(points))
+    lazy = PlanetGrid.from_arrays(np.array([p[1] for p in points]), np.array([p[2] for p in points]))
+    assert not lazy.cells
+    for _ in range(100):
+        x, y, radius = rng.uniform(-1.2, 1.2), rng.uniform(-1.2, 1.2), rng.uniform(0.0, 0.5)
+        assert lazy.query_radius(x, y, radius) == grid.query_radius(x, y, radius)
+    assert lazy.query_radius(0.0, 0.0, float("inf")) == list(range(800))
@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from server.engine import GameState
+from server.models import MatchConfig
+from server.profiling import TickProfiler
+from server.spectators import COMPACT_PLANET_FIELDS, SpectatorHub, parse_viewport
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=17,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=40,
+        artifact_count=1,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False, gated: bool = False) -> None:
+        self.fail = fail
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+        self.sent: list[str] = []
+        self.closed = False
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("connection reset")
+        self.sent.append(text)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def advance(state: GameState) -> dict:
+    snapshot = state.advance_tick({})
+    return {p.id: state.observation_for_player(p.id, snapshot["scans"][p.id]) for p in state.players}
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_each_view_is_encoded_once_and_shared() -> None:
+    async def scenario() -> None:
+        state = GameState(build_config(), ["A", "B"])
+        observations = advance(state)
+        builds = []
+        omniscient = state.observation_omniscient
+        state.observation_omniscient = lambda: builds.append(1) or omniscient()
+
+        hub = SpectatorHub()
+        watchers = [hub.add(FakeWebSocket()) for _ in range(5)]
+        hub.handle_message(watchers[3], {"type": "set_perspective", "player_id": 1, "omniscient": False})
+        hub.handle_message(watchers[4], {"type": "set_perspective", "player_id": 7, "omniscient": False})
+        broken = hub.add(FakeWebSocket(fail=True))
+        hub.publish(state, observations)
+        await settle()
+
+        assert len(builds) == 1
+        frames = [watcher["ws"].sent for watcher in watchers]
+        assert all(len(sent) == 1 for sent in frames)
+        assert frames[0][0] is frames[1][0] is frames[4][0]
+        assert json.loads(frames[3][0])["payload"] == json.loads(json.dumps(observations[1]))
+        assert json.loads(frames[0][0])["payload"]["tick"] == state.tick
+        assert broken["ws"].closed and len(hub) == 5
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_slow_spectator_skips_ahead_without_holding_up_others() -> None:
+    async def scenario() -> None:
+        state = GameState(build_config(), ["A", "B"])
+        hub = SpectatorHub(max_pending=2)
+        fast = hub.add(FakeWebSocket())
+        slow = hub.add(FakeWebSocket(gated=True))
+        for _ in range(6):
+            hub.publish(state, advance(state))
+            await settle()
+
+        ticks = lambda spectator: [json.loads(frame)["payload"]["tick"] for frame in spectator["ws"].sent]
+        assert ticks(fast) == list(range(1, 7))
+        assert slow["queue"].qsize() == 2 and slow["dropped"] == 3
+        profiler = TickProfiler()
+        hub.report(profiler)
+        assert profiler.gauge_values()["spectator_dropped_frames"] == {"0": 0, "1": 3}
+
+        slow["ws"].gate.set()
+        await settle()
+        # The frame already in flight, then only the latest two.
+        assert ticks(slow) == [1, 5, 6]
+        hub.remove(slow)
+        hub.report(profiler)
+        assert profiler.gauge_values()["spectator_queue_depth"] == {"0": 0}
+        await hub.close()
+        assert fast["ws"].closed and len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_viewport_frames_cull_entities_and_share_snapped_views() -> None:
+    assert parse_viewport({"bounds": None}) is None
+    with pytest.raises(ValueError):
+        parse_viewport({"bounds": [0.5, 0.0, 0.0, 0.5]})
+    assert parse_viewport({"bounds": [-0.01, 0.0, 0.12, 0.2], "zoom": 4}) == (7, 8, 9, 10, True)
+
+    async def scenario() -> None:
+        state = GameState(build_config(), ["A", "B"])
+        observations = advance(state)
+        hub = SpectatorHub()
+        full, near, nearer, wide = (hub.add(FakeWebSocket()) for _ in range(4))
+        hub.handle_message(near, {"type": "set_viewport", "bounds": [-0.5, -0.5, 0.0, 0.0], "zoom": 4})
+        hub.handle_message(nearer, {"type": "set_viewport", "bounds": [-0.45, -0.45, -0.05, -0.05], "zoom": 5})
+        hub.handle_message(wide, {"type": "set_viewport", "bounds": [-1, -1, 1, 1], "zoom": 1})
+        hub.handle_message(wide, {"type": "set_viewport", "bounds": "everything"})
+        frames = hub.encode_views(state, observations)
+        assert len(frames) == 3
+
+        hub.publish(state, observations)
+        await settle()
+        whole = json.loads(full["ws"].sent[0])["payload"]
+        assert "overview" not in whole
+        assert near["ws"].sent[0] is nearer["ws"].sent[0]
+        culled = json.loads(near["ws"].sent[0])["payload"]
+        expected = [p["id"] for p in whole["planets"] if -0.5 <= p["x"] <= 0.0 and -0.5 <= p["y"] <= 0.0]
+        assert [p["id"] for p in culled["planets"]] == expected
+        assert culled["planets"] == [p for p in whole["planets"] if p["id"] in set(expected)]
+        assert sum(count for _, _, count in culled["overview"]["cells"]) == len(whole["planets"])
+
+        compact = json.loads(wide["ws"].sent[0])["payload"]
+        assert len(compact["planets"]) == len(whole["planets"]) and not compact["viewport"]["detail"]
+        assert set(compact["planets"][0]) <= set(COMPACT_PLANET_FIELDS)
+        await hub.close()
+
+    asyncio.run(scenario())
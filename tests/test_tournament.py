@@ -0,0 +1,119 @@
+import json
+import os
+
+from runner.run_match import run_headless
+from runner.tournament import aggregate, parse_seeds, run_tournament, seat_bots
+from server.models import MatchConfig
+
+BOTS_DIR = os.path.join(os.path.dirname(__file__), "..", "bots", "python")
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=4,
+        tick_ms=500,
+        match_ticks=25,
+        planet_count=150,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def test_parse_seeds_and_seat_rotation() -> None:
+    assert parse_seeds("1-3,7, 9-9") == [1, 2, 3, 7, 9]
+    assert seat_bots(["a", "b"], 3, 0) == ["a", "b", "a"]
+    assert seat_bots(["a", "b"], 3, 1) == ["b", "a", "a"]
+    assert {tuple(seat_bots(["a", "b", "c"], 2, seed)) for seed in range(3)} == {("a", "b"), ("b", "c"), ("c", "a")}
+
+
+def test_aggregate_splits_tied_wins() -> None:
+    results = [
+        {"seed": 1, "bots": ["a", "b"], "scores": [5.0, 5.0], "winners": [0, 1]},
+        {"seed": 2, "bots": ["b", "a"], "scores": [9.0, 1.0], "winners": [0]},
+        {"seed": 3, "error": "boom"},
+    ]
+    summary = aggregate(results)
+    assert summary["completed"] == 2
+    assert summary["failed"] == [3]
+    assert summary["bots"]["a"] == {"seats": 2, "wins": 0.5, "win_rate": 0.25, "avg_score": 3.0}
+    assert summary["bots"]["b"]["wins"] == 1.5
+
+
+def test_tournament_streams_rows_and_isolates_failures(tmp_path) -> None:
+    config = build_config()
+    config.match_ticks = 10
+    roster = [os.path.join(BOTS_DIR, "rush_bot.py"), os.path.join(BOTS_DIR, "turtle_bot.py")]
+    out_path = tmp_path / "league.jsonl"
+    summary = run_tournament(config, roster, [1, 2, 3], 2, str(out_path), workers=2)
+    assert summary["completed"] == 3
+    assert sum(entry["seats"] for entry in summary["bots"].values()) == 6
+
+    rows = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert sorted(row["seed"] for row in rows if row["type"] == "match") == [1, 2, 3]
+    assert rows[-1]["type"] == "summary"
+
+    broken = run_tournament(config, roster + [str(tmp_path / "missing_bot.py")], [4], 3, str(out_path), workers=1)
+    assert broken["failed"] == [4]
+
+
+def test_stuck_bots_time_out_and_seats_do_not_share_module_state(tmp_path) -> None:
+    config = build_config()
+    config.match_ticks = 5
+    stateful = tmp_path / "stateful_bot.py"
+    shared = tmp_path / "shared"
+    stateful.write_text(
+        "seen = []\n"
+        "def bot(observation):\n"
+        "    if seen and observation['tick'] <= seen[-1]:\n"
+        f"        open({str(shared)!r}, 'w').close()\n"
+        "    seen.append(observation['tick'])\n"
+        "    return []\n"
+    )
+    for _ in range(2):
+        assert run_headless(config, [str(stateful), str(stateful)])["ticks"] == 5
+    assert not shared.exists(), "module state shared between seats or matches"
+
+    stuck = tmp_path / "stuck_bot.py"
+    stuck.write_text("def bot(observation):\n    while True:\n        pass\n")
+    summary = run_tournament(config, [str(stuck), str(stateful)], [1, 2], 2, str(tmp_path / "t.jsonl"), 1, None, 1.0)
+    assert summary["failed"] == [1, 2]
+    rows = [json.loads(line) for line in (tmp_path / "t.jsonl").read_text().splitlines()]
+    assert all("timed out" in row["error"] for row in rows if row["type"] == "match")
+
+
+def test_bots_that_exit_only_fail_their_own_matches(tmp_path) -> None:
+    config = build_config()
+    config.match_ticks = 5
+    quitter = tmp_path / "quitter_bot.py"
+    quitter.write_text("import sys\ndef bot(observation):\n    sys.exit(3)\n")
+    assert run_headless(config, [str(quitter), os.path.join(BOTS_DIR, "rush_bot.py")])["ticks"] == 5
+
+    exits_on_import = tmp_path / "import_exit_bot.py"
+    exits_on_import.write_text("import sys\nsys.exit(3)\n")
+    crasher = tmp_path / "crash_bot.py"
+    crasher.write_text("import os\ndef bot(observation):\n    os._exit(3)\n")
+    # Seats rotate by seed: 3 -> (crash, rush), 4 -> (rush, turtle), 5 -> (turtle, crash).
+    roster = [str(crasher), os.path.join(BOTS_DIR, "rush_bot.py"), os.path.join(BOTS_DIR, "turtle_bot.py")]
+    out_path = tmp_path / "t.jsonl"
+    summary = run_tournament(config, roster, [3, 4, 5, 7], 2, str(out_path), workers=1)
+    assert summary["failed"] == [3, 5] and summary["completed"] == 2
+    rows = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert sorted(row["seed"] for row in rows if row["type"] == "match") == [3, 4, 5, 7]
+
+    summary = run_tournament(config, [str(exits_on_import)], [1, 2], 1, str(out_path), workers=1)
+    assert summary["failed"] == [1, 2]
+    assert all("SystemExit" in row["error"] for row in map(json.loads, out_path.read_text().splitlines()[:2]))
@@ -0,0 +1,64 @@
+from server.engine import GameState
+from server.models import MatchConfig
+from server.utils import distance
+
+
+def build_config() -> MatchConfig:
+    return MatchConfig(
+        seed=5,
+        tick_ms=500,
+        match_ticks=10,
+        planet_count=150,
+        artifact_count=2,
+        max_actions_per_tick=5,
+        speed_const=0.08,
+        capture_threshold_fraction=0.15,
+        defense_multiplier=0.2,
+        ping_ttl_ticks=3,
+        ping_jitter=0.03,
+        ping_base_radius=0.05,
+        ping_base_strength=0.4,
+        artifact_ping_radius=0.08,
+        artifact_ping_strength=0.25,
+        artifact_points_per_tick=1.5,
+        score_top_n=10,
+        commit_timeout_ms=200,
+        reveal_timeout_ms=200,
+        player_home_min_distance=0.7,
+    )
+
+
+def sensed_ids(state: GameState, player_id: int) -> set[int]:
+    owned = [p for p in state.planets if p.owner == player_id]
+    return {
+        other.id
+        for planet in owned
+        for other in state.planets
+        if distance((planet.x, planet.y), (other.x, other.y)) <= planet.sensor_range
+    }
+
+
+def visible_ids(observation: dict) -> set[int]:
+    return {p["id"] for p in observation["planets"] if p["visibility"] != "stale"}
+
+
+def test_coverage_follows_capture_loss_and_sensor_upgrade() -> None:
+    state = GameState(build_config(), ["A", "B"])
+    assert visible_ids(state.observation_for_player(0)) == sensed_ids(state, 0)
+
+    gained = [p for p in state.planets if p.owner is None][:5]
+    for planet in gained:
+        planet.owner = 0
+    assert visible_ids(state.observation_for_player(0)) == sensed_ids(state, 0)
+
+    gained[0].silver = 1000
+    state._handle_upgrade(0, {"type": "upgrade", "planet_id": gained[0].id, "upgrade": "sensor"})
+    assert visible_ids(state.observation_for_player(0)) == sensed_ids(state, 0)
+
+    gained[1].owner = 1
+    gained[2].owner = None
+    observation = state.observation_for_player(0)
+    assert visible_ids(observation) == sensed_ids(state, 0)
+    stale = {p["id"] for p in observation["planets"] if p["visibility"] == "stale"}
+    assert stale and not stale & sensed_ids(state, 0)
+    assert visible_ids(state.observation_for_player(1)) == sensed_ids(state, 1)
@@ -10,6 +10,8 @@ type Observation = {
   max_actions: number;
   match_ticks?: number;
   tick_ms?: number;
+  viewport?: { bounds: [number, number, number, number]; detail: boolean };
+  overview?: { grid: number; cells: Array<[number, number | null, number]> };
 };
 
 const canvas = document.getElementById("map") as HTMLCanvasElement;
@@ -22,6 +24,9 @@ const omniscientToggle = document.getElementById("omniscient") as HTMLInputEleme
 
 let latest: Observation | null = null;
 let matchTicks = 2400;
+// Camera in map coordinates: the map spans [-1, 1] on both axes, zoom 1 shows all of it.
+const camera = { x: 0, y: 0, zoom: 1 };
+const MAX_ZOOM = 16;
 
 function resize() {
   const rect = canvas.getBoundingClientRect();
@@ -36,11 +41,51 @@ function toScreen(x: number, y: number) {
   const padding = 24 * window.devicePixelRatio;
   const width = canvas.width - padding * 2;
   const height = canvas.height - padding * 2;
-  const sx = padding + ((x + 1) / 2) * width;
-  const sy = padding + ((1 - (y + 1) / 2)) * height;
+  const sx = padding + (((x - camera.x) * camera.zoom + 1) / 2) * width;
+  const sy = padding + ((1 - ((y - camera.y) * camera.zoom + 1) / 2)) * height;
   return { x: sx, y: sy };
 }
 
+function viewBounds(): [number, number, number, number] {
+  const half = 1 / camera.zoom;
+  return [camera.x - half, camera.y - half, camera.x + half, camera.y + half];
+}
+
+function clampCamera() {
+  camera.zoom = Math.min(MAX_ZOOM, Math.max(1, camera.zoom));
+  const limit = 1 - 1 / camera.zoom;
+  camera.x = Math.min(limit, Math.max(-limit, camera.x));
+  camera.y = Math.min(limit, Math.max(-limit, camera.y));
+}
+
+function renderOverview(observation: Observation) {
+  const overview = observation.overview;
+  if (!overview) {
+    return;
+  }
+  const size = 2 / overview.grid;
+  const [minX, minY, maxX, maxY] = observation.viewport?.bounds ?? [1, 1, -1, -1];
+  for (const [cell, owner, count] of overview.cells) {
+    const x0 = (cell % overview.grid) * size - 1;
+    const y0 = Math.floor(cell / overview.grid) * size - 1;
+    // Cells inside the viewport are drawn from the full entities instead.
+    if (x0 >= minX && x0 + size <= maxX && y0 >= minY && y0 + size <= maxY) {
+      continue;
+    }
+    const topLeft = toScreen(x0, y0 + size);
+    const bottomRight = toScreen(x0 + size, y0);
+    const alpha = Math.min(0.5, 0.05 + count * 0.04);
+    if (owner === null) {
+      ctx.fillStyle = `rgba(183, 196, 191, ${alpha * 0.5})`;
+    } else if (owner === observation.player_id) {
+      ctx.fillStyle = `rgba(30, 143, 111, ${alpha})`;
+    } else {
+      ctx.fillStyle = `rgba(227, 116, 91, ${alpha})`;
+    }
+    ctx.fillRect(topLeft.x, topLeft.y, bottomRight.x - topLeft.x, bottomRight.y - topLeft.y);
+  }
+}
+
 function render() {
   requestAnimationFrame(render);
   ctx.clearRect(0, 0, canvas.width, canvas.height);
@@ -48,12 +93,14 @@ function render() {
     return;
   }
 
+  renderOverview(latest);
+
   for (const ping of latest.pings ?? []) {
     const pos = toScreen(ping.x, ping.y);
     ctx.beginPath();
     ctx.strokeStyle = `rgba(30, 143, 111, ${0.2 + ping.strength * 0.2})`;
     ctx.lineWidth = 2;
-    ctx.arc(pos.x, pos.y, ping.radius * canvas.width * 0.25, 0, Math.PI * 2);
+    ctx.arc(pos.x, pos.y, ping.radius * camera.zoom * canvas.width * 0.25, 0, Math.PI * 2);
     ctx.stroke();
   }
 
@@ -130,7 +177,10 @@ function updateScoreboard(scores: Array<Record<string, any>>) {
 }
 
 function connect() {
-  const ws = new WebSocket("ws://localhost:8000/ws/spectator");
+  // `?match=<id>` watches a match hosted under /matches/<id>; otherwise the server's default match.
+  const matchId = new URLSearchParams(window.location.search).get("match");
+  const path = matchId ? `/matches/${encodeURIComponent(matchId)}/ws/spectator` : "/ws/spectator";
+  const ws = new WebSocket(`ws://localhost:8000${path}`);
 
   ws.addEventListener("message", (event) => {
     const message = JSON.parse(event.data);
@@ -155,6 +205,69 @@ function connect() {
     );
   }
 
+  let viewportTimer: number | undefined;
+  function sendViewport() {
+    if (ws.readyState !== WebSocket.OPEN) {
+      return;
+    }
+    const zoomed = camera.zoom > 1;
+    ws.send(
+      JSON.stringify({
+        type: "set_viewport",
+        bounds: zoomed ? viewBounds() : null,
+        zoom: camera.zoom,
+      })
+    );
+  }
+
+  function scheduleViewport() {
+    window.clearTimeout(viewportTimer);
+    viewportTimer = window.setTimeout(sendViewport, 100);
+  }
+
+  function toMap(event: MouseEvent) {
+    const rect = canvas.getBoundingClientRect();
+    const fx = (event.clientX - rect.left) / rect.width;
+    const fy = (event.clientY - rect.top) / rect.height;
+    return { x: camera.x + (fx * 2 - 1) / camera.zoom, y: camera.y + (1 - fy * 2) / camera.zoom };
+  }
+
+  canvas.addEventListener(
+    "wheel",
+    (event) => {
+      event.preventDefault();
+      // Zoom around the cursor so the point under it stays put.
+      const before = toMap(event);
+      camera.zoom *= event.deltaY < 0 ? 1.25 : 0.8;
+      clampCamera();
+      const after = toMap(event);
+      camera.x += before.x - after.x;
+      camera.y += before.y - after.y;
+      clampCamera();
+      scheduleViewport();
+    },
+    { passive: false }
+  );
+
+  let dragging: { x: number; y: number } | null = null;
+  canvas.addEventListener("mousedown", (event) => {
+    dragging = toMap(event);
+  });
+  window.addEventListener("mouseup", () => {
+    dragging = null;
+  });
+  canvas.addEventListener("mousemove", (event) => {
+    if (!dragging) {
+      return;
+    }
+    const current = toMap(event);
+    camera.x += dragging.x - current.x;
+    camera.y += dragging.y - current.y;
+    clampCamera();
+    scheduleViewport();
+  });
+
+  ws.addEventListener("open", sendViewport);
   omniscientToggle.addEventListener("change", sendPerspective);
   playerSelect.addEventListener("change", () => {
     omniscientToggle.checked = playerSelect.value === "";